@@ -0,0 +1,73 @@
+# 조회 응답 직렬화 벤치마크 (오프라인 CLI)
+# 예전 방식(저장된 dict -> Review 모델 생성 -> response_model로 다시 검증 -> JSON)과
+# 지금 방식(저장된 dict -> fast_json.dumps)을 같은 리뷰 목록으로 비교함
+#
+# 사용법:
+#   python bench_serialization.py                  # 리뷰 10만 개
+#   python bench_serialization.py --reviews 20000 --repeat 5
+
+import argparse
+import random
+import time
+from typing import List
+from pydantic import TypeAdapter
+import fast_json
+from models import Review
+
+
+def make_reviews(count: int) -> List[dict]:
+    # 저장소에 들어 있는 것과 같은 모양의 리뷰 dict (모델 필드 순서)
+    rng = random.Random(0)
+    return [
+        Review(
+            id=i,
+            movie_id=rng.randint(1, 500),
+            author=f"작성자{rng.randint(1, 10000)}",
+            content="정말 재미있게 봤어요. 배우들 연기가 좋았습니다. " * rng.randint(1, 4),
+            sentiment_score=rng.random(),
+            sentiment_status="done",
+            scoring_version="v1",
+            created_at=f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 12:00:00",
+        ).model_dump()
+        for i in range(1, count + 1)
+    ]
+
+
+def best_of(repeat: int, func) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="리뷰 목록 응답 직렬화 속도를 비교합니다.")
+    parser.add_argument("--reviews", type=int, default=100_000, help="리뷰 수")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 횟수 (가장 빠른 값 사용)")
+    args = parser.parse_args()
+
+    records = make_reviews(args.reviews)
+    adapter = TypeAdapter(List[Review])
+
+    def model_path():
+        # 예전 조회 경로: 저장소 함수가 Review(**dict)로 모델을 만들고, 응답 직렬화가 response_model 타입으로 다시 검증
+        reviews = [Review(**review) for review in records]
+        return adapter.dump_json(adapter.validate_python(reviews))
+
+    def record_path():
+        return fast_json.dumps(records)
+
+    assert adapter.validate_json(model_path()) == adapter.validate_json(record_path())  # 같은 내용인지 확인
+
+    backend = "orjson" if fast_json.orjson is not None else "json"
+    old = best_of(args.repeat, model_path)
+    new = best_of(args.repeat, record_path)
+    print(f"리뷰 {args.reviews}개, {len(record_path()) / 1024 / 1024:.1f}MB")
+    print(f"모델 생성 + 검증 + 직렬화: {old * 1000:.1f}ms")
+    print(f"레코드 그대로 직렬화 ({backend}): {new * 1000:.1f}ms  ({old / new:.1f}배)")
+
+
+if __name__ == "__main__":
+    main()
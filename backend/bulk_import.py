@@ -0,0 +1,129 @@
+# 리뷰 대량 등록 (POST /reviews/bulk)
+# 리뷰를 하나씩 POST 하면 매번 영화 확인 + 한 개짜리 모델 실행 + 파일 저장이 일어나므로
+# 영화 ID는 set 하나로 확인하고, 점수는 청크 단위 배치로 계산하고, 저장은 마지막에 한 번만 함
+
+from datetime import datetime
+from typing import List, Optional, Tuple
+import numpy as np
+from pydantic import ValidationError
+from models import Review
+import config
+import database as db
+import emotion_store
+import sentiment
+
+
+class BulkImporter:
+    """
+    리뷰 dict를 순서대로 받아서 검증 -> 청크 단위 감성 분석 -> 한 번에 저장
+
+    사용법:
+        importer = BulkImporter()
+        importer.add_many([(0, {...}), (1, {...})])  # (요청 안에서의 순번, 리뷰 dict)
+        result = importer.finish()
+    """
+
+    def __init__(self, chunk_size: int = None):
+        self.chunk_size = chunk_size or config.BULK_SCORING_CHUNK_SIZE
+        self.async_mode = config.SENTIMENT_MODE == "async"
+        self.movie_ids = db.get_movie_ids()  # 영화 존재 여부는 이 set으로만 확인
+
+        self.count = 0
+        self._errors: List[dict] = []
+        self._chunk: List[Tuple[int, Review]] = []
+        self._ready: List[Tuple[int, Review]] = []  # 검증 + 점수 계산이 끝난 리뷰
+        self._emotions: List[Optional[np.ndarray]] = []  # _ready와 같은 순서의 감정 확률 벡터
+
+    def add_error(self, index: int, error: str):
+        self.count += 1
+        self._errors.append({"index": index, "error": error})
+
+    def add_many(self, items: List[Tuple[int, dict]]):
+        for index, item in items:
+            self.add(index, item)
+
+    def add(self, index: int, item: dict):
+        self.count += 1
+        try:
+            review = Review.model_validate(item)
+        except ValidationError as e:
+            self._errors.append({"index": index, "error": _format_validation_error(e)})
+            return
+
+        if review.movie_id not in self.movie_ids:
+            self._errors.append({"index": index, "error": f"영화를 찾을 수 없습니다. (movie_id={review.movie_id})"})
+            return
+
+        # 작성 시간은 서버가 만드는 형식으로 맞춤 (목록 조회에서 문자열 순서 = 시간 순서가 되도록)
+        if review.created_at:
+            try:
+                review.created_at = datetime.fromisoformat(review.created_at).strftime("%Y-%m-%d %H:%M:%S")
+            except ValueError:
+                self._errors.append({"index": index, "error": f"created_at: 날짜 형식이 올바르지 않습니다. ({review.created_at})"})
+                return
+
+        # 점수는 서버가 계산 (요청에 들어온 값은 무시)
+        review.sentiment_score = None
+        review.sentiment_status = None
+        review.scoring_version = None
+        self._chunk.append((index, review))
+        if len(self._chunk) >= self.chunk_size:
+            self._score_chunk()
+
+    def _score_chunk(self):
+        chunk, self._chunk = self._chunk, []
+        if not chunk:
+            return
+
+        emotions: List[Optional[np.ndarray]] = [None] * len(chunk)
+        if self.async_mode:
+            # 비동기 모드: 저장만 하고 점수는 백그라운드 워커가 채움
+            for _, review in chunk:
+                if review.content:
+                    review.sentiment_status = "pending"
+        else:
+            scored = [i for i, (_, review) in enumerate(chunk) if review.content]
+            results = sentiment.analyze_emotions_batch([chunk[i][1].content for i in scored])
+            for i, (score, probs) in zip(scored, results):
+                chunk[i][1].sentiment_score = score
+                chunk[i][1].sentiment_status = "done"
+                chunk[i][1].scoring_version = config.SCORING_VERSION
+                emotions[i] = probs
+
+        self._ready.extend(chunk)
+        self._emotions.extend(emotions)
+
+    def finish(self) -> dict:
+        """남은 청크 처리 후 전부 한 번에 저장하고 항목별 결과 반환"""
+        self._score_chunk()
+
+        saved = db.create_reviews_bulk([review for _, review in self._ready]) if self._ready else []
+        emotion_store.get_store().put_many(
+            {review.id: probs for review, probs in zip(saved, self._emotions) if review is not None and probs is not None}
+        )
+
+        # 저장소가 None을 돌려준 리뷰는 처리하는 사이에 영화가 삭제된 것
+        results = []
+        for (index, review), new_review in zip(self._ready, saved):
+            if new_review is None:
+                self._errors.append({"index": index, "error": f"영화를 찾을 수 없습니다. (movie_id={review.movie_id})"})
+            else:
+                results.append({"index": index, "id": new_review.id})
+        created = len(results)
+        results.extend(self._errors)
+        results.sort(key=lambda result: result["index"])
+
+        return {
+            "created": created,
+            "failed": len(self._errors),
+            "results": results,
+        }
+
+
+def _format_validation_error(e: ValidationError) -> str:
+    # "author: Field required" 같은 짧은 문장으로
+    messages = []
+    for error in e.errors():
+        field = ".".join(str(loc) for loc in error["loc"])
+        messages.append(f"{field}: {error['msg']}" if field else error["msg"])
+    return "; ".join(messages)
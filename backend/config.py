@@ -0,0 +1,124 @@
+# 서버 설정값 모음
+# 배포 환경마다 다르게 줄 수 있도록 환경 변수로 덮어쓸 수 있게 함
+
+import os
+
+# ---저장소 설정---
+
+# 리뷰 저장 방식
+# "snapshot": 변경될 때마다 reviews.json 전체를 다시 씀 (기존 방식)
+# "journal": 변경분만 reviews.journal.jsonl에 한 줄씩 추가하고, 주기적으로 reviews.json에 합침
+REVIEW_STORAGE = os.getenv("REVIEW_STORAGE", "snapshot")
+
+# 저널 파일 경로
+REVIEWS_JOURNAL_FILE = os.getenv("REVIEWS_JOURNAL_FILE", "reviews.journal.jsonl")
+
+# 저널 압축(compaction) 기준
+# 저널 레코드 수가 최대치를 넘거나, 최소치 이상이면서 전체 리뷰 수 대비 비율을 넘으면 압축
+JOURNAL_COMPACT_MAX_RECORDS = int(os.getenv("JOURNAL_COMPACT_MAX_RECORDS", "10000"))
+JOURNAL_COMPACT_MIN_RECORDS = int(os.getenv("JOURNAL_COMPACT_MIN_RECORDS", "100"))
+JOURNAL_COMPACT_RATIO = float(os.getenv("JOURNAL_COMPACT_RATIO", "0.5"))
+
+# 저장소 종류
+# "json": movies.json / reviews.json 파일 (기본값)
+# "sqlite": SQLite 데이터베이스 파일 (인덱스 조회 + 트랜잭션)
+DB_BACKEND = os.getenv("DB_BACKEND", "json")
+
+# SQLite 데이터베이스 파일 경로
+SQLITE_PATH = os.getenv("SQLITE_PATH", "movies.db")
+
+# 리뷰별 11개 감정 확률(float16)을 저장하는 파일 (저장소 종류와 상관없이 사용)
+EMOTIONS_FILE = os.getenv("EMOTIONS_FILE", "review_emotions.bin")
+
+# 그룹 커밋: writer 스레드가 한 번에 묶어서 처리하는 최대 변경 작업 수
+COMMIT_MAX_BATCH_SIZE = int(os.getenv("COMMIT_MAX_BATCH_SIZE", "256"))
+
+# ---감성 분석 설정---
+
+# 마이크로 배치: 동시에 들어온 리뷰를 최대 N개 또는 M밀리초까지 모아서 한 번에 모델에 넣음
+SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", "16"))
+SENTIMENT_BATCH_WAIT_MS = float(os.getenv("SENTIMENT_BATCH_WAIT_MS", "10"))
+
+# 리뷰 등록 시 감성 분석 방식
+# "sync": 점수를 계산한 뒤에 저장하고 응답 (기존 방식)
+# "async": 점수 없이(sentiment_status="pending") 바로 저장하고, 백그라운드 워커가 나중에 채움
+SENTIMENT_MODE = os.getenv("SENTIMENT_MODE", "sync")
+
+# 백그라운드 워커가 한 번에 채점하는 리뷰 수 / 할 일이 없을 때 다시 확인하는 간격(초)
+SCORING_WORKER_BATCH_SIZE = int(os.getenv("SCORING_WORKER_BATCH_SIZE", "32"))
+SCORING_WORKER_POLL_SECONDS = float(os.getenv("SCORING_WORKER_POLL_SECONDS", "5"))
+
+# 감성 점수 버전: 리뷰마다 어떤 모델/점수 매핑으로 계산한 점수인지 같이 저장
+# 모델(sentiment.MODEL_NAME)이나 11개 감정 -> 점수 변환 방식을 바꾸면 이 값도 바꿔야 함
+SCORING_VERSION = os.getenv("SCORING_VERSION", "kcelectra-v1")
+
+# 점수 버전을 기록하기 전에 저장된 점수(scoring_version 없음)를 어떤 버전으로 볼지
+# 그때도 같은 모델/점수 매핑을 썼으므로 첫 버전으로 봄 - 리뷰를 불러올 때 / SQLite DB를 열 때 이 값으로 채움
+# (채우지 않으면 기존 리뷰가 전부 오래된 점수로 잡혀서 백그라운드 재채점이 전체를 다시 돌림)
+LEGACY_SCORING_VERSION = os.getenv("LEGACY_SCORING_VERSION", "kcelectra-v1")
+
+# 다른 버전으로 채점된(오래된) 리뷰를 서버가 한가할 때 백그라운드에서 조금씩 다시 채점
+# - 마지막 실시간 채점 요청 후 IDLE_SECONDS 동안 조용하고, 비동기 대기 리뷰가 없을 때만 실행
+# - 초당 최대 MAX_RATE개까지만 처리 / 다시 채점할 리뷰가 없으면 POLL_SECONDS마다 확인
+# - JSON 스냅샷 모드(DB_BACKEND=json, REVIEW_STORAGE=snapshot)에서는 켜 있어도 실행하지 않음 (배치마다 파일 전체를 다시 씀)
+STALE_RESCORE_ENABLED = os.getenv("STALE_RESCORE_ENABLED", "1") == "1"
+STALE_RESCORE_BATCH_SIZE = int(os.getenv("STALE_RESCORE_BATCH_SIZE", "16"))
+STALE_RESCORE_MAX_RATE = float(os.getenv("STALE_RESCORE_MAX_RATE", "5"))
+STALE_RESCORE_IDLE_SECONDS = float(os.getenv("STALE_RESCORE_IDLE_SECONDS", "2"))
+STALE_RESCORE_POLL_SECONDS = float(os.getenv("STALE_RESCORE_POLL_SECONDS", "60"))
+
+# 감성 점수 캐시: 같은(공백만 다른) 리뷰 텍스트는 모델을 다시 돌리지 않음
+# SENTIMENT_CACHE_PATH를 지정하면 디스크(SQLite)에도 저장해서 재시작 후에도 유지
+SENTIMENT_CACHE_SIZE = int(os.getenv("SENTIMENT_CACHE_SIZE", "10000"))
+SENTIMENT_CACHE_PATH = os.getenv("SENTIMENT_CACHE_PATH", "")
+
+# 추론 백엔드 (CPU 서버용 경량화)
+# "torch": 기존 fp32 PyTorch 모델
+# "torch-int8": Linear 레이어를 int8로 동적 양자화한 PyTorch 모델
+# "onnx": ONNX Runtime (ONNX_MODEL_PATH가 없으면 처음 로드할 때 한 번 export)
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "torch")
+ONNX_MODEL_PATH = os.getenv("ONNX_MODEL_PATH", "sentiment_model.onnx")
+
+# fp32 모델과 비교했을 때 허용하는 감성 점수 차이 (python sentiment.py --check-parity)
+PARITY_TOLERANCE = float(os.getenv("PARITY_TOLERANCE", "0.02"))
+
+# 길이별 버킷 배치: 토큰 길이순으로 정렬한 뒤 (버킷 크기 x 버킷 내 최대 길이)가
+# 토큰 예산을 넘지 않게 잘라서 실행 (짧은 리뷰가 긴 리뷰 길이만큼 패딩되지 않도록)
+SENTIMENT_TOKEN_BUDGET = int(os.getenv("SENTIMENT_TOKEN_BUDGET", "8192"))
+SENTIMENT_MAX_BUCKET_SIZE = int(os.getenv("SENTIMENT_MAX_BUCKET_SIZE", "64"))
+
+# 추론 전용 워커 프로세스 풀 (0이면 요청을 처리하는 프로세스 안에서 바로 추론)
+# 부모 프로세스에서 모델을 한 번 로드한 뒤 fork하므로 가중치는 copy-on-write로 공유됨
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "0"))
+INFERENCE_THREADS_PER_WORKER = int(os.getenv("INFERENCE_THREADS_PER_WORKER", "2"))
+# 대기 중인 추론 작업 최대 개수 (가득 차면 INFERENCE_SUBMIT_TIMEOUT_SECONDS만큼 기다린 뒤 거절)
+INFERENCE_MAX_PENDING = int(os.getenv("INFERENCE_MAX_PENDING", "64"))
+INFERENCE_SUBMIT_TIMEOUT_SECONDS = float(os.getenv("INFERENCE_SUBMIT_TIMEOUT_SECONDS", "5"))
+INFERENCE_RESULT_TIMEOUT_SECONDS = float(os.getenv("INFERENCE_RESULT_TIMEOUT_SECONDS", "120"))
+
+# 서버 시작 시 모델을 미리 로드하고 여러 문장 길이로 한 번씩 돌려보는 워밍업
+# 끝나기 전까지 GET /ready는 503을 반환 (로드밸런서가 트래픽을 보내지 않도록)
+# - 요청을 처리하면서 채점하는 SENTIMENT_MODE=sync일 때만 /ready가 기다림 (async는 백그라운드 워커가 채점하므로 바로 ready)
+# - 워밍업은 torch를 import하고 모델을 올림 -> 영화/리뷰 CRUD만 하거나 채점하지 않는 프로세스는 SENTIMENT_WARMUP=0으로 실행
+#   (torch가 없는 환경에서 켜 두면 워밍업이 실패해서 sync 모드의 /ready가 계속 503 "error")
+SENTIMENT_WARMUP = os.getenv("SENTIMENT_WARMUP", "1") == "1"
+SENTIMENT_WARMUP_LENGTHS = [int(n) for n in os.getenv("SENTIMENT_WARMUP_LENGTHS", "16,64,256,512").split(",")]
+
+# 리뷰 대량 등록(POST /reviews/bulk): 한 번에 모델에 넣는 리뷰 수 / 요청당 최대 리뷰 수
+BULK_SCORING_CHUNK_SIZE = int(os.getenv("BULK_SCORING_CHUNK_SIZE", "256"))
+BULK_MAX_REVIEWS = int(os.getenv("BULK_MAX_REVIEWS", "200000"))
+# application/json 본문은 한 번에 읽어서 파싱하므로 크기 제한 (바이트) - 더 큰 업로드는 NDJSON으로 (줄 단위 스트리밍)
+BULK_MAX_JSON_BYTES = int(os.getenv("BULK_MAX_JSON_BYTES", str(16 * 1024 * 1024)))
+
+# 목록 조회(GET /reviews, GET /movies)의 limit 최대값 - limit 없이 호출하면 예전처럼 전체 목록
+LIST_MAX_LIMIT = int(os.getenv("LIST_MAX_LIMIT", "1000"))
+
+# 내보내기(GET /reviews/export, GET /movies/export)에서 저장소에서 한 번에 읽는 레코드 수
+# 전체를 메모리에 올리지 않고 이 단위로 읽어서 바로 내보냄
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+# 조회 API 응답 캐시 (직렬화된 JSON 바이트를 보관 - 데이터가 바뀌면 해당 응답만 무효화)
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") == "1"
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
@@ -1,150 +1,963 @@
 # 영화 리뷰 및 데이터를 JSON 파일로 저장하고 불러오는 기능
 
 import json
-from typing import List, Optional
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Type
 from datetime import datetime
-from models import Movie, Review
+from pydantic import BaseModel
+from sortedcontainers import SortedList, SortedSet
+from models import Movie, MovieSummary, RecentReview, Review
+from movie_index import MovieIndex
+from review_index import ReviewIndex
+import config
+
+try:
+    import fcntl
+except ImportError:  # Windows에는 fcntl이 없음 - 프로세스 간 잠금 없이 동작
+    fcntl = None
 
 # JSON 파일 경로
 MOVIES_FILE = 'movies.json'
 REVIEWS_FILE = 'reviews.json'
 
+# ID 카운터 파일 경로 (삭제된 ID도 재사용하지 않도록 역대 최대 ID 저장)
+MOVIE_ID_FILE = 'last_movie_id.txt'
+REVIEW_ID_FILE = 'last_review_id.txt'
+
+# 여러 프로세스(API 서버 + rescore.py 등)가 같은 파일에 쓸 때 순서를 맞추는 잠금 파일
+LOCK_FILE = 'data.lock'
+
+# 데이터 버전(ETag)에 붙이는 프로세스 구분값 - 메모리 카운터는 재시작하면 0부터 다시 세므로
+# 재시작 전에 받은 ETag가 우연히 같은 숫자와 맞아떨어지지 않도록
+PROCESS_TOKEN = os.urandom(4).hex()
+
 # ---유틸리티 함수---
 
 # JSON 파일에서 데이터 로드
-def load_data(filepath: str) -> List[dict]:    
+def load_data(filepath: str) -> List[dict]:
     try:
         with open(filepath, "r", encoding='utf-8') as f:
             return json.load(f)
-        
+
     except FileNotFoundError:
         return []  # 파일이 없으면 빈 리스트 반환
-    
-# 데이터를 JSON 파일에 저장    
+
+# 데이터를 JSON 파일에 저장
 def save_data(filepath: str, data: List[dict]):
-    with open(filepath, "w", encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
-        # json.dump()는 파이썬 객체를 JSON 문자열로 변환 후 저장하는 함수
+    # json.dumps()는 파이썬 객체를 JSON 문자열로 변환하는 함수
+    write_file_atomic(filepath, json.dumps(data, ensure_ascii=False, indent=4))
+
+# 임시 파일에 쓰고 fsync 후 rename - 쓰는 도중 죽어도 기존 파일이 깨지지 않음
+def write_file_atomic(filepath: str, text: str):
+    tmp_path = filepath + ".tmp"
+    with open(tmp_path, "w", encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, filepath)
+
+# 파일의 (수정 시각, 크기) - 외부에서 파일이 바뀌었는지 확인하는 용도
+def file_stamp(filepath: str) -> Optional[tuple]:
+    try:
+        stat = os.stat(filepath)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+# 다른 프로세스와 파일 쓰기가 겹치지 않도록 잠금 (같은 프로세스 안의 순서는 repo.lock이 담당)
+@contextmanager
+def file_lock():
+    if fcntl is None:
+        yield
+        return
+    with open(LOCK_FILE, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+# 카운터 파일에서 지금까지 발급한 최대 ID 읽기
+def read_counter(counter_file: str, existing_ids) -> int:
+    try:
+        with open(counter_file, 'r') as f:
+            return int(f.read().strip())
+    except FileNotFoundError:
+        # 파일이 없으면 현재 데이터에서 최대값 찾기
+        return max(existing_ids, default=0)
+
+# 파일에서 읽은 레코드를 모델 필드 순서 + 기본값으로 맞춤 (없는 필드는 기본값, 모르는 필드는 버림)
+# 저장소의 dict는 쓰기 시점(model_dump)이나 로드 시점에 한 번만 맞춰 두고, 조회 API는 모델 없이 그대로 직렬화함
+def normalize_record(model: Type[BaseModel], record: dict) -> dict:
+    return {name: record.get(name, None if field.is_required() else field.default)
+            for name, field in model.model_fields.items()}
+
+# 리뷰 레코드 정리 - 점수 버전을 기록하기 전의 점수에는 config.LEGACY_SCORING_VERSION을 채움
+def normalize_review(record: dict) -> dict:
+    review = normalize_record(Review, record)
+    if review["sentiment_score"] is not None and review["scoring_version"] is None:
+        review["scoring_version"] = config.LEGACY_SCORING_VERSION
+    return review
+
+# ---인메모리 저장소---
+
+class JsonRepository:
+    """
+    movies.json / reviews.json을 한 번만 읽어서 id를 키로 하는 dict로 메모리에 보관하는 저장소
+    (매 요청마다 파일 전체를 다시 파싱하던 문제 해결)
+
+    - 읽기: 메모리의 dict에서 바로 조회 (id 조회 O(1), 영화별 리뷰 O(k))
+    - 쓰기: 메모리와 파일에 함께 반영 (write-through) - CommitQueue의 writer 스레드만 변경함
+    - 파일을 직접 수정한 경우: mtime/size가 달라지면 다음 접근 때 다시 로드
+
+    리뷰 저장 방식 (config.REVIEW_STORAGE)
+    - "snapshot": 변경될 때마다 reviews.json 전체를 다시 씀
+    - "journal": 변경분만 저널 파일에 한 줄씩 추가 (리뷰 수와 상관없이 O(1) 쓰기)
+      저널이 커지면 백그라운드 스레드가 reviews.json(스냅샷)으로 합치고 저널을 비움
+      시작할 때는 스냅샷을 읽은 뒤 저널을 순서대로 다시 적용(replay)
+    """
+
+    def __init__(self, movies_file: str, reviews_file: str,
+                 review_storage: str = "snapshot", journal_file: Optional[str] = None):
+        self.movies_file = movies_file
+        self.reviews_file = reviews_file
+        self.review_storage = review_storage
+        self.journal_file = journal_file
+
+        # FastAPI가 동기 핸들러를 스레드풀에서 돌리므로 잠금 필요
+        self.lock = threading.RLock()
+
+        self.movies: Dict[int, dict] = {}   # movie_id -> 영화 데이터
+        self.movie_ids = SortedList()       # 영화 ID 정렬 목록 (목록 조회 페이지네이션용)
+        self.movie_index = MovieIndex()     # 장르/감독 역색인 + 개봉일/제목 정렬 (영화 검색용)
+        self.reviews: Dict[int, dict] = {}  # review_id -> 리뷰 데이터
+        # movie_id -> {review_id: None} (dict를 순서 있는 집합처럼 사용)
+        self.reviews_by_movie: Dict[int, Dict[int, None]] = {}
+        # movie_id -> 감성 점수 누적값 {"count", "sum", "sum_sq", "versions"} (평균/분산을 O(1)로 계산)
+        self.sentiment_stats: Dict[int, dict] = {}
+        # 감성 분석 대기 중인 리뷰 ID (비동기 모드에서 백그라운드 워커가 처리)
+        self.pending_review_ids: Dict[int, None] = {}
+        # 현재 버전(config.SCORING_VERSION)이 아닌 점수를 가진 리뷰 ID (백그라운드 재채점 대상 - 커서가 ID 순으로 진행하므로 정렬)
+        self.stale_review_ids = SortedSet()
+        # ID / 작성 시간 / 감성 점수 순 정렬 인덱스 (목록 조회의 keyset 페이지네이션/범위 필터)
+        self.review_index = ReviewIndex()
+        self._bulk_loading = False  # 로드 중에는 정렬 인덱스를 하나씩 넣지 않고 마지막에 한 번에 만듦
+
+        # 지금까지 발급한 최대 ID (카운터 파일은 배치마다 한 번만 기록)
+        self.last_movie_id = 0
+        self.last_review_id = 0
+
+        # 캐시 검증(ETag)용 데이터 버전: scope -> 마지막으로 바뀐 시점의 순번 (순번은 변경마다 1씩 증가)
+        # scope: "movies" (영화 목록), "movie:<id>" (영화 하나), "reviews" (리뷰 전체), "reviews:<movie_id>" (영화별 리뷰)
+        # 파일을 통째로 다시 읽으면 어디가 바뀌었는지 모르므로 epoch를 올려서 전체를 새 버전으로 취급
+        self.versions: Dict[str, int] = {}
+        self._version_seq = 0
+        self._epoch = 0
+
+        self._movies_stamp = None
+        self._reviews_stamp = None
+        self._loaded = False
+        self._movies_dirty = False
+
+        # 아직 파일에 기록되지 않은 리뷰 변경분 (저널 레코드 형태)
+        self._pending_review_ops: List[dict] = []
+        self._journal_records = 0    # 현재 저널에 쌓인 레코드 수
+        self._journal_offset = 0     # 저널에서 이미 적용한 위치 (바이트)
+        self._snapshot_records = 0   # 마지막 스냅샷의 리뷰 수
+        self._compacting = False
+
+    # ---로드 / 저장---
+
+    def refresh(self):
+        """파일이 처음이거나 외부에서 바뀌었으면 다시 로드"""
+        with self.lock:
+            movies_stamp = file_stamp(self.movies_file)
+            if not self._loaded or movies_stamp != self._movies_stamp:
+                self._load_movies()
+
+            reviews_stamp = self._current_reviews_stamp()
+            if not self._loaded or reviews_stamp != self._reviews_stamp:
+                if self._loaded and self._only_journal_grew(reviews_stamp):
+                    # 다른 프로세스가 저널에 추가만 했으면 새 레코드만 적용 (전체 다시 로드 X)
+                    self._replay_journal_tail()
+                else:
+                    self._load_reviews()
+
+            self._loaded = True
+
+    def _current_reviews_stamp(self) -> tuple:
+        # 저널 모드에서는 스냅샷과 저널 중 하나만 바뀌어도 다시 읽어야 함
+        if self.review_storage == "journal":
+            return (file_stamp(self.reviews_file), file_stamp(self.journal_file))
+        return (file_stamp(self.reviews_file),)
+
+    def _load_movies(self):
+        self.movies = {m["id"]: normalize_record(Movie, m) for m in load_data(self.movies_file)}
+        self.movie_ids = SortedList(self.movies)
+        self.movie_index.rebuild(self.movies.values())
+        self._epoch += 1
+        self.last_movie_id = read_counter(MOVIE_ID_FILE, self.movies.keys())
+        self._movies_dirty = False
+        self._movies_stamp = file_stamp(self.movies_file)
+
+    def _load_reviews(self):
+        self.reviews = {}
+        self.reviews_by_movie = {}
+        self.sentiment_stats = {}
+        self.pending_review_ids = {}
+        self.stale_review_ids = SortedSet()
+        self._epoch += 1
+        self._bulk_loading = True
+        try:
+            snapshot = load_data(self.reviews_file)
+            for r in snapshot:
+                self.insert_review(normalize_review(r))
+            self._snapshot_records = len(snapshot)
+
+            self._journal_records = 0
+            self._journal_offset = 0
+            if self.review_storage == "journal":
+                ops, self._journal_offset = self._read_journal()
+                for op in ops:
+                    self._apply_op(op)
+                    self._journal_records += 1
+        finally:
+            self._bulk_loading = False
+        self.review_index.rebuild(self.reviews.values())
+
+        self._pending_review_ops = []
+        self.last_review_id = read_counter(REVIEW_ID_FILE, self.reviews.keys())
+        self._reviews_stamp = self._current_reviews_stamp()
+
+    def _read_journal(self, offset: int = 0) -> tuple:
+        """offset 위치부터 저널 레코드를 읽어서 (레코드 목록, 다 읽은 위치) 반환"""
+        try:
+            with open(self.journal_file, "rb") as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], 0
+
+        ops = []
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break  # 아직 쓰는 중인 줄 - 다음에 다시 읽음
+            if line.strip():
+                try:
+                    ops.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # 쓰다가 서버가 죽으면 마지막 줄이 잘려 있을 수 있음 - 그 줄은 버림
+                    break
+            offset += len(line)
+        return ops, offset
+
+    def _only_journal_grew(self, reviews_stamp: tuple) -> bool:
+        # 스냅샷은 그대로이고 저널이 이미 읽은 위치보다 길어지기만 했는지
+        if self.review_storage != "journal" or reviews_stamp[0] != self._reviews_stamp[0]:
+            return False
+        journal_stamp = reviews_stamp[1]
+        return journal_stamp is not None and journal_stamp[1] >= self._journal_offset
+
+    def _replay_journal_tail(self):
+        ops, self._journal_offset = self._read_journal(self._journal_offset)
+        for op in ops:
+            self._apply_op(op)
+            self._journal_records += 1
+        self._pending_review_ops = []
+        self.last_review_id = max(self.last_review_id, read_counter(REVIEW_ID_FILE, self.reviews.keys()))
+        self._reviews_stamp = self._current_reviews_stamp()
+
+    def _apply_op(self, op: dict):
+        # put/del 레코드는 여러 번 적용해도 결과가 같음 (압축 도중 죽어도 replay 안전)
+        if op["op"] == "put":
+            self.insert_review(normalize_review(op["review"]))
+        elif op["op"] == "del":
+            self.remove_review(op["id"])
+
+    def save_movies(self):
+        save_data(self.movies_file, list(self.movies.values()))
+        write_file_atomic(MOVIE_ID_FILE, str(self.last_movie_id))
+        self._movies_dirty = False
+        self._movies_stamp = file_stamp(self.movies_file)
+
+    def save_reviews(self):
+        write_file_atomic(REVIEW_ID_FILE, str(self.last_review_id))
+        if self.review_storage == "journal":
+            self._append_journal()
+        else:
+            save_data(self.reviews_file, list(self.reviews.values()))
+            self._snapshot_records = len(self.reviews)
+        self._pending_review_ops = []
+        self._reviews_stamp = self._current_reviews_stamp()
+
+    # ---저널---
+
+    def _append_journal(self):
+        if not self._pending_review_ops:
+            return
+
+        lines = "".join(json.dumps(op, ensure_ascii=False) + "\n" for op in self._pending_review_ops)
+        data = lines.encode("utf-8")
+        with open(self.journal_file, "ab") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_records += len(self._pending_review_ops)
+        self._journal_offset += len(data)
+
+        if self._needs_compaction():
+            self._compacting = True
+            threading.Thread(target=self.compact, daemon=True).start()
+
+    def _needs_compaction(self) -> bool:
+        if self._compacting:
+            return False
+        if self._journal_records >= config.JOURNAL_COMPACT_MAX_RECORDS:
+            return True
+        return (self._journal_records >= config.JOURNAL_COMPACT_MIN_RECORDS
+                and self._journal_records >= config.JOURNAL_COMPACT_RATIO * max(self._snapshot_records, 1))
+
+    def compact(self):
+        """
+        저널을 스냅샷(reviews.json)으로 합치기
+
+        스냅샷 파일 쓰기(O(전체 리뷰))는 잠금 밖에서 하고,
+        그 사이에 새로 추가된 저널 레코드만 남겨서 저널을 교체함
+        """
+        try:
+            with self.lock:
+                rows = list(self.reviews.values())
+                journal_offset = self._journal_offset
+                records_at_start = self._journal_records
+                snapshot_stamp = file_stamp(self.reviews_file)
+
+            snapshot_tmp = self.reviews_file + ".compact"
+            save_data(snapshot_tmp, rows)
+
+            with self.lock, file_lock():
+                if file_stamp(self.reviews_file) != snapshot_stamp:
+                    # 그사이 다른 프로세스가 먼저 압축함 - 이번 스냅샷은 버림
+                    os.remove(snapshot_tmp)
+                    return
+                self.refresh()  # 다른 프로세스가 추가한 저널 레코드까지 반영된 상태에서 교체
+
+                # 스냅샷을 만드는 동안 추가된 레코드 (스냅샷에 포함되지 않은 부분)
+                tail = b""
+                if os.path.exists(self.journal_file):
+                    with open(self.journal_file, "rb") as f:
+                        f.seek(journal_offset)
+                        tail = f.read()
+
+                journal_tmp = self.journal_file + ".tmp"
+                with open(journal_tmp, "wb") as f:
+                    f.write(tail)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+                # 스냅샷 교체 후 저널 교체 - 둘 사이에 죽어도 저널 replay가 멱등이라 안전
+                os.replace(snapshot_tmp, self.reviews_file)
+                os.replace(journal_tmp, self.journal_file)
+
+                self._snapshot_records = len(rows)
+                self._journal_records -= records_at_start
+                self._journal_offset -= journal_offset
+                self._reviews_stamp = self._current_reviews_stamp()
+        finally:
+            self._compacting = False
+
+    # ---인덱스 관리---
+
+    def _index_review(self, review: dict):
+        self.reviews_by_movie.setdefault(review["movie_id"], {})[review["id"]] = None
+        self._add_to_stats(review, 1)
+        if review.get("sentiment_status") == "pending":
+            self.pending_review_ids[review["id"]] = None
+        elif review.get("sentiment_score") is not None and review.get("scoring_version") != config.SCORING_VERSION:
+            self.stale_review_ids.add(review["id"])
+        if not self._bulk_loading:
+            self.review_index.add(review)
+            self._bump_version("reviews", f"reviews:{review['movie_id']}")
+
+    def _unindex_review(self, review: dict):
+        movie_reviews = self.reviews_by_movie.get(review["movie_id"])
+        if movie_reviews is not None:
+            movie_reviews.pop(review["id"], None)
+            if not movie_reviews:
+                del self.reviews_by_movie[review["movie_id"]]
+        self._add_to_stats(review, -1)
+        self.pending_review_ids.pop(review["id"], None)
+        self.stale_review_ids.discard(review["id"])
+        if not self._bulk_loading:
+            self.review_index.remove(review)
+            self._bump_version("reviews", f"reviews:{review['movie_id']}")
+
+    def _add_to_stats(self, review: dict, sign: int):
+        # sentiment_score가 있는 리뷰만 집계 (sign: 추가 1, 제거 -1)
+        score = review.get("sentiment_score")
+        if score is None:
+            return
+
+        stats = self.sentiment_stats.setdefault(
+            review["movie_id"], {"count": 0, "sum": 0.0, "sum_sq": 0.0, "versions": {}}
+        )
+        stats["count"] += sign
+        stats["sum"] += sign * score
+        stats["sum_sq"] += sign * score * score
+
+        # 채점 버전별 리뷰 수 (현재 버전 비율 계산용)
+        version = review.get("scoring_version")
+        versions = stats["versions"]
+        versions[version] = versions.get(version, 0) + sign
+        if versions[version] <= 0:
+            del versions[version]
+
+        if stats["count"] <= 0:
+            del self.sentiment_stats[review["movie_id"]]
+
+    def rebuild_sentiment_stats(self):
+        """누적 집계를 전체 리뷰에서 다시 계산 (덧셈/뺄셈을 반복하며 생긴 부동소수점 오차 정리용)"""
+        self.sentiment_stats = {}
+        for review in self.reviews.values():
+            self._add_to_stats(review, 1)
+
+    # ---데이터 버전---
+
+    def _bump_version(self, *scopes: str):
+        self._version_seq += 1
+        for scope in scopes:
+            self.versions[scope] = self._version_seq
+
+    def data_version(self, scopes) -> str:
+        return ".".join([PROCESS_TOKEN, str(self._epoch)] + [str(self.versions.get(scope, 0)) for scope in scopes])
+
+    # ---변경 작업 (호출 전에 lock을 잡고 refresh 되어 있어야 함)---
+
+    def put_movie(self, movie: dict):
+        old = self.movies.get(movie["id"])
+        if old is None:
+            self.movie_ids.add(movie["id"])
+        else:
+            self.movie_index.remove(old)
+        self.movie_index.add(movie)
+        self.movies[movie["id"]] = movie  # 기존 키면 순서도 유지됨
+        self._movies_dirty = True
+        self._bump_version("movies", f"movie:{movie['id']}")
+
+    def remove_movie(self, movie_id: int) -> Optional[dict]:
+        movie = self.movies.pop(movie_id, None)
+        if movie is not None:
+            self.movie_ids.discard(movie_id)
+            self.movie_index.remove(movie)
+            self._movies_dirty = True
+            self._bump_version("movies", f"movie:{movie_id}")
+        return movie
+
+    def insert_review(self, review: dict):
+        old = self.reviews.get(review["id"])
+        if old is not None:
+            self._unindex_review(old)
+        self.reviews[review["id"]] = review
+        self._index_review(review)
+        self._pending_review_ops.append({"op": "put", "review": review})
+
+    def remove_review(self, review_id: int) -> Optional[dict]:
+        review = self.reviews.pop(review_id, None)
+        if review is not None:
+            self._unindex_review(review)
+            self._pending_review_ops.append({"op": "del", "id": review_id})
+        return review
+
+
+    def flush(self):
+        """배치에서 바뀐 파일만 한 번씩 기록"""
+        if self._movies_dirty:
+            self.save_movies()
+        if self._pending_review_ops:
+            self.save_reviews()
+
+# ---그룹 커밋 쓰기 큐---
+
+class CommitQueue:
+    """
+    변경 작업을 한 줄로 세워서 writer 스레드 하나가 처리하는 큐 (single writer)
+
+    핸들러는 변경 함수(mutation)를 넣고 Future로 결과를 기다림
+    writer는 그동안 쌓인 변경을 한 번에 메모리에 적용하고 파일은 배치당 한 번만 기록함
+    - 여러 스레드가 load/save를 동시에 하며 리뷰/ID가 사라지던 문제 해결
+    - 요청이 몰릴 때 디스크 쓰기 횟수가 요청 수가 아니라 배치 수만큼만 발생
+    """
+
+    def __init__(self, repo: JsonRepository, max_batch_size: int = 256):
+        self.repo = repo
+        self.max_batch_size = max_batch_size
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, mutation: Callable[[JsonRepository], object]) -> Future:
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((mutation, future))
+        return future
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]  # 첫 작업이 올 때까지 대기
+            # 그동안 쌓인 작업을 한꺼번에 가져오기
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._commit(batch)
+
+    def _commit(self, batch: List[tuple]):
+        results = []
+        # 다른 프로세스(rescore.py 등)도 같은 파일에 쓸 수 있으므로 파일 잠금 안에서 다시 읽고 적용/기록
+        with self.repo.lock, file_lock():
+            self.repo.refresh()
+            for mutation, future in batch:
+                try:
+                    results.append((future, mutation(self.repo), None))
+                except Exception as e:
+                    results.append((future, None, e))
+
+            try:
+                self.repo.flush()
+            except Exception as e:
+                # 파일 기록 실패 - 메모리와 파일이 달라졌으므로 다음 접근 때 파일에서 다시 로드
+                self.repo._loaded = False
+                for future, _, _ in results:
+                    future.set_exception(e)
+                return
+
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+
+# 서버 전체에서 공유하는 저장소 (import 시점이 아니라 첫 접근 시 파일을 읽음)
+_repo = JsonRepository(MOVIES_FILE, REVIEWS_FILE,
+                       review_storage=config.REVIEW_STORAGE,
+                       journal_file=config.REVIEWS_JOURNAL_FILE)
+_commit_queue = CommitQueue(_repo, max_batch_size=config.COMMIT_MAX_BATCH_SIZE)
+
+
+def get_repository() -> JsonRepository:
+    _repo.refresh()
+    return _repo
+
+# 변경 작업을 writer 스레드에 맡기고 결과를 기다림
+def commit(mutation: Callable[[JsonRepository], object]):
+    return _commit_queue.submit(mutation).result()
 
 # ---영화 데이터 함수---
 
 # 모든 영화 목록 조회
+# *_records 함수는 모델 대신 저장된 dict를 그대로 반환 (API 응답을 바로 직렬화하는 용도 - 읽기 전용으로만 사용)
+# 저장된 dict는 고치지 않고 항상 새 dict로 교체하므로 잠금 밖에서 읽어도 안전함
+def get_all_movie_records() -> List[dict]:
+    repo = get_repository()
+    with repo.lock:
+        return list(repo.movies.values())
+
 def get_all_movies() -> List[Movie]:
-    data = load_data(MOVIES_FILE)
-    return [Movie(**item) for item in data]  # 리스트로 반환
+    return [Movie(**item) for item in get_all_movie_records()]  # 리스트로 반환
+
+# 모든 영화 + 리뷰 수 / 평균 감성 점수 / 최근 리뷰 시간 (홈 화면용)
+# 영화별 인덱스와 누적 집계에서 바로 읽으므로 리뷰 수와 상관없이 O(영화 수)
+def get_movie_summary_records() -> List[dict]:
+    repo = get_repository()
+    with repo.lock:
+        summaries = []
+        for movie in repo.movies.values():
+            stats = repo.sentiment_stats.get(movie["id"])
+            created = repo.review_index.movie_by_created.get(movie["id"])
+            summaries.append({
+                **movie,
+                "review_count": len(repo.reviews_by_movie.get(movie["id"], ())),
+                "average_sentiment": stats["sum"] / stats["count"] if stats else None,
+                "latest_review_at": (created[-1][0] or None) if created else None,
+            })
+    return summaries
+
+def get_movie_summaries() -> List[MovieSummary]:
+    return [MovieSummary(**summary) for summary in get_movie_summary_records()]
+
+# 영화 목록 한 페이지 조회 (ID 순서, after_id 다음부터 최대 limit개) - (영화 목록, 다음 페이지의 after_id 또는 None)
+def list_movie_records(limit: int, after_id: Optional[int] = None) -> Tuple[List[dict], Optional[int]]:
+    repo = get_repository()
+    with repo.lock:
+        start = repo.movie_ids.bisect_right(after_id) if after_id is not None else 0
+        # 다음 페이지가 있는지 확인하려고 1개 더 읽음
+        data = [repo.movies[movie_id] for movie_id in repo.movie_ids.islice(start, start + limit + 1)]
+    next_id = data[limit - 1]["id"] if len(data) > limit else None
+    return data[:limit], next_id
+
+def list_movies(limit: int, after_id: Optional[int] = None) -> Tuple[List[Movie], Optional[int]]:
+    movies, next_id = list_movie_records(limit, after_id)
+    return [Movie(**item) for item in movies], next_id
+
+# 영화 검색 (ID 순서, after_id 다음부터 최대 limit개) - (영화 목록, 다음 페이지의 after_id 또는 None)
+# - genres: 장르 목록 (genre_mode "any": 하나라도 포함 / "all": 전부 포함), director: 감독 이름 (전체 일치)
+# - title_prefix: 제목 접두어, released_from <= release_date < released_to (대소문자/앞뒤 공백 무시)
+# 장르/감독 역색인, 개봉일/제목 정렬 인덱스 중 후보가 가장 적은 것만 확인함 (전체 영화를 훑지 않음)
+def search_movie_records(limit: Optional[int] = None, after_id: Optional[int] = None,
+                         genres: Optional[List[str]] = None, genre_mode: str = "any",
+                         director: Optional[str] = None, title_prefix: Optional[str] = None,
+                         released_from: Optional[str] = None, released_to: Optional[str] = None) -> Tuple[List[dict], Optional[int]]:
+    repo = get_repository()
+    with repo.lock:
+        return repo.movie_index.search(
+            repo.movies, repo.movie_ids, limit=limit, after_id=after_id, genres=genres, genre_mode=genre_mode,
+            director=director, title_prefix=title_prefix, released_from=released_from, released_to=released_to,
+        )
+
+def search_movies(limit: Optional[int] = None, after_id: Optional[int] = None,
+                  genres: Optional[List[str]] = None, genre_mode: str = "any",
+                  director: Optional[str] = None, title_prefix: Optional[str] = None,
+                  released_from: Optional[str] = None, released_to: Optional[str] = None) -> Tuple[List[Movie], Optional[int]]:
+    movies, next_id = search_movie_records(
+        limit, after_id=after_id, genres=genres, genre_mode=genre_mode, director=director,
+        title_prefix=title_prefix, released_from=released_from, released_to=released_to,
+    )
+    return [Movie(**item) for item in movies], next_id
 
-# 영화 ID로 조회
+# 영화 ID로 조회 - dict 조회라 O(1)
 def get_movie_by_id(movie_id: int) -> Optional[Movie]:
-    data = load_data(MOVIES_FILE)
-    for movie in data:
-        if movie.get("id") == movie_id:
-            return Movie(**movie)
-    return None
+    movie = get_repository().movies.get(movie_id)
+    if movie is None:
+        return None
+    return Movie(**movie)
+
+# 등록된 영화 ID 전체 (대량 등록 시 영화 존재 여부를 한 번에 확인하는 용도)
+def get_movie_ids() -> set:
+    repo = get_repository()
+    with repo.lock:
+        return set(repo.movies)
 
 # 새로운 영화 등록 - DB 관련 트러블슈팅으로 디버깅 / 코드가 불완전해서 다시 디버깅
 def add_movie(movie: Movie) -> Movie:
-    data = load_data(MOVIES_FILE)  # 기존 영화 리스트 불러오기
+    def mutation(repo: JsonRepository) -> Movie:
+        # ID 자동 생성 - 역대 최대 ID 추적 (삭제된 것도 포함)
+        repo.last_movie_id += 1
+        movie.id = repo.last_movie_id
 
-    # ID 자동 생성 - 역대 최대 ID 추적 (삭제된 것도 포함)
-    # 파일에서 지금까지 사용된 가장 큰 ID를 찾아서 +1
-    id_counter_file = 'last_movie_id.txt'
-    
-    try:
-        with open(id_counter_file, 'r') as f:
-            last_id = int(f.read().strip())
-    except FileNotFoundError:
-        # 파일이 없으면 현재 데이터에서 최대값 찾기
-        last_id = max([item["id"] for item in data], default=0)
-
-    # 새 ID 할당
-    movie.id = last_id + 1
-    
-    # 새 ID를 파일에 저장
-    with open(id_counter_file, 'w') as f:
-        f.write(str(movie.id))
-    
-    # 영화 데이터에 추가하고 저장 (이 부분이 빠졌었음)
-    data.append(movie.model_dump())
-    save_data(MOVIES_FILE, data)
-    return movie
-
-    
-
-# 영화 삭제
-def delete_movie(movie_id: int) -> bool:
-    data = load_data(MOVIES_FILE)  # 기존 영화 리스트 불러오기
-    original_length = len(data)
-
-    # 해당 ID가 아닌 영화들만 남겨놓기 (필터링)
-    data = [movie for movie in data if movie["id"] != movie_id]
-    
-    # 실제로 삭제되었는지 확인 (리스트 길이가 줄었으면 삭제 성공)
-    if len(data) < original_length:
-        save_data(MOVIES_FILE, data)
-        return True
-    return False
+        # 영화 데이터에 추가 (파일 저장은 writer가 배치 단위로)
+        repo.put_movie(movie.model_dump())
+        return movie
+
+    return commit(mutation)
+
+# 영화 정보 수정 (id는 그대로 유지)
+def update_movie(movie_id: int, movie: Movie) -> Optional[Movie]:
+    def mutation(repo: JsonRepository) -> Optional[Movie]:
+        if movie_id not in repo.movies:
+            return None
+
+        movie.id = movie_id
+        repo.put_movie(movie.model_dump())
+        return movie
+
+    return commit(mutation)
+
+# 영화와 그 영화의 리뷰를 한 번에 삭제 - 삭제된 리뷰 개수 반환 (영화가 없으면 None)
+# 하나의 mutation이라 사이에 같은 영화로 리뷰가 등록되어 리뷰만 남는 일이 없음
+def delete_movie_with_reviews(movie_id: int) -> Optional[int]:
+    def mutation(repo: JsonRepository) -> Optional[int]:
+        if repo.remove_movie(movie_id) is None:
+            return None
+
+        review_ids = list(repo.reviews_by_movie.get(movie_id, {}))
+        for review_id in review_ids:
+            repo.remove_review(review_id)
+        return len(review_ids)
+
+    return commit(mutation)
 
 # ---리뷰 관련 함수---
 
+# 리뷰 ID로 조회
+def get_review_by_id(review_id: int) -> Optional[Review]:
+    review = get_repository().reviews.get(review_id)
+    if review is None:
+        return None
+    return Review(**review)
+
 # 모든 리뷰 조회
+def get_all_review_records() -> List[dict]:
+    repo = get_repository()
+    with repo.lock:
+        return list(repo.reviews.values())
+
 def get_all_reviews() -> List[Review]:
-    data = load_data(REVIEWS_FILE)
-    return [Review(**review) for review in data]  # 대소문자 수정
+    return [Review(**review) for review in get_all_review_records()]  # 대소문자 수정
+
+# 리뷰 목록 조회 (keyset 페이지네이션 + 필터) - (리뷰 목록, 다음 페이지의 after 키 또는 None)
+# - order_by: "id" 또는 "created_at", after: 이전 페이지가 돌려준 키 ((id,) 또는 (created_at, id))
+# - 필터: movie_id, created_from <= created_at < created_to, min_score <= sentiment_score <= max_score
+# 정렬 인덱스에서 after 위치를 bisect로 찾아 limit개가 찰 때까지만 읽음 (전체 리뷰를 정렬하지 않음)
+def list_review_records(limit: Optional[int] = None, after: Optional[tuple] = None, order_by: str = "id",
+                        desc: bool = False, movie_id: Optional[int] = None,
+                        created_from: Optional[str] = None, created_to: Optional[str] = None,
+                        min_score: Optional[float] = None, max_score: Optional[float] = None) -> Tuple[List[dict], Optional[tuple]]:
+    repo = get_repository()
+    with repo.lock:
+        return repo.review_index.query(
+            repo.reviews, limit=limit, after=after, order_by=order_by, desc=desc, movie_id=movie_id,
+            created_from=created_from, created_to=created_to, min_score=min_score, max_score=max_score,
+        )
+
+def list_reviews(limit: Optional[int] = None, after: Optional[tuple] = None, order_by: str = "id",
+                 desc: bool = False, movie_id: Optional[int] = None,
+                 created_from: Optional[str] = None, created_to: Optional[str] = None,
+                 min_score: Optional[float] = None, max_score: Optional[float] = None) -> Tuple[List[Review], Optional[tuple]]:
+    reviews, next_key = list_review_records(
+        limit, after=after, order_by=order_by, desc=desc, movie_id=movie_id,
+        created_from=created_from, created_to=created_to, min_score=min_score, max_score=max_score,
+    )
+    return [Review(**review) for review in reviews], next_key
+
+# 최근 리뷰 limit개 (작성 시간 내림차순) + 영화 제목
+# 작성 시간 인덱스의 끝에서 limit개만 읽으므로 전체 리뷰 수와 상관없이 O(limit)
+def get_recent_review_records(limit: int) -> List[dict]:
+    repo = get_repository()
+    with repo.lock:
+        by_created = repo.review_index.by_created
+        keys = by_created.islice(max(len(by_created) - limit, 0), reverse=True)
+        recent = []
+        for _, review_id in keys:
+            review = repo.reviews[review_id]
+            movie = repo.movies.get(review["movie_id"])
+            recent.append({**review, "movie_title": movie["title"] if movie else None})
+    return recent
+
+def get_recent_reviews(limit: int) -> List[RecentReview]:
+    return [RecentReview(**review) for review in get_recent_review_records(limit)]
+
+# 특정 영화 리뷰 조회 - 영화별 인덱스를 사용해서 해당 영화 리뷰만 확인
+def get_review_records_by_movie(movie_id: int) -> List[dict]:
+    repo = get_repository()
+    with repo.lock:
+        review_ids = repo.reviews_by_movie.get(movie_id, {})
+        return [repo.reviews[review_id] for review_id in review_ids]
 
-# 특정 영화 리뷰 조회
 def get_reviews_by_movie(movie_id: int) -> List[Review]:
-    reviews = load_data(REVIEWS_FILE)
-    # 해당 영화 ID와 일치하는 리뷰만 필터링
-    movie_reviews = [r for r in reviews if r["movie_id"] == movie_id]
-    return [Review(**review) for review in movie_reviews]
+    return [Review(**review) for review in get_review_records_by_movie(movie_id)]
+
+# 특정 영화의 리뷰 ID 목록 (리뷰 데이터 없이 ID만 - 감정 분포 집계용)
+def get_review_ids_by_movie(movie_id: int) -> List[int]:
+    repo = get_repository()
+    with repo.lock:
+        return list(repo.reviews_by_movie.get(movie_id, ()))
+
+# 등록된 리뷰 ID 전체 (감정 분포 파일을 정리할 때 삭제된 리뷰의 레코드를 버리는 용도)
+def get_review_ids() -> List[int]:
+    repo = get_repository()
+    with repo.lock:
+        return list(repo.reviews)
 
 # 새 리뷰 등록 - 얘도 디버깅 또 또 ...
-def create_review(review: Review) -> Review:
-    reviews = load_data(REVIEWS_FILE)
+# 영화가 없으면 (그 사이에 삭제됐으면) 저장하지 않고 None
+def create_review(review: Review) -> Optional[Review]:
+    def mutation(repo: JsonRepository) -> Optional[Review]:
+        # 영화 존재 확인은 쓰기 스레드 안에서 (영화 삭제와 엇갈려도 영화 없는 리뷰가 남지 않도록)
+        if review.movie_id not in repo.movies:
+            return None
 
-    # ID 자동 생성
-    id_counter_file = 'last_review_id.txt'
-    
-    try:
-        with open(id_counter_file, 'r') as f:
-            last_id = int(f.read().strip())
-    except FileNotFoundError:
-        last_id = max([r["id"] for r in reviews], default=0)
-    
-    review.id = last_id + 1
-    
-    with open(id_counter_file, 'w') as f:
-        f.write(str(review.id))
-
-    # 작성 시간 자동 생성
-    review.created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # 리뷰 추가하고 저장 (이 부분도 있어야 했음)
-    reviews.append(review.model_dump())
-    save_data(REVIEWS_FILE, reviews)
-    return review
+        # ID 자동 생성
+        repo.last_review_id += 1
+        review.id = repo.last_review_id
+
+        # 작성 시간 자동 생성
+        review.created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        # 리뷰 추가 (이 부분도 있어야 했음)
+        repo.insert_review(review.model_dump())
+        return review
+
+    return commit(mutation)
+
+# 리뷰 여러 개를 한 번에 등록 (파일 기록은 한 번) - created_at이 있으면 그대로 유지 (과거 리뷰 가져오기용)
+# 입력과 같은 순서로 반환, 영화가 없어서 저장하지 않은 리뷰는 None
+def create_reviews_bulk(reviews: List[Review]) -> List[Optional[Review]]:
+    def mutation(repo: JsonRepository) -> List[Optional[Review]]:
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        created = []
+        for review in reviews:
+            if review.movie_id not in repo.movies:
+                created.append(None)
+                continue
+            repo.last_review_id += 1
+            review.id = repo.last_review_id
+            review.created_at = review.created_at or now
+            repo.insert_review(review.model_dump())
+            created.append(review)
+        return created
+
+    return commit(mutation)
 
 # 특정 리뷰 삭제
 def delete_review(review_id: int) -> bool:
-    reviews = load_data(REVIEWS_FILE)
-    original_length = len(reviews)
-    
-    # 해당 ID가 아닌 리뷰들만 남기기
-    reviews = [r for r in reviews if r["id"] != review_id]
-    
-    if len(reviews) < original_length:
-        save_data(REVIEWS_FILE, reviews)
-        return True
-    return False
+    return commit(lambda repo: repo.remove_review(review_id) is not None)
+
+# 감성 분석 대기 중인 리뷰 조회 (오래된 것부터 최대 limit개)
+def get_pending_reviews(limit: int) -> List[Review]:
+    repo = get_repository()
+    with repo.lock:
+        pending = []
+        for review_id in repo.pending_review_ids:
+            pending.append(repo.reviews[review_id])
+            if len(pending) >= limit:
+                break
+    return [Review(**review) for review in pending]
+
+# ID가 after_id보다 큰 리뷰 수 (rescore.py 진행률/ETA 계산용)
+def count_reviews_after(after_id: int) -> int:
+    repo = get_repository()
+    with repo.lock:
+        by_id = repo.review_index.by_id
+        return len(by_id) - by_id.bisect_right((after_id,))
+
+# ID가 after_id보다 큰 리뷰를 ID 순서대로 batch_size개씩 (시작 시점의 ID 목록 기준)
+def iter_review_batches(after_id: int, batch_size: int) -> Iterator[List[Review]]:
+    repo = get_repository()
+    with repo.lock:
+        by_id = repo.review_index.by_id
+        review_ids = [key[0] for key in by_id.islice(by_id.bisect_right((after_id,)))]
+
+    for start in range(0, len(review_ids), batch_size):
+        repo = get_repository()
+        with repo.lock:
+            # 그사이 삭제된 리뷰는 건너뜀
+            batch = [repo.reviews[review_id] for review_id in review_ids[start:start + batch_size]
+                     if review_id in repo.reviews]
+        yield [Review(**review) for review in batch]
+
+# 현재 버전이 아닌 점수를 가진 리뷰 조회 (after_id보다 큰 ID 중 최대 limit개)
+def get_stale_reviews(limit: int, after_id: int = 0) -> List[Review]:
+    repo = get_repository()
+    with repo.lock:
+        # ID 정렬 집합에서 after_id 다음 위치부터 limit개 (저널 재생 등으로 추가 순서가 ID 순서와 달라도 빠지지 않음)
+        start = repo.stale_review_ids.bisect_right(after_id)
+        stale = [repo.reviews[review_id] for review_id in repo.stale_review_ids.islice(start, start + limit)]
+    return [Review(**review) for review in stale]
+
+# 현재 버전이 아닌 점수를 가진 리뷰 수
+def count_stale_reviews() -> int:
+    repo = get_repository()
+    with repo.lock:
+        return len(repo.stale_review_ids)
+
+# 리뷰 감성 점수 채우기 {review_id: score} - 그사이 삭제된 리뷰는 건너뜀, 갱신된 개수 반환
+# (점수 버전은 현재 설정의 config.SCORING_VERSION으로 기록)
+def update_review_scores(scores: Dict[int, float]) -> int:
+    def mutation(repo: JsonRepository) -> int:
+        updated = 0
+        for review_id, score in scores.items():
+            review = repo.reviews.get(review_id)
+            if review is None:
+                continue
+            # 저장된 dict를 직접 고치지 않고 새 dict로 교체 (인덱스/집계도 같이 갱신됨)
+            repo.insert_review({**review, "sentiment_score": score, "sentiment_status": "done",
+                                "scoring_version": config.SCORING_VERSION})
+            updated += 1
+        return updated
+
+    return commit(mutation)
+
+# 특정 영화의 감성 점수 통계 (리뷰 수, 평균, 분산, 현재 버전으로 채점된 리뷰 수) - 누적 집계를 사용해서 O(1)
+def get_sentiment_stats(movie_id: int) -> Optional[dict]:
+    repo = get_repository()
+    with repo.lock:
+        stats = repo.sentiment_stats.get(movie_id)
+        if stats is None:
+            return None
+        count, total, total_sq = stats["count"], stats["sum"], stats["sum_sq"]
+        current_count = stats["versions"].get(config.SCORING_VERSION, 0)
+
+    average = total / count
+    # E[X^2] - E[X]^2 (오차로 아주 작은 음수가 나오는 경우 0으로)
+    variance = max(total_sq / count - average * average, 0.0)
+    return {"count": count, "average": average, "variance": variance, "current_count": current_count}
 
 # 특정 영화의 평균 감성 점수 계산
 def get_average_sentiment(movie_id: int) -> Optional[float]:
-    reviews = get_reviews_by_movie(movie_id)
-    
-    # sentiment_score가 있는 리뷰만 필터링
-    scores = [r.sentiment_score for r in reviews if r.sentiment_score is not None]
-    
-    if not scores:
+    stats = get_sentiment_stats(movie_id)
+    if stats is None:
         return None
-    
-    return sum(scores) / len(scores)
\ No newline at end of file
+    return stats["average"]
+
+# 감성 점수 누적 집계를 처음부터 다시 계산
+def rebuild_sentiment_stats():
+    repo = get_repository()
+    with repo.lock:
+        repo.rebuild_sentiment_stats()
+
+# ---데이터 버전 (ETag)---
+
+# scope들의 현재 데이터 버전을 합친 문자열 - 그중 하나라도 바뀌면 값이 달라짐 (조회 결과를 만들지 않고 확인만)
+# scope: "movies", "movie:<id>", "reviews", "reviews:<movie_id>"
+def get_data_version(*scopes: str) -> str:
+    repo = get_repository()
+    with repo.lock:
+        return repo.data_version(scopes)
+
+# ---저장소 선택---
+
+# DB_BACKEND=sqlite 이면 위 함수들을 같은 이름의 SQLite 구현으로 교체
+# (main.py는 항상 database 모듈만 사용하면 됨)
+if config.DB_BACKEND == "sqlite":
+    from sqlite_db import (  # noqa: E402,F811
+        get_all_movie_records,
+        get_all_movies,
+        list_movie_records,
+        list_movies,
+        search_movie_records,
+        search_movies,
+        get_movie_summary_records,
+        get_movie_summaries,
+        get_movie_by_id,
+        get_movie_ids,
+        add_movie,
+        update_movie,
+        delete_movie_with_reviews,
+        get_review_by_id,
+        get_all_review_records,
+        get_all_reviews,
+        list_review_records,
+        list_reviews,
+        get_recent_review_records,
+        get_recent_reviews,
+        get_review_records_by_movie,
+        get_reviews_by_movie,
+        get_review_ids_by_movie,
+        get_review_ids,
+        create_review,
+        create_reviews_bulk,
+        delete_review,
+        get_pending_reviews,
+        get_stale_reviews,
+        count_stale_reviews,
+        count_reviews_after,
+        iter_review_batches,
+        update_review_scores,
+        get_sentiment_stats,
+        get_average_sentiment,
+        rebuild_sentiment_stats,
+        get_data_version,
+    )
@@ -0,0 +1,185 @@
+# 리뷰별 11개 감정 확률 저장소
+# 감성 점수(float 하나)로 줄이기 전의 감정 분포를 버리지 않고 float16으로 따로 저장해서
+# 모델을 다시 돌리지 않고도 영화별 감정 분포 같은 분석을 할 수 있게 함
+#
+# 파일 형식: (리뷰 ID int64 + 감정 확률 float16 x 11) 30바이트 레코드를 계속 이어 붙임
+# - 같은 리뷰 ID가 여러 번 있으면 마지막 레코드가 최신 (재채점해도 덮어쓰지 않고 추가만)
+# - 리뷰를 삭제해도 바로 지우지 않고, 파일을 정리(compact)할 때 없는 리뷰의 레코드를 버림
+# - 저장소 종류(JSON / SQLite)와 상관없이 같은 파일 사용
+
+import os
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+import numpy as np
+import config
+import database as db
+from sentiment import EMOTION_LABELS
+
+RECORD_DTYPE = np.dtype([("id", "<i8"), ("probs", "<f2", (len(EMOTION_LABELS),))])
+
+# 파일 레코드 수가 리뷰 수(중복 제외)나 마지막 정리 직후 레코드 수의 이 배수를 넘으면
+# 중복 레코드와 삭제된 리뷰의 레코드를 정리해서 다시 씀
+COMPACT_RATIO = 2
+COMPACT_MIN_RECORDS = 1000
+
+
+class EmotionStore:
+    """
+    리뷰 ID -> 감정 확률 벡터(float16)를 정렬된 numpy 배열 두 개로 메모리에 보관
+
+    - 조회: 리뷰 ID 배열을 searchsorted로 한 번에 찾아서 (k, 11) 행렬로 꺼냄 (리뷰별 파이썬 반복 없음)
+    - 쓰기: 파일 끝에 레코드 추가 + 메모리에는 모아 뒀다가 다음 조회 때 한 번에 합침
+    - 다른 프로세스(rescore.py 등)가 추가한 레코드는 파일 크기가 늘어난 만큼만 읽어서 반영
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._ids = np.empty(0, dtype=np.int64)  # 정렬된 리뷰 ID
+        self._probs = np.empty((0, len(EMOTION_LABELS)), dtype=np.float16)
+        self._pending = []       # 아직 합치지 않은 레코드 배열들
+        self._offset = 0         # 파일에서 읽은 위치 (바이트)
+        self._file_records = 0   # 파일에 있는 레코드 수 (중복 포함)
+        self._base_records = 0   # 마지막 정리 직후(또는 처음 읽었을 때)의 레코드 수
+        self._inode = None
+
+    # ---파일 동기화 (호출 전에 _lock을 잡고 있어야 함)---
+
+    def _sync(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            if self._inode is not None:
+                self._reset()
+            return
+
+        # 다른 프로세스가 정리(compact)해서 파일이 바뀌었으면 처음부터 다시 읽음
+        reloaded = stat.st_ino != self._inode or stat.st_size < self._offset
+        if reloaded:
+            self._reset()
+            self._inode = stat.st_ino
+
+        # 쓰는 중인 마지막 레코드(30바이트가 안 되는 부분)는 다음에 읽음
+        count = (stat.st_size - self._offset) // RECORD_DTYPE.itemsize
+        if count > 0:
+            self._pending.append(np.fromfile(self.path, dtype=RECORD_DTYPE, count=count, offset=self._offset))
+            self._offset += count * RECORD_DTYPE.itemsize
+            self._file_records += count
+        if reloaded:
+            self._base_records = self._file_records
+
+    def _merge(self):
+        if not self._pending:
+            return
+        records = np.concatenate(self._pending)
+        self._pending = []
+
+        ids = np.concatenate([self._ids, records["id"]])
+        probs = np.concatenate([self._probs, records["probs"]])
+        # 같은 ID는 나중 레코드가 최신 -> 뒤집어서 np.unique가 고르는 첫 위치 = 원래 마지막 위치
+        self._ids, first = np.unique(ids[::-1], return_index=True)
+        self._probs = probs[::-1][first]
+
+    def _needs_compaction(self) -> bool:
+        # 중복 레코드가 많거나, 삭제된 리뷰의 레코드가 쌓였을 수 있을 만큼 파일이 커졌을 때
+        return (self._file_records >= COMPACT_MIN_RECORDS
+                and (self._file_records > COMPACT_RATIO * len(self._ids)
+                     or self._file_records > COMPACT_RATIO * self._base_records))
+
+    def _compact(self, live_ids: np.ndarray):
+        # 리뷰마다 최신 레코드 하나만 남기고 삭제된 리뷰의 레코드는 버려서 파일 교체 (file_lock 안에서 호출)
+        # live_ids는 잠금 밖에서 미리 읽은 리뷰 ID라서 그 뒤에 생긴 리뷰(ID가 더 큼)는 남겨 둠
+        # (리뷰 ID는 줄어들지 않고 계속 커지므로 live_ids의 최대값 이하인데 없는 ID = 삭제된 리뷰)
+        keep = np.isin(self._ids, live_ids) | (self._ids > live_ids.max(initial=0))
+        self._ids = self._ids[keep]
+        self._probs = self._probs[keep]
+
+        records = np.empty(len(self._ids), dtype=RECORD_DTYPE)
+        records["id"] = self._ids
+        records["probs"] = self._probs
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(records.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+        self._offset = records.nbytes
+        self._file_records = len(records)
+        self._base_records = len(records)
+        self._inode = os.stat(self.path).st_ino
+
+    # ---읽기 / 쓰기---
+
+    def put_many(self, emotions: Dict[int, np.ndarray]):
+        """{리뷰 ID: 감정 확률 벡터} 저장"""
+        if not emotions:
+            return
+
+        records = np.empty(len(emotions), dtype=RECORD_DTYPE)
+        records["id"] = list(emotions.keys())
+        records["probs"] = np.stack(list(emotions.values()))
+
+        with self._lock, db.file_lock():
+            self._sync()  # 다른 프로세스가 먼저 추가한 레코드까지 읽어서 위치를 맞춤
+            with open(self.path, "ab") as f:
+                f.write(records.tobytes())
+            self._pending.append(records)
+            self._offset += records.nbytes
+            self._file_records += len(records)
+            if self._inode is None:
+                self._inode = os.stat(self.path).st_ino
+
+            compact = False
+            if self._file_records >= COMPACT_MIN_RECORDS:
+                self._merge()
+                compact = self._needs_compaction()
+
+        if compact:
+            self.compact()
+
+    def compact(self):
+        """중복 레코드와 삭제된 리뷰의 레코드를 정리해서 파일을 다시 씀"""
+        # 리뷰 ID는 잠금 밖에서 읽음 (저장소 writer가 repo.lock -> file_lock 순서로 잡으므로 반대로 잡으면 교착)
+        live_ids = np.fromiter(db.get_review_ids(), dtype=np.int64)
+        with self._lock, db.file_lock():
+            self._sync()
+            self._merge()
+            self._compact(live_ids)
+
+    def get_matrix(self, review_ids: Iterable[int]) -> np.ndarray:
+        """리뷰 ID들의 감정 확률 행렬 (k, 11) float16 - 감정 분포가 없는 리뷰는 빠짐"""
+        ids = np.fromiter(review_ids, dtype=np.int64)
+        with self._lock:
+            self._sync()
+            self._merge()
+            positions = np.searchsorted(self._ids, ids)
+            found = positions < len(self._ids)
+            found[found] = self._ids[positions[found]] == ids[found]
+            return self._probs[positions[found]]
+
+    def mean(self, review_ids: Iterable[int]) -> Optional[Tuple[np.ndarray, int]]:
+        """리뷰 ID들의 평균 감정 분포 (11,)와 감정 분포가 있는 리뷰 수 - 하나도 없으면 None"""
+        matrix = self.get_matrix(review_ids)
+        if len(matrix) == 0:
+            return None
+        # float16 그대로 더하면 오차가 커지므로 float32로 누적
+        return matrix.mean(axis=0, dtype=np.float32), len(matrix)
+
+
+# 서버 전체에서 공유하는 저장소 (처음 사용할 때 생성)
+_store: Optional[EmotionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> EmotionStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = EmotionStore(config.EMOTIONS_FILE)
+    return _store
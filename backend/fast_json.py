@@ -0,0 +1,25 @@
+# 조회 응답 JSON 직렬화
+# 저장소의 레코드는 쓸 때 모델로 한 번 검증된 dict이므로 조회할 때마다 모델 객체를 다시 만들어 검증하지 않고
+# dict 그대로 JSON 바이트로 만듦 (orjson이 있으면 orjson, 없으면 표준 json)
+
+import json
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # 선택 패키지 - 없으면 표준 json으로 동작 (느리지만 결과는 같음)
+    orjson = None
+
+
+def _default(value):
+    # 레코드 대신 모델 객체가 섞여 있어도 직렬화되도록 (영화 상세 조회 등)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"JSON으로 직렬화할 수 없는 타입: {type(value).__name__}")
+
+
+def dumps(data) -> bytes:
+    """dict / list / 모델 객체를 JSON 바이트로 (공백 없이, 한글은 그대로 UTF-8)"""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
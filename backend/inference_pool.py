@@ -0,0 +1,199 @@
+# 감성 분석 추론 전용 워커 프로세스 풀
+# 요청 스레드에서 바로 모델을 돌리면 torch 내부 스레드와 FastAPI 스레드풀이 같은 코어를 두고 경쟁함
+# -> 코어 수에 맞춰 추론 프로세스를 따로 두고, 프로세스마다 torch 스레드 수를 고정해서 큐로 작업을 받음
+
+import itertools
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+from typing import Dict, List, Optional
+import numpy as np
+import config
+import sentiment
+
+
+class PoolBusyError(Exception):
+    """대기 중인 추론 작업이 가득 차서 새 작업을 받을 수 없음 (backpressure)"""
+
+
+def _worker_main(task_queue, result_queue, num_threads: int):
+    # 자식 프로세스: torch 스레드 수 고정 후 작업 처리
+    import torch
+    torch.set_num_threads(num_threads)
+
+    while True:
+        task = task_queue.get()
+        if task is None:  # 종료 신호
+            break
+
+        task_id, texts = task
+        try:
+            # 점수가 아니라 감정 확률 (len(texts), 11)을 돌려줌 - 부모에서 점수와 감정 분포를 함께 사용
+            probabilities = sentiment.predict_texts(texts)
+            result_queue.put((task_id, probabilities, None))
+        except Exception as e:
+            result_queue.put((task_id, None, repr(e)))
+
+
+class InferencePool:
+    """
+    추론 워커 프로세스 풀
+
+    - 부모 프로세스에서 모델을 한 번 로드한 뒤 fork -> 가중치는 copy-on-write로 공유
+      (torch 백엔드 기준, 모델을 N번 로드하지 않음 / onnx 백엔드는 워커마다 세션을 만듦)
+    - 워커마다 torch 스레드 수를 threads_per_worker로 고정 (코어 과다 사용 방지)
+    - 작업 큐 크기를 max_pending으로 제한해서 밀리면 PoolBusyError로 거절 (backpressure)
+    """
+
+    def __init__(self, num_workers: int, threads_per_worker: int = 2, max_pending: int = 64):
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker
+        self.max_pending = max_pending
+
+        self._ctx = multiprocessing.get_context("fork")
+        self._task_queue = None
+        self._result_queue = None
+        self._processes: List[multiprocessing.Process] = []
+        self._futures: Dict[int, Future] = {}
+        self._deadlines: Dict[int, float] = {}  # task_id -> 결과를 기다리는 기한 (time.monotonic)
+        self._futures_lock = threading.Lock()
+        self._task_ids = itertools.count()
+        self._collector: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    @property
+    def started(self) -> bool:
+        return bool(self._processes)
+
+    def start(self):
+        with self._start_lock:
+            if self.started:
+                return
+
+            # fork 전에 부모에서 모델을 올려둬야 자식들이 같은 메모리 페이지를 공유함
+            if config.SENTIMENT_BACKEND != "onnx":
+                model, _ = sentiment.load_model()
+                model.share_memory()
+
+            self._task_queue = self._ctx.Queue(maxsize=self.max_pending)
+            self._result_queue = self._ctx.Queue()
+            for i in range(self.num_workers):
+                process = self._ctx.Process(
+                    target=_worker_main,
+                    args=(self._task_queue, self._result_queue, self.threads_per_worker),
+                    name=f"inference-worker-{i}",
+                    daemon=True,
+                )
+                process.start()
+                self._processes.append(process)
+
+            self._collector = threading.Thread(target=self._collect_results, name="inference-results", daemon=True)
+            self._collector.start()
+
+    def stop(self, timeout: float = 10):
+        with self._start_lock:
+            if not self.started:
+                return
+            # 종료 신호 - 큐가 가득 차 있으면(워커가 죽었거나 밀려 있으면) 기다리지 않고 아래에서 강제 종료
+            for _ in self._processes:
+                try:
+                    self._task_queue.put(None, timeout=1)
+                except queue.Full:
+                    break
+            deadline = time.monotonic() + timeout
+            for process in self._processes:
+                process.join(timeout=max(deadline - time.monotonic(), 0))
+                if process.is_alive():
+                    process.terminate()
+                    process.join(timeout=1)
+            self._processes = []
+            # 아무도 읽지 않는 큐에 남은 작업을 보내려고 종료가 멈추지 않도록
+            self._task_queue.cancel_join_thread()
+            self._result_queue.put(None)  # 결과 수집 스레드 종료
+            self._collector.join(timeout=timeout)
+
+            # 결과를 받지 못한 작업은 실패로 끝냄
+            with self._futures_lock:
+                futures = list(self._futures.values())
+                self._futures.clear()
+                self._deadlines.clear()
+            for future in futures:
+                if not future.done():
+                    future.set_exception(RuntimeError("추론 워커 풀이 종료되었습니다."))
+
+    def submit(self, texts: List[str]) -> Future:
+        self.start()
+        task_id = next(self._task_ids)
+        future: Future = Future()
+        with self._futures_lock:
+            self._futures[task_id] = future
+            self._deadlines[task_id] = time.monotonic() + config.INFERENCE_RESULT_TIMEOUT_SECONDS
+
+        try:
+            self._task_queue.put((task_id, texts), timeout=config.INFERENCE_SUBMIT_TIMEOUT_SECONDS)
+        except queue.Full:
+            with self._futures_lock:
+                self._futures.pop(task_id, None)
+                self._deadlines.pop(task_id, None)
+            raise PoolBusyError("감성 분석 요청이 밀려 있습니다. 잠시 후 다시 시도해주세요.")
+        return future
+
+    def predict_batch(self, texts: List[str]) -> np.ndarray:
+        return self.submit(texts).result(timeout=config.INFERENCE_RESULT_TIMEOUT_SECONDS)
+
+    def score_batch(self, texts: List[str]) -> List[float]:
+        return sentiment.probabilities_to_scores(self.predict_batch(texts))
+
+    def _collect_results(self):
+        while True:
+            try:
+                item = self._result_queue.get(timeout=1)
+            except queue.Empty:
+                self._expire_overdue()
+                continue
+            if item is None:
+                break
+
+            task_id, probabilities, error = item
+            with self._futures_lock:
+                future = self._futures.pop(task_id, None)
+                self._deadlines.pop(task_id, None)
+            if future is None:
+                continue
+            if error is not None:
+                future.set_exception(RuntimeError(f"추론 워커 오류: {error}"))
+            else:
+                future.set_result(probabilities)
+            self._expire_overdue()
+
+    def _expire_overdue(self):
+        # 워커가 죽는 등으로 결과가 오지 않는 작업은 기한이 지나면 TimeoutError로 끝냄
+        # (결과를 기다리지 않고 done-callback으로 받는 호출자도 언젠가는 반드시 결과를 받도록)
+        now = time.monotonic()
+        with self._futures_lock:
+            overdue = [task_id for task_id, deadline in self._deadlines.items() if deadline <= now]
+            futures = [self._futures.pop(task_id) for task_id in overdue]
+            for task_id in overdue:
+                del self._deadlines[task_id]
+        for future in futures:
+            future.set_exception(TimeoutError("추론 워커 응답 시간이 초과되었습니다."))
+
+
+# 서버 전체에서 공유하는 풀 (config.INFERENCE_WORKERS > 0 일 때만 사용)
+_pool: Optional[InferencePool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> InferencePool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = InferencePool(
+                    config.INFERENCE_WORKERS,
+                    threads_per_worker=config.INFERENCE_THREADS_PER_WORKER,
+                    max_pending=config.INFERENCE_MAX_PENDING,
+                )
+    return _pool
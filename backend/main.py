@@ -1,18 +1,97 @@
 # FastAPI 서버
 
-from fastapi import FastAPI, HTTPException
+import base64
+import binascii
+import json
+import threading
+import traceback
+import zlib
+from contextlib import asynccontextmanager
+from datetime import date, datetime
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
-from models import Movie, Review
+from typing import Callable, Dict, Iterator, List, Literal, Optional
+from models import Movie, MovieSummary, RecentReview, Review
+import config
 import database as db
 import sentiment as sentiment_analyzer
+import batch_scheduler
+import bulk_import
+import emotion_store
+import fast_json
+import inference_pool
+import response_cache
+import scoring_worker
+
+# 모델 준비 상태 (/ready 에서 사용)
+_model_ready = threading.Event()
+_model_error = None
+
+
+def _prepare_model():
+    """모델 로드 + 워밍업 (백그라운드 스레드에서 실행 - 그동안 /health는 바로 응답)"""
+    global _model_error
+    try:
+        if config.SENTIMENT_WARMUP:
+            sentiment_analyzer.warm_up()
+        _model_ready.set()
+        _start_stale_rescoring()
+    except Exception as e:
+        traceback.print_exc()
+        _model_error = repr(e)
+
+def _start_stale_rescoring():
+    # 모델이 준비된 뒤에 시작 (예전 버전 점수를 한가할 때 조금씩 다시 채점)
+    if not config.STALE_RESCORE_ENABLED:
+        return
+    # JSON 스냅샷 모드는 배치마다 reviews.json 전체를 다시 쓰고 다시 로드하므로 실행하지 않음 (rescore.py와 같은 기준)
+    if config.DB_BACKEND == "json" and config.REVIEW_STORAGE == "snapshot":
+        print("백그라운드 재채점을 건너뜁니다: JSON 스냅샷 모드(REVIEW_STORAGE=snapshot)에서는 배치마다 "
+              "reviews.json 전체를 다시 씁니다. REVIEW_STORAGE=journal 또는 DB_BACKEND=sqlite로 바꿔주세요.")
+        return
+    scoring_worker.get_refresher().start()
+
+# 서버 시작/종료 시 실행할 작업
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _model_error
+    # 추론 워커 프로세스는 다른 스레드(워밍업, 비동기 워커, 재채점)를 만들기 전에 여기서 바로 fork
+    # (fork는 호출한 스레드만 복사하므로 다른 스레드가 잡고 있던 잠금은 자식 프로세스에서 풀리지 않음)
+    if config.INFERENCE_WORKERS > 0:
+        try:
+            inference_pool.get_pool().start()
+        except Exception as e:
+            traceback.print_exc()
+            _model_error = repr(e)
+
+    # 첫 리뷰 요청이 모델 다운로드/로딩/첫 실행 비용을 떠안지 않도록 미리 준비
+    if _model_error is not None:
+        pass  # 추론 풀을 못 띄움 - /ready가 오류를 알려줌
+    elif config.SENTIMENT_WARMUP:
+        threading.Thread(target=_prepare_model, name="model-warmup", daemon=True).start()
+    else:
+        _model_ready.set()
+        _start_stale_rescoring()
+    # 비동기 감성 분석 모드: 재시작 전에 남아 있던 pending 리뷰부터 처리하도록 워커 시작
+    if config.SENTIMENT_MODE == "async":
+        scoring_worker.get_worker().start()
+    yield
+    if config.STALE_RESCORE_ENABLED:
+        scoring_worker.get_refresher().stop()
+    if config.SENTIMENT_MODE == "async":
+        scoring_worker.get_worker().stop()
+    if config.INFERENCE_WORKERS > 0:
+        inference_pool.get_pool().stop()
 
 # FastAPI 앱 생성
 
 app = FastAPI(
     title="Movie Revire API",
     description="영화 정보 및 리뷰를 관리하는 API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS 설정: 다른 도메인(Streamlit 같은 프론트엔드)에서 이 API를 호출할 수 있도록 허용
@@ -22,29 +101,251 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],    # 모든 HTTP 메소드 허용 (GET, POST, DELETE 등)
     allow_headers=["*"],    # 모든 헤더 허용
+    expose_headers=["X-Next-Cursor", "ETag"],  # 브라우저에서도 다음 페이지 커서 / ETag를 읽을 수 있도록
 )
 
+# ---목록 조회 페이지네이션---
+# 커서 = 이전 페이지 마지막 항목의 정렬 키를 base64로 감싼 문자열 (클라이언트는 내용을 몰라도 됨)
+# 다음 페이지가 있으면 응답 헤더 X-Next-Cursor로 전달하고, 그 값을 ?cursor= 로 다시 보내면 이어서 조회
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+# sort: 정렬 기준 ("id", "created_at", 내림차순이면 앞에 "-") - 다른 정렬로 받은 커서는 거절
+def _encode_cursor(sort: str, key: tuple) -> str:
+    data = json.dumps({"sort": sort, "key": list(key)}, ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii").rstrip("=")
+
+def _decode_cursor(cursor: str, sort: str) -> tuple:
+    order_by = sort.lstrip("-")
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        key = tuple(data["key"])
+        valid = data["sort"] == sort and (
+            (order_by == "id" and len(key) == 1 and isinstance(key[0], int))
+            or (order_by == "created_at" and len(key) == 2 and isinstance(key[0], str) and isinstance(key[1], int))
+        )
+    except (binascii.Error, ValueError, UnicodeDecodeError, TypeError, KeyError):
+        valid = False
+    if not valid:
+        raise HTTPException(status_code=400, detail="cursor 값이 올바르지 않습니다. (정렬 기준이 바뀌었다면 처음부터 다시 조회하세요)")
+    return key
+
+def _normalize_datetime(value: Optional[str], field: str) -> Optional[str]:
+    # "2024-01-01" / "2024-01-01T12:00:00" 등을 저장 형식("%Y-%m-%d %H:%M:%S")으로 맞춰서 문자열 비교가 가능하게
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value).strftime("%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{field} 날짜 형식이 올바르지 않습니다. (예: 2024-01-01 또는 2024-01-01 12:00:00)")
+
+def _normalize_date(value: Optional[str], field: str) -> Optional[str]:
+    # 개봉일은 "%Y-%m-%d" 문자열로 저장되므로 같은 형식으로 맞춰서 비교
+    if value is None:
+        return None
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{field} 날짜 형식이 올바르지 않습니다. (예: 2024-01-15)")
+
+# ---조회 응답: 조건부 GET (ETag) + 응답 캐시---
+# 저장소가 변경마다 올리는 데이터 버전으로 ETag를 만들어서
+# 1) 클라이언트가 If-None-Match로 같은 값을 보내면 조회/직렬화 없이 304 (본문 없음)로 응답
+# 2) 아니면 같은 요청 + 같은 데이터 버전으로 직렬화해 둔 응답 바이트가 있으면 그대로 보냄
+# 3) 둘 다 아니면 조회 -> 직렬화 -> 응답 캐시에 저장
+# 조회 결과는 저장소 레코드(dict) 그대로 직렬화함 - 쓸 때 모델로 검증했으므로 읽을 때 다시 검증하지 않음
+# (response_model은 API 문서용으로만 남음)
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # 여러 개가 올 수 있고, 약한 비교(W/ 접두어 무시)
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+def _cached_json(request: Request, scopes: tuple, build: Callable[[Dict[str, str]], object],
+                 variant: str = "") -> Response:
+    """
+    조회 응답 공통 처리 - scopes: 응답이 의존하는 데이터 범위 ("movies", "movie:<id>", "reviews", "reviews:<movie_id>")
+    variant: 데이터 말고 응답에 영향을 주는 설정값 (예: 점수 버전) - ETag와 응답 캐시 버전에 같이 들어감
+
+    build(headers)는 응답 데이터를 반환하고, 같이 보낼 헤더(X-Next-Cursor 등)는 headers에 넣음
+    (데이터 버전을 조회 전에 읽으므로 조회 도중 바뀌었으면 다음 요청에서 버전이 달라져 다시 만들어짐)
+    """
+    version = db.get_data_version(*scopes)
+    if variant:
+        version = f"{version}.{variant}"
+    etag = f'"{version}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}  # no-cache: 캐시해도 되지만 쓸 때마다 ETag로 확인
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    cache = response_cache.get_cache() if config.RESPONSE_CACHE_ENABLED else None
+    key = f"{request.url.path}?{request.url.query}"
+    cached = cache.get(key, version) if cache is not None else None
+    if cached is not None:
+        body, extra_headers = cached.body, cached.headers
+    else:
+        extra_headers: Dict[str, str] = {}
+        body = fast_json.dumps(build(extra_headers))
+        if cache is not None:
+            cache.put(key, version, body, extra_headers)
+    return Response(content=body, media_type="application/json", headers={**headers, **extra_headers})
+
+# ---내보내기: NDJSON 스트리밍---
+# 전체 목록을 리스트로 만들어 한 번에 직렬화하지 않고, keyset 페이지 단위로 읽어서 한 줄씩 바로 내보냄
+# -> 데이터가 아무리 많아도 메모리는 페이지 하나 크기, 첫 바이트는 첫 페이지를 읽자마자 나감
+# (페이지 사이에 추가/삭제된 데이터는 ID 순서상 아직 안 지나간 위치면 포함됨)
+
+def _iter_pages(fetch: Callable[[Optional[object]], tuple]) -> Iterator[List[dict]]:
+    """fetch(after) -> (레코드 목록, 다음 after 또는 None)을 끝까지 반복"""
+    after = None
+    while True:
+        records, after = fetch(after)
+        if records:
+            yield records
+        if after is None:
+            return
+
+def _ndjson_stream(pages: Iterator[List[dict]], compress: bool) -> Iterator[bytes]:
+    # gzip은 페이지마다 Z_SYNC_FLUSH로 내보내서 압축해도 데이터가 서버에 쌓이지 않고 바로 전송됨
+    compressor = zlib.compressobj(wbits=31) if compress else None  # wbits=31: gzip 형식
+    for records in pages:
+        chunk = b"".join([fast_json.dumps(record) + b"\n" for record in records])
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH) if compressor else chunk
+    if compressor:
+        yield compressor.flush()
+
+def _export_response(name: str, pages: Iterator[List[dict]], gzip: bool) -> StreamingResponse:
+    filename = f"{name}.ndjson.gz" if gzip else f"{name}.ndjson"
+    return StreamingResponse(
+        _ndjson_stream(pages, gzip),
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
 # ---기본 엔드포인트---
 
-# 모든 영화 목록 조회
+# 모든 영화 목록 조회 (limit을 주면 ID 순서로 한 페이지씩)
 @app.get("/movies", response_model=List[Movie])
-def get_movies():
+def get_movies(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=config.LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+):
     """
     GET http://localhost:8000/movies
+    GET http://localhost:8000/movies?limit=20
+    GET http://localhost:8000/movies?limit=20&cursor=<이전 응답의 X-Next-Cursor>
+
+    Args:
+        limit: 한 페이지 영화 수 (없으면 전체 목록)
+        cursor: 다음 페이지 커서 (이전 응답 헤더 X-Next-Cursor 값)
     """
-    movies = db.get_all_movies()
-    return movies
+    def build(headers: Dict[str, str]):
+        if limit is None and cursor is None:
+            return db.get_all_movie_records()
+
+        after = _decode_cursor(cursor, "id")[0] if cursor else None
+        movies, next_id = db.list_movie_records(limit or config.LIST_MAX_LIMIT, after_id=after)
+        if next_id is not None:
+            headers[NEXT_CURSOR_HEADER] = _encode_cursor("id", (next_id,))
+        return movies
+
+    return _cached_json(request, ("movies",), build)
+
+# 영화 목록 + 리뷰 수 / 평균 감성 점수 / 최근 리뷰 시간 (홈 화면용)
+# /movies/{movie_id}보다 먼저 선언해야 "summary"가 movie_id로 해석되지 않음
+@app.get("/movies/summary", response_model=List[MovieSummary])
+def get_movie_summaries(request: Request):
+    """
+    GET http://localhost:8000/movies/summary
+
+    Returns:
+        영화 정보에 review_count, average_sentiment, latest_review_at을 더한 목록
+        (영화마다 /movies/{id}/sentiment를 따로 호출하지 않아도 됨)
+    """
+    # 영화 정보와 리뷰 집계를 모두 담으므로 둘 중 하나라도 바뀌면 새 응답
+    return _cached_json(request, ("movies", "reviews"), lambda headers: db.get_movie_summary_records())
+
+# 전체 영화 내보내기 (NDJSON - 한 줄에 영화 하나, ID 순서)
+# /movies/{movie_id}보다 먼저 선언해야 "export"가 movie_id로 해석되지 않음
+@app.get("/movies/export")
+def export_movies(gzip: bool = False):
+    """
+    GET http://localhost:8000/movies/export
+    GET http://localhost:8000/movies/export?gzip=true
+
+    Args:
+        gzip: true면 gzip으로 압축해서 보냄 (movies.ndjson.gz)
+    """
+    return _export_response(
+        "movies", _iter_pages(lambda after: db.list_movie_records(config.EXPORT_BATCH_SIZE, after_id=after)), gzip
+    )
+
+# 영화 검색 (장르 / 감독 / 제목 접두어 / 개봉일 범위) - ID 순서, limit을 주면 한 페이지씩
+# /movies/{movie_id}보다 먼저 선언해야 "search"가 movie_id로 해석되지 않음
+@app.get("/movies/search", response_model=List[Movie])
+def search_movies(
+    request: Request,
+    genre: Optional[List[str]] = Query(None),
+    genre_mode: Literal["any", "all"] = "any",
+    director: Optional[str] = None,
+    title: Optional[str] = None,
+    released_from: Optional[str] = None,
+    released_to: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=config.LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+):
+    """
+    GET http://localhost:8000/movies/search?genre=드라마
+    GET http://localhost:8000/movies/search?genre=애니메이션&genre=액션&genre_mode=all
+    GET http://localhost:8000/movies/search?director=박찬욱&released_from=2000-01-01&limit=20
+
+    Args:
+        genre: 장르 (여러 번 주거나 "드라마, 액션"처럼 쉼표로 구분)
+        genre_mode: "any"면 장르 중 하나라도, "all"이면 전부 포함하는 영화
+        director: 감독 이름 (전체 일치)
+        title: 제목 접두어
+        released_from / released_to: 개봉일 범위 (released_from 이상, released_to 미만)
+        limit: 한 페이지 영화 수 (없으면 조건에 맞는 전체 목록)
+        cursor: 다음 페이지 커서 (이전 응답 헤더 X-Next-Cursor 값)
+
+    Note:
+        문자열 조건은 대소문자와 앞뒤 공백을 무시함
+        장르/감독/제목 역색인과 개봉일 정렬 인덱스로 찾으므로 영화가 많아도 전체를 훑지 않음
+    """
+    def build(headers: Dict[str, str]):
+        movies, next_id = db.search_movie_records(
+            limit,
+            after_id=_decode_cursor(cursor, "id")[0] if cursor else None,
+            genres=genre,
+            genre_mode=genre_mode,
+            director=director,
+            title_prefix=title,
+            released_from=_normalize_date(released_from, "released_from"),
+            released_to=_normalize_date(released_to, "released_to"),
+        )
+        if next_id is not None:
+            headers[NEXT_CURSOR_HEADER] = _encode_cursor("id", (next_id,))
+        return movies
+
+    return _cached_json(request, ("movies",), build)
 
 # 특정 영화 상세 조회
 @app.get("/movies/{movie_id}", response_model=Movie)
-def get_movie(movie_id: int):
+def get_movie(movie_id: int, request: Request):
     """
     GET http://localhost:8000/movies/1
     """
-    movie = db.get_movie_by_id(movie_id)
-    if not movie:
-        raise HTTPException(status_code=404, detail="영화를 찾을 수 없습니다.")
-    return movie
+    def build(headers: Dict[str, str]):
+        movie = db.get_movie_by_id(movie_id)
+        if not movie:
+            raise HTTPException(status_code=404, detail="영화를 찾을 수 없습니다.")
+        return movie
+
+    return _cached_json(request, (f"movie:{movie_id}",), build)
 
 # 새로운 영화 등록
 @app.post("/movies", response_model=Movie)
@@ -89,16 +390,10 @@ def delete_movie(movie_id: int):
         HTTPException(404): 해당 ID의 영화 없는 경우
     """
 
-    success = db.delete_movie(movie_id)
-    if not success:
+    # 해당 영화의 모든 리뷰도 함께 삭제 (영화 삭제와 한 번에 처리해서 영화 없는 리뷰가 남지 않도록)
+    deleted_reviews = db.delete_movie_with_reviews(movie_id)
+    if deleted_reviews is None:
         raise HTTPException(status_code=404, detail="영화를 찾을 수 없습니다.")
-    
-    # 해당 영화의 모든 리뷰도 함께 삭제
-    reviews = db.load_data(db.REVIEWS_FILE)
-    original_count = len(reviews)
-    reviews = [r for r in reviews if r["movie_id"] != movie_id]
-    deleted_reviews = original_count - len(reviews)
-    db.save_data(db.REVIEWS_FILE, reviews)
 
     return {
         "message": f"영화가 삭제되었습니다. (리뷰 {deleted_reviews}개도 함께 삭제됨)",
@@ -119,40 +414,105 @@ def update_movie(movie_id: int, movie: Movie):
         수정된 Movie 객체
     """
 
-    # 기존 영화 확인
-    existing_movie = db.get_movie_by_id(movie_id)
-    if not existing_movie:
+    # 데이터 업데이트 (ID 유지 - 요청 body의 id는 무시하고 URL의 movie_id 사용)
+    updated_movie = db.update_movie(movie_id, movie)
+    if not updated_movie:
         raise HTTPException(status_code=404, detail="영화를 찾을 수 없습니다.")
-    
-    # ID 유지 (요청 body의 id는 무시하고 URL의 movie_id 사용)
-    movie.id = movie_id
-    
-    # 데이터 업데이트
-    data = db.load_data(db.MOVIES_FILE)
-    for i, m in enumerate(data):
-        if m["id"] == movie_id:
-            data[i] = movie.model_dump()
-            break
-
-    db.save_data(db.MOVIES_FILE, data)
-    return movie
+    return updated_movie
 
 
 # --- 리뷰 관련 엔드포인트 ---
 
-# 모든 리뷰 조회
+# 리뷰 목록 조회 (필터 + keyset 페이지네이션)
 @app.get("/reviews", response_model=List[Review])
-def get_all_reviews():
+def get_all_reviews(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=config.LIST_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    order_by: Literal["id", "created_at"] = "id",
+    desc: bool = False,
+    movie_id: Optional[int] = None,
+    created_from: Optional[str] = None,
+    created_to: Optional[str] = None,
+    min_score: Optional[float] = Query(None, ge=0, le=1),
+    max_score: Optional[float] = Query(None, ge=0, le=1),
+):
     """
     GET http://localhost:8000/reviews
+    GET http://localhost:8000/reviews?limit=10&order_by=created_at&desc=true
+    GET http://localhost:8000/reviews?movie_id=1&min_score=0.7&limit=20&cursor=<이전 응답의 X-Next-Cursor>
+
+    Args:
+        limit: 한 페이지 리뷰 수 (없으면 조건에 맞는 전체 목록)
+        cursor: 다음 페이지 커서 (이전 응답 헤더 X-Next-Cursor 값 - 같은 order_by/desc로 보내야 함)
+        order_by: 정렬 기준 "id" 또는 "created_at" (같은 시간이면 ID순)
+        desc: true면 내림차순 (최신순)
+        movie_id: 특정 영화의 리뷰만
+        created_from / created_to: 작성 시간 범위 (created_from 이상, created_to 미만)
+        min_score / max_score: 감성 점수 범위 (점수가 아직 없는 리뷰는 제외)
+
+    Returns:
+        Review 객체 리스트 (다음 페이지가 있으면 응답 헤더 X-Next-Cursor 포함)
+    """
+
+    def build(headers: Dict[str, str]):
+        filters = {
+            "movie_id": movie_id,
+            "created_from": _normalize_datetime(created_from, "created_from"),
+            "created_to": _normalize_datetime(created_to, "created_to"),
+            "min_score": min_score,
+            "max_score": max_score,
+        }
+        # 조건이 하나도 없으면 예전처럼 전체 목록
+        if (limit is None and cursor is None and order_by == "id" and not desc
+                and all(value is None for value in filters.values())):
+            return db.get_all_review_records()
+
+        sort = f"-{order_by}" if desc else order_by
+        after = _decode_cursor(cursor, sort) if cursor else None
+        reviews, next_key = db.list_review_records(limit, after=after, order_by=order_by, desc=desc, **filters)
+        if next_key is not None:
+            headers[NEXT_CURSOR_HEADER] = _encode_cursor(sort, next_key)
+        return reviews
+
+    return _cached_json(request, ("reviews",), build)
+
+# 최근 리뷰 조회 (홈 화면용) - 영화 제목 포함
+@app.get("/reviews/recent", response_model=List[RecentReview])
+def get_recent_reviews(request: Request, limit: int = Query(10, ge=1, le=config.LIST_MAX_LIMIT)):
+    """
+    GET http://localhost:8000/reviews/recent?limit=10
+
+    Args:
+        limit: 가져올 리뷰 수 (기본 10개)
+
+    Returns:
+        작성 시간 내림차순 최근 리뷰 목록 (각 리뷰에 movie_title 포함)
+    """
+
+    return _cached_json(request, ("reviews", "movies"), lambda headers: db.get_recent_review_records(limit))
+
+# 전체 리뷰 내보내기 (NDJSON - 한 줄에 리뷰 하나, ID 순서) - 분석용으로 전체 리뷰를 받을 때
+@app.get("/reviews/export")
+def export_reviews(gzip: bool = False):
     """
+    GET http://localhost:8000/reviews/export
+    GET http://localhost:8000/reviews/export?gzip=true
 
-    reviews = db.get_all_reviews()
-    return reviews
+    Args:
+        gzip: true면 gzip으로 압축해서 보냄 (reviews.ndjson.gz)
+
+    Note:
+        GET /reviews 와 달리 전체 목록을 메모리에 만들지 않고 EXPORT_BATCH_SIZE개씩 읽어서 바로 보냄
+        (POST /reviews/bulk 에 application/x-ndjson으로 그대로 다시 넣을 수 있는 형식)
+    """
+    return _export_response(
+        "reviews", _iter_pages(lambda after: db.list_review_records(config.EXPORT_BATCH_SIZE, after=after)), gzip
+    )
 
 # 특정 영화 모든 리뷰 조회
 @app.get("/movies/{movie_id}/reviews", response_model=List[Review])
-def get_movie_reviews(movie_id: int):
+def get_movie_reviews(movie_id: int, request: Request):
     """
     GET http://localhost:8000/movies/1/reviews
 
@@ -163,8 +523,7 @@ def get_movie_reviews(movie_id: int):
         Review 객체 리스트
     """
 
-    reviews = db.get_reviews_by_movie(movie_id)
-    return reviews
+    return _cached_json(request, (f"reviews:{movie_id}",), lambda headers: db.get_review_records_by_movie(movie_id))
 
 # 새로운 리뷰 작성(감성 분석 자동 추가 - 디버깅)
 @app.post("/reviews", response_model=Review)
@@ -187,19 +546,167 @@ def create_review(review: Review):
         
     Note:
         sentiment_score는 리뷰 작성 시 자동으로 감성 분석되어 저장됨 ( 0~1 사이 값 )
+        SENTIMENT_MODE=async 이면 점수 없이 바로 저장되고(sentiment_status="pending")
+        백그라운드 워커가 나중에 채움 - GET /reviews/{review_id}/sentiment 로 확인
     """
     # 영화가 존재하는지 확인
     movie = db.get_movie_by_id(review.movie_id)
     if not movie:
         raise HTTPException(status_code=404, detail="해당 영화를 찾을 수 없습니다. 영화 ID를 다시 한 번 확인해주세요.")
+
+    # 점수 버전은 서버가 실제로 채점했을 때만 기록
+    review.scoring_version = None
     
+    # 비동기 모드: 모델을 기다리지 않고 바로 저장한 뒤 워커에 알림
+    if config.SENTIMENT_MODE == "async" and review.content:
+        review.sentiment_score = None
+        review.sentiment_status = "pending"
+        new_review = _save_review(review)
+        scoring_worker.get_worker().notify()
+        return new_review
+
     # 감성 분석 자동 추가 - 디버깅
+    # 동시에 들어온 리뷰들과 묶어서 한 번의 배치로 모델을 돌림 (batch_scheduler)
+    emotions = None
     if review.content:
-        review.sentiment_score = sentiment_analyzer.analyze_sentiment(review.content)
+        try:
+            review.sentiment_score, emotions = batch_scheduler.get_scheduler().score(review.content)
+        except inference_pool.PoolBusyError as e:
+            # 추론 워커 큐가 가득 참 - 클라이언트가 잠시 후 재시도하도록 503
+            raise HTTPException(status_code=503, detail=str(e))
+        review.sentiment_status = "done"
+        review.scoring_version = config.SCORING_VERSION
+
+    new_review = _save_review(review)
+    if emotions is not None:
+        emotion_store.get_store().put_many({new_review.id: emotions})
+    return new_review
 
+# 리뷰 저장 - 점수를 계산하는 사이에 영화가 삭제됐으면 404
+def _save_review(review: Review) -> Review:
     new_review = db.create_review(review)
+    if new_review is None:
+        raise HTTPException(status_code=404, detail="해당 영화를 찾을 수 없습니다. 영화 ID를 다시 한 번 확인해주세요.")
     return new_review
 
+# 요청 본문을 limit 바이트까지만 읽음 - Content-Length가 크거나 읽는 도중 넘으면 413
+async def _read_body(request: Request, limit: int) -> bytes:
+    too_large = HTTPException(status_code=413, detail=f"JSON 본문은 최대 {limit}바이트까지 보낼 수 있습니다. "
+                                                      "더 큰 업로드는 application/x-ndjson으로 보내주세요.")
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > limit:
+        raise too_large
+
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise too_large
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+# 리뷰 대량 등록 (과거 리뷰 가져오기용)
+@app.post("/reviews/bulk")
+async def create_reviews_bulk(request: Request):
+    """
+    POST http://localhost:8000/reviews/bulk
+
+    Request Body:
+        Content-Type: application/json -> 리뷰 객체 배열 (본문 최대 BULK_MAX_JSON_BYTES, 넘으면 413)
+        Content-Type: application/x-ndjson -> 한 줄에 리뷰 객체 하나 (스트리밍으로 읽음 - 큰 업로드는 이 형식으로)
+        각 리뷰는 POST /reviews 와 같은 형식 (created_at을 주면 그대로 유지)
+
+    Returns:
+        등록 성공/실패 개수와 항목별 결과 ({"index", "id"} 또는 {"index", "error"})
+
+    Note:
+        영화 ID는 한 번 만든 set으로 확인하고, 감성 분석은 BULK_SCORING_CHUNK_SIZE개씩 배치로,
+        저장은 마지막에 한 번만 함 - 일부 항목이 실패해도 나머지는 등록됨
+    """
+
+    importer = await run_in_threadpool(bulk_import.BulkImporter)
+    chunk_size = importer.chunk_size
+    items = []
+
+    async def add_items():
+        # 개수 제한은 채점하기 전에 확인 (넘는 요청은 어차피 저장하지 않으므로 모델을 돌리지 않음)
+        if importer.count + len(items) > config.BULK_MAX_REVIEWS:
+            raise HTTPException(status_code=413, detail=f"한 번에 최대 {config.BULK_MAX_REVIEWS}개까지 등록할 수 있습니다.")
+        # 청크 단위로 스레드풀에서 검증/채점 (모델 실행이 이벤트 루프를 막지 않도록)
+        await run_in_threadpool(importer.add_many, items.copy())
+        items.clear()
+
+    try:
+        if "ndjson" in request.headers.get("content-type", ""):
+            index = 0
+            buffer = b""
+
+            def parse_line(line: bytes):
+                # 한 줄 파싱 - 형식 오류는 그 줄만 실패로 기록
+                try:
+                    items.append((index, json.loads(line)))
+                except json.JSONDecodeError as e:
+                    importer.add_error(index, f"JSON 형식 오류: {e.msg}")
+
+            async for chunk in request.stream():
+                buffer += chunk
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    if line.strip():
+                        parse_line(line)
+                        index += 1
+                if len(items) >= chunk_size:
+                    await add_items()
+            if buffer.strip():
+                parse_line(buffer)
+        else:
+            try:
+                body = json.loads(await _read_body(request, config.BULK_MAX_JSON_BYTES))
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                raise HTTPException(status_code=400, detail="JSON 형식이 올바르지 않습니다.")
+            if not isinstance(body, list):
+                raise HTTPException(status_code=400, detail="리뷰 객체 배열을 보내주세요.")
+            for index, item in enumerate(body):
+                items.append((index, item))
+                if len(items) >= chunk_size:
+                    await add_items()
+
+        await add_items()
+        result = await run_in_threadpool(importer.finish)
+    except inference_pool.PoolBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    if config.SENTIMENT_MODE == "async" and result["created"]:
+        scoring_worker.get_worker().notify()
+    return result
+
+# 리뷰 감성 분석 결과 조회 (비동기 모드에서 점수가 채워졌는지 확인하는 용도)
+@app.get("/reviews/{review_id}/sentiment")
+def get_review_sentiment(review_id: int):
+    """
+    GET http://localhost:8000/reviews/1/sentiment
+
+    Args:
+        review_id: 조회할 리뷰 ID
+
+    Returns:
+        감성 분석 상태("pending" / "done")와 점수 (pending이면 None)
+
+    Raises:
+        HTTPException(404): 해당 ID의 리뷰가 없을 때
+    """
+
+    review = db.get_review_by_id(review_id)
+    if not review:
+        raise HTTPException(status_code=404, detail="리뷰를 찾을 수 없습니다.")
+    return {
+        "review_id": review_id,
+        "sentiment_status": review.sentiment_status or "done",
+        "sentiment_score": review.sentiment_score,
+        "scoring_version": review.scoring_version,
+    }
+
 # 리뷰 삭제
 @app.delete("/reviews/{review_id}")
 def delete_review(review_id: int):
@@ -223,7 +730,7 @@ def delete_review(review_id: int):
 
 # 특정 영화의 평균 감성 점수 조회
 @app.get("/movies/{movie_id}/sentiment")
-def get_movie_sentiment(movie_id: int):
+def get_movie_sentiment(movie_id: int, request: Request):
     """
     GET http://localhost:8000/movies/1/sentiment
     
@@ -231,16 +738,124 @@ def get_movie_sentiment(movie_id: int):
         movie_id: 감성 점수를 조회할 영화의 ID
         
     Returns:
-        평균 감성 점수 (0~1 사이 값)
+        평균 감성 점수 (0~1 사이 값), 점수가 있는 리뷰 수, 점수 분산,
+        현재 점수 버전과 그 버전으로 채점된 리뷰 비율 (current_fraction)
         
     Note:
         리뷰가 없거나 감성 분석이 안된 경우 None 반환
+        영화별 누적 집계(합계/개수/제곱합)를 사용하므로 리뷰 수와 상관없이 O(1)
+        모델이 바뀐 직후에는 예전 버전 점수가 섞여 있다가 백그라운드 재채점으로 점점 1에 가까워짐
+    """
+
+    def build(headers: Dict[str, str]):
+        stats = db.get_sentiment_stats(movie_id)
+        if stats is None:
+            return {"movie_id": movie_id, "average_sentiment": None, "review_count": 0, "message": "감성 분석 데이터가 없습니다."}
+        return {
+            "movie_id": movie_id,
+            "average_sentiment": stats["average"],
+            "review_count": stats["count"],
+            "variance": stats["variance"],
+            "scoring_version": config.SCORING_VERSION,
+            "current_fraction": stats["current_count"] / stats["count"],
+        }
+
+    # 응답의 scoring_version / current_fraction이 설정된 점수 버전에 따라 달라지므로 ETag에도 포함
+    return _cached_json(request, (f"reviews:{movie_id}",), build, variant=config.SCORING_VERSION)
+
+# 영화별 평균 감정 분포 (기쁨, 슬픔, 짜증남, ... 11개 감정)
+@app.get("/movies/{movie_id}/emotions")
+def get_movie_emotions(movie_id: int):
+    """
+    GET http://localhost:8000/movies/1/emotions
+
+    Args:
+        movie_id: 감정 분포를 조회할 영화의 ID
+
+    Returns:
+        감정별 평균 확률, 가장 높은 감정, 감정 분포가 있는 리뷰 수
+
+    Note:
+        리뷰를 채점할 때 저장해 둔 감정 확률(float16)을 행렬로 꺼내서 평균만 계산 (모델을 다시 돌리지 않음)
+        감정 분포가 있는 리뷰가 없으면 None 반환
+    """
+
+    result = emotion_store.get_store().mean(db.get_review_ids_by_movie(movie_id))
+    if result is None:
+        return {"movie_id": movie_id, "emotions": None, "review_count": 0, "message": "감정 분석 데이터가 없습니다."}
+
+    means, count = result
+    return {
+        "movie_id": movie_id,
+        "emotions": dict(zip(sentiment_analyzer.EMOTION_LABELS, means.tolist())),
+        "top_emotion": sentiment_analyzer.EMOTION_LABELS[int(means.argmax())],
+        "review_count": count,
+    }
+
+# ---운영용 엔드포인트---
+
+# 프로세스가 살아 있는지만 확인 (모델 상태와 무관하게 항상 가벼움)
+@app.get("/health")
+def health():
+    """
+    GET http://localhost:8000/health
+    """
+
+    return {"status": "ok"}
+
+# 트래픽을 받을 준비가 되었는지 확인 (모델 로드 + 워밍업 완료 후에만 200)
+@app.get("/ready")
+def ready():
+    """
+    GET http://localhost:8000/ready
+
+    Returns:
+        준비 완료면 200 {"status": "ready"}, 워밍업 중이거나 실패했으면 503
+        (SENTIMENT_MODE=async면 요청 처리에 모델이 필요 없으므로 모델 상태와 상관없이 200)
+    """
+
+    if _model_ready.is_set() or config.SENTIMENT_MODE != "sync":
+        return {"status": "ready"}
+    if _model_error is not None:
+        return JSONResponse(status_code=503, content={"status": "error", "detail": _model_error})
+    return JSONResponse(status_code=503, content={"status": "warming_up"})
+
+# 감성 점수 캐시 통계 (히트/미스 카운터)
+@app.get("/stats/sentiment-cache")
+def get_sentiment_cache_stats():
+    """
+    GET http://localhost:8000/stats/sentiment-cache
+
+    Returns:
+        캐시 히트/디스크 히트/미스/제거 횟수, 현재 크기, 히트율
+    """
+
+    return sentiment_analyzer.get_cache().stats()
+
+# 감성 점수 버전 현황 (예전 버전 점수가 몇 개 남았는지, 백그라운드 재채점 진행 상황)
+@app.get("/stats/scoring-version")
+def get_scoring_version_stats():
+    """
+    GET http://localhost:8000/stats/scoring-version
+
+    Returns:
+        현재 점수 버전, 다른 버전으로 채점된 리뷰 수, 백그라운드에서 다시 채점한 리뷰 수, 실행 여부
+    """
+
+    return scoring_worker.get_refresher().stats()
+
+# 조회 API 응답 캐시 현황
+@app.get("/stats/response-cache")
+def get_response_cache_stats():
+    """
+    GET http://localhost:8000/stats/response-cache
+
+    Returns:
+        히트/미스 횟수, 데이터 변경으로 버린 항목(invalidations), TTL 만료, 크기 제한으로 제거(evictions),
+        현재 항목 수와 바이트, 히트율
     """
 
-    avg_score = db.get_average_sentiment(movie_id)
-    if avg_score is None:
-        return {"movie_id": movie_id, "average_sentiment": None, "message": "감성 분석 데이터가 없습니다."}
-    return {"movie_id": movie_id, "average_sentiment": avg_score}
+    return response_cache.get_cache().stats()
 
 # 서버 실행 코드 (터미널 직접 실행용)
 if __name__ == "__main__":
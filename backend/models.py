@@ -24,4 +24,17 @@ class Review(BaseModel):
     author: str                    # 작성자 이름
     content: str                   # 리뷰 내용
     sentiment_score: Optional[float] = None  # 감성 분석 점수 (0~1, 나중에 추가)
-    created_at: Optional[str] = None  # 작성 시간 (자동 생성)
\ No newline at end of file
+    sentiment_status: Optional[str] = None  # 감성 분석 상태 ("pending": 분석 대기, "done": 완료)
+    scoring_version: Optional[str] = None  # 점수를 계산한 모델/매핑 버전 (config.SCORING_VERSION)
+    created_at: Optional[str] = None  # 작성 시간 (자동 생성)
+
+# 최근 리뷰 목록용 (홈 화면) - 영화 제목을 함께 내려줘서 리뷰마다 영화를 다시 조회하지 않도록
+class RecentReview(Review):
+    movie_title: Optional[str] = None  # 영화 제목 (영화가 삭제됐으면 None)
+
+
+# 영화 목록 + 리뷰 집계 (홈 화면용) - 영화마다 감성 점수를 따로 조회하지 않도록 한 번에
+class MovieSummary(Movie):
+    review_count: int = 0                      # 리뷰 수 (감성 분석 대기 중인 리뷰 포함)
+    average_sentiment: Optional[float] = None  # 평균 감성 점수 (점수가 있는 리뷰가 없으면 None)
+    latest_review_at: Optional[str] = None     # 가장 최근 리뷰 작성 시간
@@ -0,0 +1,146 @@
+# 영화 검색용 인덱스 (JSON 저장소)
+# GET /movies/search 에서 전체 영화를 훑지 않도록
+# 장르 / 감독 -> 영화 ID 역색인, 개봉일 / 제목 순 정렬 목록을 유지하고 가장 적게 걸리는 조건부터 후보를 좁힘
+
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sortedcontainers import SortedList
+
+# 제목 접두어 범위의 끝 (접두어 뒤에 어떤 문자가 와도 이보다 작음)
+_MAX_CHAR = "\U0010ffff"
+
+
+def search_key(text: Optional[str]) -> str:
+    # 검색 비교용: 앞뒤 공백 제거 + 대소문자 무시
+    return (text or "").strip().casefold()
+
+
+def genre_terms(genre: Optional[str]) -> List[str]:
+    """'애니메이션, 액션' -> ['애니메이션', '액션'] (프론트엔드가 장르 목록을 ", "로 이어서 저장함)"""
+    return list(dict.fromkeys(search_key(term) for term in (genre or "").split(",") if term.strip()))
+
+
+class MovieIndex:
+    """
+    영화 검색 인덱스 모음
+
+    - 장르별 / 감독별 영화 ID 집합
+    - 개봉일순 (release_date, id), 제목순 (제목 검색 키, id)
+    검색할 때는 조건마다 후보 수를 비교해서 가장 작은 후보 집합만 확인함
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.by_genre: Dict[str, Set[int]] = {}
+        self.by_director: Dict[str, Set[int]] = {}
+        self.by_release = SortedList()
+        self.by_title = SortedList()
+
+    def rebuild(self, movies: Iterable[dict]):
+        """전체 영화로 한 번에 다시 만들기 (파일을 로드할 때)"""
+        movies = list(movies)
+        self.clear()
+        for movie in movies:
+            self._add_terms(movie)
+        self.by_release = SortedList((movie["release_date"], movie["id"]) for movie in movies)
+        self.by_title = SortedList((search_key(movie["title"]), movie["id"]) for movie in movies)
+
+    def add(self, movie: dict):
+        self._add_terms(movie)
+        self.by_release.add((movie["release_date"], movie["id"]))
+        self.by_title.add((search_key(movie["title"]), movie["id"]))
+
+    def remove(self, movie: dict):
+        for term in genre_terms(movie["genre"]):
+            self._discard(self.by_genre, term, movie["id"])
+        self._discard(self.by_director, search_key(movie["director"]), movie["id"])
+        self.by_release.discard((movie["release_date"], movie["id"]))
+        self.by_title.discard((search_key(movie["title"]), movie["id"]))
+
+    def _add_terms(self, movie: dict):
+        for term in genre_terms(movie["genre"]):
+            self.by_genre.setdefault(term, set()).add(movie["id"])
+        self.by_director.setdefault(search_key(movie["director"]), set()).add(movie["id"])
+
+    @staticmethod
+    def _discard(index: Dict[str, Set[int]], term: str, movie_id: int):
+        ids = index.get(term)
+        if ids is not None:
+            ids.discard(movie_id)
+            if not ids:
+                del index[term]
+
+    def search(self, movies: Dict[int, dict], movie_ids: SortedList, limit: Optional[int] = None,
+               after_id: Optional[int] = None, genres: Optional[List[str]] = None, genre_mode: str = "any",
+               director: Optional[str] = None, title_prefix: Optional[str] = None,
+               released_from: Optional[str] = None, released_to: Optional[str] = None) -> Tuple[List[dict], Optional[int]]:
+        """
+        조건에 맞는 영화를 ID 순서대로 최대 limit개 + 다음 페이지의 after_id (더 없으면 None)
+
+        genres: 장르 목록 - genre_mode "any"면 하나라도, "all"이면 전부 포함
+        director: 감독 이름 (전체 일치), title_prefix: 제목 접두어
+        released_from <= release_date < released_to
+        """
+        terms = [term for genre in genres or () for term in genre_terms(genre)]
+        director_key = search_key(director) if director is not None else None
+        prefix = search_key(title_prefix) if title_prefix else None
+
+        def matches(movie: dict) -> bool:
+            if terms:
+                movie_terms = set(genre_terms(movie["genre"]))
+                if genre_mode == "all" and not movie_terms.issuperset(terms):
+                    return False
+                if genre_mode != "all" and movie_terms.isdisjoint(terms):
+                    return False
+            if director_key is not None and search_key(movie["director"]) != director_key:
+                return False
+            if prefix is not None and not search_key(movie["title"]).startswith(prefix):
+                return False
+            release = movie["release_date"]
+            if (released_from is not None and release < released_from) or (released_to is not None and release >= released_to):
+                return False
+            return True
+
+        # 1) 조건별 후보 - (후보 수, 후보 ID를 꺼내는 함수)
+        sources = []
+        if terms:
+            sets = sorted((self.by_genre.get(term, set()) for term in terms), key=len)
+            genre_ids = sets[0].intersection(*sets[1:]) if genre_mode == "all" else set().union(*sets)
+            sources.append((len(genre_ids), lambda: sorted(genre_ids)))
+        if director_key is not None:
+            director_ids = self.by_director.get(director_key, set())
+            sources.append((len(director_ids), lambda: sorted(director_ids)))
+        if released_from is not None or released_to is not None:
+            release_start = self.by_release.bisect_left((released_from,)) if released_from is not None else 0
+            release_stop = (self.by_release.bisect_left((released_to,))
+                            if released_to is not None else len(self.by_release))
+            sources.append((release_stop - release_start,
+                            lambda: sorted(key[-1] for key in self.by_release.islice(release_start, release_stop))))
+        if prefix is not None:
+            title_start = self.by_title.bisect_left((prefix,))
+            title_stop = self.by_title.bisect_left((prefix + _MAX_CHAR,))
+            sources.append((title_stop - title_start,
+                            lambda: sorted(key[-1] for key in self.by_title.islice(title_start, title_stop))))
+
+        # 2) 가장 작은 후보를 ID 순서로 (조건이 없으면 전체 영화 ID 정렬 목록에서 after_id 다음부터)
+        if sources:
+            candidate_ids = min(sources, key=lambda source: source[0])[1]()
+            if after_id is not None:
+                candidate_ids = candidate_ids[bisect_right(candidate_ids, after_id):]
+        else:
+            start = movie_ids.bisect_right(after_id) if after_id is not None else 0
+            candidate_ids = movie_ids.islice(start)
+
+        # 3) 나머지 조건은 영화 데이터로 확인하면서 limit+1개까지 (다음 페이지가 있는지 확인용 1개)
+        results = []
+        for movie_id in candidate_ids:
+            movie = movies[movie_id]
+            if matches(movie):
+                results.append(movie)
+                if limit is not None and len(results) > limit:
+                    break
+        if limit is None or len(results) <= limit:
+            return results, None
+        return results[:limit], results[limit - 1]["id"]
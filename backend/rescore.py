@@ -0,0 +1,247 @@
+# 저장된 전체 리뷰의 감성 점수 다시 계산 (오프라인 CLI)
+# 모델이나 11개 라벨 -> 점수 변환 방식을 바꾸면 이미 저장된 sentiment_score는 예전 기준 그대로 남으므로
+# 리뷰를 ID 순서대로 배치 단위로 읽어서 다시 채점하고 저장함
+#
+# 사용법:
+#   python rescore.py                 # 체크포인트가 있으면 이어서, 없으면 처음부터
+#   python rescore.py --workers 4     # 추론 워커 프로세스 4개로 병렬 처리
+#   python rescore.py --restart       # 체크포인트 무시하고 처음부터
+#   python rescore.py --stale-only    # 현재 점수 버전(config.SCORING_VERSION)이 아닌 리뷰만
+#
+# 서버가 떠 있는 상태에서 돌려도 되도록
+# - 낮은 CPU 우선순위(nice)와 적은 torch 스레드 수로 실행, --max-rate로 초당 처리량 제한 가능
+# - 배치마다 짧게 저장 (JSON 저널 모드는 변경분만 저널에 추가, SQLite는 배치당 트랜잭션 하나)
+# - JSON 스냅샷 모드(DB_BACKEND=json, REVIEW_STORAGE=snapshot)에서는 실행하지 않음
+#   배치마다 reviews.json 전체를 다시 쓰게 되고, 서버는 파일이 바뀔 때마다 전체 리뷰를 다시 로드하면서
+#   그동안 조회가 막힘 -> 저널 모드나 SQLite로 바꾸거나, 서버를 끈 상태에서 --allow-snapshot으로 실행
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future
+from datetime import datetime
+from typing import List, Optional
+import numpy as np
+import config
+import database as db
+import emotion_store
+import sentiment
+from inference_pool import InferencePool
+from models import Review
+from sentiment_cache import normalize_text
+
+CHECKPOINT_FILE = 'rescore.checkpoint.json'
+PROGRESS_INTERVAL_SECONDS = 5
+
+
+# ---체크포인트---
+
+def model_id() -> str:
+    # 감성 점수 캐시와 같은 기준 (모델 + 점수 버전 + 추론 백엔드)
+    return f"{sentiment.MODEL_NAME}:{config.SCORING_VERSION}:{config.SENTIMENT_BACKEND}"
+
+def load_checkpoint(path: str) -> Optional[dict]:
+    try:
+        with open(path, "r", encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except FileNotFoundError:
+        return None
+
+    # 다른 모델로 채점하던 체크포인트면 이어가지 않음
+    if checkpoint.get("model") != model_id():
+        return None
+    return checkpoint
+
+def save_checkpoint(path: str, checkpoint: dict):
+    db.write_file_atomic(path, json.dumps(checkpoint, ensure_ascii=False, indent=4))
+
+
+# ---채점---
+
+class Rescorer:
+    """
+    리뷰 배치를 채점하고 결과를 ID 순서대로 저장하는 파이프라인
+
+    - workers > 0: InferencePool로 배치 여러 개를 동시에 워커 프로세스에 보냄
+    - 저장과 체크포인트는 항상 ID 순서대로 (체크포인트의 last_id 이하는 모두 끝났다는 뜻)
+    """
+
+    def __init__(self, workers: int = 0, threads: int = 1, max_rate: float = 0, stale_only: bool = False):
+        self.workers = workers
+        self.threads = threads
+        self.max_rate = max_rate
+        self.stale_only = stale_only
+        self.pool: Optional[InferencePool] = None
+        if workers > 0:
+            self.pool = InferencePool(workers, threads_per_worker=threads, max_pending=workers * 2)
+
+        self.processed = 0  # 다시 채점한 리뷰 수
+        self.scanned = 0    # 읽은 리뷰 수 (--stale-only면 건너뛴 리뷰 포함)
+        self.started_at = time.monotonic()
+
+    def start(self):
+        # 모델 로드는 처리 속도 계산에서 빼기 위해 여기서 미리
+        if self.pool is not None:
+            self.pool.start()
+        else:
+            if config.SENTIMENT_BACKEND != "onnx":
+                import torch
+                torch.set_num_threads(self.threads)
+            sentiment.load_model()
+        self.started_at = time.monotonic()
+
+    def stop(self):
+        if self.pool is not None:
+            self.pool.stop()
+
+    def submit(self, texts: List[str]) -> Future:
+        """텍스트들의 감정 확률 (len(texts), 11) 계산 요청"""
+        if self.pool is not None and texts:
+            return self.pool.submit(texts)
+        future: Future = Future()
+        future.set_result(sentiment.predict_texts(texts))
+        return future
+
+    def run(self, after_id: int, batch_size: int, on_batch_done):
+        """after_id 다음 리뷰부터 끝까지 채점 - 배치가 저장될 때마다 on_batch_done(마지막 리뷰 ID, 배치 크기) 호출"""
+        in_flight = deque()
+        max_in_flight = max(self.workers * 2, 1)
+
+        for batch in db.iter_review_batches(after_id, batch_size):
+            if not batch:
+                continue
+            reviews = batch
+            if self.stale_only:
+                reviews = [review for review in batch if review.scoring_version != config.SCORING_VERSION]
+
+            # 분석 API와 같은 방식: 공백 정규화 + 빈 텍스트는 중립(0.5) + 배치 안 중복 텍스트는 한 번만
+            texts = [normalize_text(review.content or "") for review in reviews]
+            unique_texts = [text for text in dict.fromkeys(texts) if text]
+            in_flight.append((batch, reviews, texts, unique_texts, self.submit(unique_texts)))
+
+            while len(in_flight) >= max_in_flight:
+                self._finish(*in_flight.popleft(), on_batch_done)
+
+        while in_flight:
+            self._finish(*in_flight.popleft(), on_batch_done)
+
+    def _finish(self, batch: List[Review], reviews: List[Review], texts: List[str], unique_texts: List[str],
+                future: Future, on_batch_done):
+        # batch: 읽어 온 리뷰 전체 (체크포인트 기준) / reviews: 그중 실제로 다시 채점할 리뷰
+        probabilities = future.result()
+        if reviews:
+            scores = sentiment.probabilities_to_scores(probabilities)
+            computed = dict(zip(unique_texts, zip(scores, probabilities.astype(np.float16))))
+
+            db.update_review_scores({review.id: computed[text][0] if text else 0.5 for review, text in zip(reviews, texts)})
+            emotion_store.get_store().put_many(
+                {review.id: computed[text][1] for review, text in zip(reviews, texts) if text}
+            )
+            # 서버와 디스크 캐시를 같이 쓰는 경우 새 점수로 덮어씀
+            sentiment.get_cache().put_many(computed)
+
+        self.processed += len(reviews)
+        self.scanned += len(batch)
+        on_batch_done(batch[-1].id, len(batch))
+        self._throttle()
+
+    def _throttle(self):
+        if self.max_rate <= 0:
+            return
+        # 지금까지 처리량이 max_rate를 넘었으면 그만큼 쉬어서 서버에 CPU/디스크를 양보
+        ahead = self.processed / self.max_rate - (time.monotonic() - self.started_at)
+        if ahead > 0:
+            time.sleep(ahead)
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.started_at
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def scan_rate(self) -> float:
+        elapsed = time.monotonic() - self.started_at
+        return self.scanned / elapsed if elapsed > 0 else 0.0
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours:d}:{minutes:02d}:{seconds:02d}"
+
+
+# ---CLI---
+
+def main():
+    parser = argparse.ArgumentParser(description="저장된 전체 리뷰의 감성 점수를 현재 모델로 다시 계산합니다.")
+    parser.add_argument("--batch-size", type=int, default=config.BULK_SCORING_CHUNK_SIZE, help="한 번에 읽고 저장하는 리뷰 수")
+    parser.add_argument("--workers", type=int, default=0, help="추론 워커 프로세스 수 (0이면 이 프로세스에서 추론)")
+    parser.add_argument("--threads", type=int, default=1, help="프로세스당 torch 스레드 수")
+    parser.add_argument("--max-rate", type=float, default=0, help="초당 최대 처리 리뷰 수 (0이면 제한 없음)")
+    parser.add_argument("--nice", type=int, default=10, help="CPU 우선순위 낮추기 (서버 요청 우선)")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE, help="진행 상황 저장 파일")
+    parser.add_argument("--restart", action="store_true", help="체크포인트를 무시하고 처음부터")
+    parser.add_argument("--stale-only", action="store_true", help="현재 점수 버전이 아닌 리뷰만 다시 채점")
+    parser.add_argument("--allow-snapshot", action="store_true",
+                        help="JSON 스냅샷 모드에서도 실행 (API 서버가 꺼져 있을 때만 사용)")
+    args = parser.parse_args()
+
+    if config.DB_BACKEND == "json" and config.REVIEW_STORAGE == "snapshot" and not args.allow_snapshot:
+        parser.error(
+            "JSON 스냅샷 모드(REVIEW_STORAGE=snapshot)에서는 배치마다 reviews.json 전체를 다시 쓰고 "
+            "서버가 그때마다 전체 리뷰를 다시 로드해서 조회가 막힙니다. "
+            "REVIEW_STORAGE=journal 또는 DB_BACKEND=sqlite로 실행하거나, "
+            "서버를 끈 상태라면 --allow-snapshot을 붙여주세요."
+        )
+
+    if args.nice and hasattr(os, "nice"):
+        os.nice(args.nice)
+
+    checkpoint = None if args.restart else load_checkpoint(args.checkpoint)
+    if checkpoint is None:
+        checkpoint = {"model": model_id(), "last_id": 0, "done": 0, "started_at": datetime.now().isoformat()}
+    else:
+        print(f"체크포인트에서 이어서 시작: 리뷰 ID {checkpoint['last_id']} 이후 ({checkpoint['done']}개 완료)")
+
+    total = checkpoint["done"] + db.count_reviews_after(checkpoint["last_id"])
+    rescorer = Rescorer(workers=args.workers, threads=args.threads, max_rate=args.max_rate,
+                        stale_only=args.stale_only)
+    last_report = time.monotonic()
+
+    def on_batch_done(last_id: int, count: int):
+        nonlocal last_report
+        checkpoint["last_id"] = last_id
+        checkpoint["done"] += count
+        save_checkpoint(args.checkpoint, checkpoint)
+
+        now = time.monotonic()
+        if now - last_report >= PROGRESS_INTERVAL_SECONDS:
+            last_report = now
+            rate = rescorer.rate
+            remaining = max(total - checkpoint["done"], 0)
+            eta = format_duration(remaining / rescorer.scan_rate) if rescorer.scan_rate > 0 else "-"
+            percent = checkpoint["done"] / total * 100 if total else 100.0
+            print(f"{checkpoint['done']}/{total} ({percent:.1f}%)  {rate:.1f} reviews/s  ETA {eta}", flush=True)
+
+    rescorer.start()
+    try:
+        rescorer.run(checkpoint["last_id"], args.batch_size, on_batch_done)
+    except KeyboardInterrupt:
+        print(f"\n중단됨 - 리뷰 ID {checkpoint['last_id']}까지 저장됨, 다시 실행하면 이어서 진행합니다.")
+        sys.exit(130)
+    finally:
+        rescorer.stop()
+
+    elapsed = time.monotonic() - rescorer.started_at
+    print(f"완료: 리뷰 {rescorer.processed}개를 {format_duration(elapsed)} 동안 다시 채점 ({rescorer.rate:.1f} reviews/s)")
+    # 끝까지 마쳤으므로 다음 실행은 처음부터
+    if os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+
+if __name__ == "__main__":
+    main()
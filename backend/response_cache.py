@@ -0,0 +1,126 @@
+# 조회 API 응답 캐시
+# 몇 시간 동안 아무것도 바뀌지 않아도 조회할 때마다 저장소에서 모델 객체를 만들고 JSON으로 다시 직렬화하므로
+# 직렬화가 끝난 응답 바이트를 그대로 보관했다가 같은 요청에 재사용함
+#
+# 무효화: 항목마다 만들 때의 데이터 버전(database.get_data_version)을 같이 저장하고,
+# 꺼낼 때 현재 버전과 다르면 버림 -> 영화/리뷰를 바꾸는 모든 쓰기(API, 백그라운드 채점, 다른 프로세스)가
+# 자기가 건드린 scope의 버전만 올리므로 관련된 응답만 정확히 무효화됨 (TTL은 메모리 정리용 상한)
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional
+import config
+
+
+class CachedResponse(NamedTuple):
+    body: bytes                 # 직렬화된 JSON
+    headers: Dict[str, str]     # 같이 보내야 하는 헤더 (X-Next-Cursor 등)
+    version: str                # 만들 때의 데이터 버전
+    expires_at: float
+
+
+class ResponseCache:
+    """
+    요청 키(경로 + 쿼리스트링) -> 직렬화된 응답을 저장하는 TTL + LRU 캐시
+
+    - 데이터 버전이 바뀐 항목은 꺼낼 때 버림 (쓰기 기반 무효화)
+    - ttl_seconds가 지나면 버림
+    - 항목 수가 max_entries, 전체 바이트가 max_bytes를 넘으면 가장 오래 안 쓴 것부터 제거
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        # 히트/미스 카운터
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0  # 데이터가 바뀌어서 버린 항목
+        self.expirations = 0    # TTL이 지나서 버린 항목
+        self.evictions = 0      # 크기 제한으로 버린 항목
+
+    def get(self, key: str, version: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if entry.version != version:
+                self._remove(key)
+                self.invalidations += 1
+                self.misses += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)  # 최근 사용으로 표시
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, version: str, body: bytes, headers: Optional[Dict[str, str]] = None):
+        # 캐시 전체보다 큰 응답은 저장하지 않음 (다른 항목을 전부 밀어내지 않도록)
+        if len(body) > self.max_bytes:
+            return
+
+        entry = CachedResponse(body, dict(headers or {}), version, time.monotonic() + self.ttl_seconds)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+# 서버 전체에서 공유하는 캐시 (처음 사용할 때 생성)
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ResponseCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(
+                    max_entries=config.RESPONSE_CACHE_MAX_ENTRIES,
+                    max_bytes=config.RESPONSE_CACHE_MAX_BYTES,
+                    ttl_seconds=config.RESPONSE_CACHE_TTL_SECONDS,
+                )
+    return _cache
@@ -0,0 +1,150 @@
+# 리뷰 목록 조회용 정렬 인덱스 (JSON 저장소)
+# GET /reviews?limit=...&cursor=... 처럼 일부만 조회할 때 전체 리뷰를 훑거나 정렬하지 않도록
+# ID / 작성 시간 / 감성 점수 순으로 정렬된 키 목록을 유지하고 bisect로 범위를 찾음
+
+from typing import Dict, Iterable, List, Optional, Tuple
+from sortedcontainers import SortedList
+
+ORDER_FIELDS = ("id", "created_at")
+
+
+def created_key(review: dict) -> str:
+    # 작성 시간이 없는 리뷰는 가장 앞으로
+    return review.get("created_at") or ""
+
+
+def order_key(review: dict, order_by: str) -> tuple:
+    """정렬 기준의 키 - 마지막 값은 항상 리뷰 ID (같은 작성 시간끼리도 순서가 정해지도록)"""
+    if order_by == "created_at":
+        return (created_key(review), review["id"])
+    return (review["id"],)
+
+
+class ReviewIndex:
+    """
+    리뷰 정렬 인덱스 모음 (키는 튜플, 마지막 값은 리뷰 ID)
+
+    - 전체: ID순, 작성 시간순, 감성 점수순
+    - 영화별: ID순, 작성 시간순
+    조회할 때는 cursor 다음 위치를 bisect로 찾아서 limit개가 찰 때까지만 읽음
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.by_id = SortedList()
+        self.by_created = SortedList()
+        self.by_score = SortedList()
+        self.movie_by_id: Dict[int, SortedList] = {}
+        self.movie_by_created: Dict[int, SortedList] = {}
+
+    def rebuild(self, reviews: Iterable[dict]):
+        """전체 리뷰로 한 번에 다시 만들기 (파일을 로드할 때 - 하나씩 넣는 것보다 훨씬 빠름)"""
+        reviews = list(reviews)
+        self.by_id = SortedList((review["id"],) for review in reviews)
+        self.by_created = SortedList((created_key(review), review["id"]) for review in reviews)
+        self.by_score = SortedList(
+            (review["sentiment_score"], review["id"]) for review in reviews if review.get("sentiment_score") is not None
+        )
+
+        movie_ids: Dict[int, list] = {}
+        movie_created: Dict[int, list] = {}
+        for review in reviews:
+            movie_ids.setdefault(review["movie_id"], []).append((review["id"],))
+            movie_created.setdefault(review["movie_id"], []).append((created_key(review), review["id"]))
+        self.movie_by_id = {movie_id: SortedList(keys) for movie_id, keys in movie_ids.items()}
+        self.movie_by_created = {movie_id: SortedList(keys) for movie_id, keys in movie_created.items()}
+
+    def add(self, review: dict):
+        self.by_id.add((review["id"],))
+        self.by_created.add((created_key(review), review["id"]))
+        if review.get("sentiment_score") is not None:
+            self.by_score.add((review["sentiment_score"], review["id"]))
+        self.movie_by_id.setdefault(review["movie_id"], SortedList()).add((review["id"],))
+        self.movie_by_created.setdefault(review["movie_id"], SortedList()).add((created_key(review), review["id"]))
+
+    def remove(self, review: dict):
+        self.by_id.discard((review["id"],))
+        self.by_created.discard((created_key(review), review["id"]))
+        if review.get("sentiment_score") is not None:
+            self.by_score.discard((review["sentiment_score"], review["id"]))
+        for index in (self.movie_by_id, self.movie_by_created):
+            keys = index.get(review["movie_id"])
+            if keys is not None:
+                keys.discard(order_key(review, "id" if index is self.movie_by_id else "created_at"))
+                if not keys:
+                    del index[review["movie_id"]]
+
+    def query(self, reviews: Dict[int, dict], limit: Optional[int] = None, after: Optional[tuple] = None,
+              order_by: str = "id", desc: bool = False, movie_id: Optional[int] = None,
+              created_from: Optional[str] = None, created_to: Optional[str] = None,
+              min_score: Optional[float] = None, max_score: Optional[float] = None) -> Tuple[List[dict], Optional[tuple]]:
+        """
+        조건에 맞는 리뷰를 정렬 순서대로 최대 limit개 + 다음 페이지 키 (더 없으면 None)
+
+        after: 이전 페이지 마지막 리뷰의 정렬 키 (이 키 다음부터)
+        created_from <= created_at < created_to, min_score <= sentiment_score <= max_score
+        """
+
+        def matches(review: dict) -> bool:
+            if movie_id is not None and review["movie_id"] != movie_id:
+                return False
+            created = created_key(review)
+            if (created_from is not None and created < created_from) or (created_to is not None and created >= created_to):
+                return False
+            if min_score is not None or max_score is not None:
+                score = review.get("sentiment_score")
+                if score is None:
+                    return False
+                if (min_score is not None and score < min_score) or (max_score is not None and score > max_score):
+                    return False
+            return True
+
+        # 1) 정렬 기준 인덱스에서 범위 찾기 (영화 필터가 있으면 영화별 인덱스)
+        if movie_id is None:
+            index = self.by_created if order_by == "created_at" else self.by_id
+        else:
+            index = (self.movie_by_created if order_by == "created_at" else self.movie_by_id).get(movie_id, SortedList())
+
+        start, stop = 0, len(index)
+        if order_by == "created_at":
+            if created_from is not None:
+                start = index.bisect_left((created_from,))
+            if created_to is not None:
+                stop = index.bisect_left((created_to,))
+        if after is not None:
+            if desc:
+                stop = min(stop, index.bisect_left(after))
+            else:
+                start = max(start, index.bisect_right(after))
+
+        # 2) 점수 범위에 들어가는 리뷰가 더 적으면 점수 인덱스에서 꺼내서 정렬 (조건이 까다로운 경우)
+        if min_score is not None or max_score is not None:
+            score_start = self.by_score.bisect_left((min_score,)) if min_score is not None else 0
+            score_stop = (self.by_score.bisect_right((max_score, float("inf")))
+                          if max_score is not None else len(self.by_score))
+            if score_stop - score_start < stop - start:
+                candidates = [reviews[key[-1]] for key in self.by_score.islice(score_start, score_stop)]
+                keyed = [(order_key(review, order_by), review) for review in candidates if matches(review)]
+                if after is not None:
+                    keyed = [(key, review) for key, review in keyed if (key < after if desc else key > after)]
+                keyed.sort(key=lambda item: item[0], reverse=desc)
+                return self._page([review for _, review in keyed], limit, order_by)
+
+        # 3) 정렬 순서대로 읽으면서 조건에 맞는 것만 limit+1개까지 (다음 페이지가 있는지 확인용 1개)
+        results = []
+        for key in index.islice(start, stop, reverse=desc):
+            review = reviews[key[-1]]
+            if matches(review):
+                results.append(review)
+                if limit is not None and len(results) > limit:
+                    break
+        return self._page(results, limit, order_by)
+
+    @staticmethod
+    def _page(results: List[dict], limit: Optional[int], order_by: str) -> Tuple[List[dict], Optional[tuple]]:
+        if limit is None or len(results) <= limit:
+            return results, None
+        page = results[:limit]
+        return page, order_key(page[-1], order_by)
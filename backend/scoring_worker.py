@@ -0,0 +1,229 @@
+# 비동기 감성 분석 워커
+# SENTIMENT_MODE="async"일 때 점수 없이 저장된 리뷰(sentiment_status="pending")를
+# 백그라운드에서 배치로 채점해서 저장된 리뷰에 점수를 채워 넣음
+# + 모델/점수 매핑 버전이 바뀌었을 때 예전 버전 점수를 한가한 시간에 조금씩 다시 채점하는 워커
+
+import threading
+import traceback
+from concurrent.futures import Future, as_completed
+from typing import Callable, Dict, List, Optional
+import batch_scheduler
+import config
+import database as db
+import emotion_store
+import sentiment
+
+
+class ScoringWorker:
+    """
+    대기 중인 리뷰를 batch_size개씩 꺼내서 submit_batch로 채점하고 db에 반영하는 백그라운드 스레드
+    (submit_batch는 텍스트마다 (감성 점수, 감정 확률 벡터)를 담은 Future를 반환 - 감정 분포는 emotion_store에 저장)
+
+    - 리뷰 작성 응답 시간이 모델 추론 시간과 무관해짐
+    - 밀린 리뷰는 모델에 가장 효율적인 배치 크기로 한꺼번에 처리
+    - 새 리뷰가 들어오면 notify()로 바로 깨우고, 아니면 poll_seconds마다 확인
+      (서버 재시작 전에 남아 있던 pending 리뷰도 시작하자마자 처리됨)
+    - 밀린 리뷰가 많으면 배치 max_in_flight개(추론 워커 수)를 결과를 기다리지 않고 한꺼번에 보내서
+      워커들이 동시에 계산하게 하고, 끝나는 순서대로 저장
+    """
+
+    def __init__(self, submit_batch: Callable[[List[str]], Future],
+                 batch_size: int = 32, poll_seconds: float = 5, max_in_flight: int = 1):
+        self.submit_batch = submit_batch
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+        self.poll_seconds = poll_seconds
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._stopped.clear()
+                self._thread = threading.Thread(target=self._run, name="scoring-worker", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+
+    def notify(self):
+        """새 pending 리뷰가 생겼다고 알림"""
+        self.start()
+        self._wakeup.set()
+
+    def run_once(self) -> int:
+        """대기 중인 리뷰를 최대 max_in_flight 배치만큼 동시에 채점 - 처리한 리뷰 수 반환"""
+        pending = db.get_pending_reviews(self.batch_size * self.max_in_flight)
+        if not pending:
+            return 0
+
+        in_flight: Dict[Future, list] = {}
+        error: Optional[Exception] = None
+        try:
+            for start in range(0, len(pending), self.batch_size):
+                batch = pending[start:start + self.batch_size]
+                in_flight[self.submit_batch([review.content for review in batch])] = batch
+        except Exception as e:
+            # 추론 풀이 가득 찬 경우(PoolBusyError) 등 - 이미 보낸 배치는 저장하고 나머지는 다음 차례에
+            error = e
+
+        processed = 0
+        for future in as_completed(in_flight):
+            batch = in_flight[future]
+            try:
+                results = future.result()
+            except Exception as e:
+                error = error or e
+                continue
+            db.update_review_scores({review.id: score for review, (score, _) in zip(batch, results)})
+            emotion_store.get_store().put_many(
+                {review.id: emotions for review, (_, emotions) in zip(batch, results) if emotions is not None}
+            )
+            processed += len(batch)
+
+        if error is not None and processed == 0:
+            raise error
+        if error is not None:
+            traceback.print_exception(error)
+        return processed
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                processed = self.run_once()
+            except Exception:
+                # 워커가 죽으면 pending 리뷰가 영원히 남으므로 로그만 남기고 잠시 후 재시도
+                traceback.print_exc()
+                processed = 0
+
+            if processed == 0:
+                self._wakeup.wait(self.poll_seconds)
+                self._wakeup.clear()
+        self._thread = None
+
+
+class StaleScoreRefresher:
+    """
+    현재 버전(config.SCORING_VERSION)이 아닌 점수를 가진 리뷰를 백그라운드에서 다시 채점하는 스레드
+
+    - 모델을 바꿔도 전체 재채점을 한 번에 돌리지 않고, 서버가 한가할 때만 조금씩 처리
+      (실시간 채점 요청이 idle_seconds 안에 있었거나 비동기 대기 리뷰가 있으면 양보)
+    - 초당 max_rate개를 넘지 않도록 배치 사이에 쉼
+    - 리뷰 ID 순서로 진행하고 끝까지 가면 처음부터 다시 확인, 남은 게 없으면 poll_seconds마다 확인
+    """
+
+    def __init__(self, score_batch: Callable[[List[str]], list], batch_size: int = 16,
+                 max_rate: float = 5, idle_seconds: float = 2, poll_seconds: float = 60):
+        self.score_batch = score_batch
+        self.batch_size = batch_size
+        self.max_rate = max_rate
+        self.idle_seconds = idle_seconds
+        self.poll_seconds = poll_seconds
+        self.processed = 0
+        self._cursor = 0  # 마지막으로 처리한 리뷰 ID
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._stopped.clear()
+                self._thread = threading.Thread(target=self._run, name="stale-score-refresher", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def is_idle(self) -> bool:
+        if batch_scheduler.get_scheduler().idle_seconds() < self.idle_seconds:
+            return False
+        return not db.get_pending_reviews(1)
+
+    def run_once(self) -> int:
+        """오래된 점수 한 배치 다시 채점 - 처리한 리뷰 수 반환"""
+        stale = db.get_stale_reviews(self.batch_size, after_id=self._cursor)
+        if not stale and self._cursor:
+            # 끝까지 갔으면 처음부터 한 번 더 (진행 중에 앞쪽에 생긴 오래된 점수)
+            self._cursor = 0
+            stale = db.get_stale_reviews(self.batch_size)
+        if not stale:
+            return 0
+
+        results = self.score_batch([review.content for review in stale])
+        db.update_review_scores({review.id: score for review, (score, _) in zip(stale, results)})
+        emotion_store.get_store().put_many(
+            {review.id: emotions for review, (_, emotions) in zip(stale, results) if emotions is not None}
+        )
+        self._cursor = stale[-1].id
+        self.processed += len(stale)
+        return len(stale)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            if not self.is_idle():
+                self._stopped.wait(self.idle_seconds)
+                continue
+
+            try:
+                processed = self.run_once()
+            except Exception:
+                # 추론 풀이 바쁘거나(PoolBusyError) 일시적인 오류 - 로그만 남기고 나중에 재시도
+                traceback.print_exc()
+                self._stopped.wait(self.poll_seconds)
+                continue
+
+            if processed == 0:
+                self._stopped.wait(self.poll_seconds)
+            elif self.max_rate > 0:
+                self._stopped.wait(processed / self.max_rate)
+        self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            "scoring_version": config.SCORING_VERSION,
+            "stale_reviews": db.count_stale_reviews(),
+            "rescored": self.processed,
+            "running": self._thread is not None,
+        }
+
+
+# 서버 전체에서 공유하는 워커
+_worker: Optional[ScoringWorker] = None
+_worker_lock = threading.Lock()
+
+
+def get_worker() -> ScoringWorker:
+    global _worker
+    if _worker is None:
+        with _worker_lock:
+            if _worker is None:
+                _worker = ScoringWorker(
+                    sentiment.submit_emotions_batch,
+                    batch_size=config.SCORING_WORKER_BATCH_SIZE,
+                    poll_seconds=config.SCORING_WORKER_POLL_SECONDS,
+                    max_in_flight=max(config.INFERENCE_WORKERS, 1),
+                )
+    return _worker
+
+
+_refresher: Optional[StaleScoreRefresher] = None
+_refresher_lock = threading.Lock()
+
+
+def get_refresher() -> StaleScoreRefresher:
+    global _refresher
+    if _refresher is None:
+        with _refresher_lock:
+            if _refresher is None:
+                _refresher = StaleScoreRefresher(
+                    sentiment.analyze_emotions_batch,
+                    batch_size=config.STALE_RESCORE_BATCH_SIZE,
+                    max_rate=config.STALE_RESCORE_MAX_RATE,
+                    idle_seconds=config.STALE_RESCORE_IDLE_SECONDS,
+                    poll_seconds=config.STALE_RESCORE_POLL_SECONDS,
+                )
+    return _refresher
@@ -1,23 +1,59 @@
 # 한국어 리뷰 감성 분석 모듈
 # nlp04/korean_sentiment_analysis_kcelectra 모델 사용
+#
+# torch / transformers는 import만 해도 수 초, 수백 MB가 들기 때문에
+# 모듈 맨 위가 아니라 실제로 모델을 쓰는 함수 안에서 import 함
+# -> 영화/리뷰 CRUD만 쓰는 API 프로세스나 테스트는 torch 없이 바로 뜸
 
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
+import argparse
+import os
+import sys
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+import numpy as np
+import config
+from sentiment_cache import SentimentCache, normalize_text
+
+# 허깅페이스에서 모델 이름 지정
+MODEL_NAME = "nlp04/korean_sentiment_analysis_kcelectra"
+
+# 모델이 출력하는 11개 감정 클래스 (id2label 순서)
+EMOTION_LABELS = ["기쁨", "고마운", "설레는", "사랑하는", "즐거운", "일상적인", "생각이 많은", "슬픔", "힘듦", "짜증남", "걱정스러운"]
 
 # 전역 변수로 모델과 토크나이저를 저장
 # 매번 로드하면 느리니까 한 번만 로드해서 재사용
 
 _model = None
 _tokenizer = None
+_cache = None
+
+
+def get_cache() -> SentimentCache:
+    """
+    텍스트별 감성 점수 캐시 (처음 호출할 때 생성)
+    같은 리뷰 텍스트는 모델을 다시 돌리지 않음
+    """
+
+    global _cache
+    if _cache is None:
+        # 백엔드마다 점수가 조금씩 다르므로 캐시 키에 백엔드도 포함
+        # 점수 버전이 바뀌면(매핑 변경 등) 예전 점수가 캐시에서 나오지 않도록 버전도 포함
+        _cache = SentimentCache(
+            f"{MODEL_NAME}:{config.SCORING_VERSION}:{config.SENTIMENT_BACKEND}",
+            max_entries=config.SENTIMENT_CACHE_SIZE,
+            disk_path=config.SENTIMENT_CACHE_PATH or None,
+        )
+    return _cache
 
 
 def load_model():
     """
     감성 분석 모델과 토크나이저를 메모리에 로드
     처음 한 번 실행, 이후로는 캐싱된 모델 사용
+    config.SENTIMENT_BACKEND에 따라 fp32 / int8 양자화 / ONNX Runtime 중 하나를 사용
 
     Returns:
-        model: 감성 분석용 파인튜닝된 모델
+        model: 감성 분석용 파인튜닝된 모델 (onnx 백엔드면 InferenceSession)
         tokenizer: 텍스트를 모델 입력으로 변환
     """
 
@@ -27,58 +63,180 @@ def load_model():
     if _model is not None and _tokenizer is not None:
         return _model, _tokenizer
     
-    print("감성 분석 모델을 로딩 중입니다! ⚙")
+    print(f"감성 분석 모델을 로딩 중입니다! ⚙ (backend={config.SENTIMENT_BACKEND})")
 
-    # 허깅페이스에서 모델 이름 지정
-    model_name = "nlp04/korean_sentiment_analysis_kcelectra"
+    _model, _tokenizer = _load_backend(config.SENTIMENT_BACKEND)
+
+    print("모델 로딩 완료")
+
+    return _model, _tokenizer
+
+
+def _load_backend(backend: str):
+    """지정한 추론 백엔드로 모델과 토크나이저 로드 (전역 캐시 없이)"""
+
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
 
     # 토크나이저 로드
-    _tokenizer = AutoTokenizer.from_pretrained(model_name)
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+
+    if backend == "onnx":
+        import onnxruntime
+
+        # 처음 한 번만 export 해두고 이후에는 파일을 바로 로드
+        if not os.path.exists(config.ONNX_MODEL_PATH):
+            export_onnx(config.ONNX_MODEL_PATH, tokenizer)
+        session = onnxruntime.InferenceSession(config.ONNX_MODEL_PATH, providers=["CPUExecutionProvider"])
+        return session, tokenizer
 
     # 모델 로드
     # AutoModelForSequenceClassification: 텍스트 분류용 모델
-    _model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
 
     # 모델을 평가 모드로 설정
     # eval(): 학습 모드가 아닌 추론(예측) 모드로 전환
     # 드롭아웃, 배치 정규화 등이 비활성화됨
-    _model.eval()
+    model.eval()
 
-    print("모델 로딩 완료")
+    if backend == "torch-int8":
+        # 동적 양자화: Linear 가중치를 int8로 저장하고 활성값은 실행 시점에 양자화
+        # 모델 크기가 약 1/4로 줄고 CPU 행렬곱이 빨라짐
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    elif backend != "torch":
+        raise ValueError(f"알 수 없는 SENTIMENT_BACKEND: {backend} (torch / torch-int8 / onnx 중 선택)")
 
-    return _model, _tokenizer
+    return model, tokenizer
 
-# 클래스 label이 2개가 아니라 11개인 걸 깨닫고나서 수정 들어감
-def analyze_sentiment(text: str) -> float:
+
+def export_onnx(path: str, tokenizer=None):
     """
-    텍스트에서 감성을 분석하여 0~1 사이의 점수를 반환
+    fp32 PyTorch 모델을 ONNX 파일로 변환 (배치 크기/문장 길이는 가변)
+
+    Args:
+        path: 저장할 .onnx 파일 경로
+        tokenizer: 예시 입력을 만들 토크나이저 (없으면 새로 로드)
     """
 
-    # 빈 텍스트 처리
-    if not text or not text.strip():
-        return 0.5
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
 
-    _model, _tokenizer = load_model()
-    
-    # 텍스트를 모델이 이해할 수 있는 형태로 변환시킬 것
-    inputs = _tokenizer(
-        text,
-        return_tensors="pt",
-        padding=True,
-        truncation=True,
-        max_length=512
+    class _LogitsOnly(torch.nn.Module):
+        # ONNX export용 래퍼 - 모델 출력 중 logits만 반환
+        def __init__(self, model, input_names):
+            super().__init__()
+            self.model = model
+            self.input_names = input_names
+
+        def forward(self, *tensors):
+            return self.model(**dict(zip(self.input_names, tensors))).logits
+
+    print(f"ONNX 모델로 변환 중입니다... -> {path}")
+
+    tokenizer = tokenizer or AutoTokenizer.from_pretrained(MODEL_NAME)
+    model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
+    model.eval()
+
+    dummy = tokenizer(["예시 문장입니다", "ONNX 변환용 입력"], return_tensors="pt", padding=True)
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in dummy]
+
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    torch.onnx.export(
+        _LogitsOnly(model, input_names),
+        tuple(dummy[name] for name in input_names),
+        path,
+        input_names=input_names,
+        output_names=["logits"],
+        dynamic_axes=dynamic_axes,
+        opset_version=17,
+        dynamo=False,
     )
 
-    # 그래디언트 계산 비활성화 (추론 시에는 필요 없음, 메모리 절약)
-    with torch.no_grad():
-        # 모델에 입력 전달하여 예측 수행
-        # outputs.logits: 각 클래스(긍정/부정)에 대한 raw 점수
-        outputs = _model(**inputs)
+    print("ONNX 변환 완료")
+
+
+def _predict_probabilities(texts: list, model=None, tokenizer=None) -> "torch.Tensor":
+    """
+    텍스트 리스트를 모델에 넣어 11개 감정 클래스 확률 (len(texts), 11) 반환
+    model/tokenizer를 안 주면 load_model()의 전역 모델 사용
+
+    한 번에 전부 패딩하면 긴 리뷰 하나 때문에 모든 리뷰가 512 토큰 길이로 계산되고
+    리스트가 크면 메모리가 부족해짐
+    -> 토큰 길이순으로 정렬해서 토큰 예산(config.SENTIMENT_TOKEN_BUDGET) 안에서 버킷으로 나눠 실행하고
+       결과는 원래 순서로 되돌림
+    """
+
+    import torch
+
+    if model is None or tokenizer is None:
+        model, tokenizer = load_model()
+
+    # 패딩 없이 토큰화만 먼저 해서 길이를 구함
+    encoded = tokenizer(texts, truncation=True, max_length=512)
+    lengths = [len(ids) for ids in encoded["input_ids"]]
+
+    results = [None] * len(texts)
+    for bucket in _make_buckets(lengths):
+        # 버킷 안에서만 패딩 (버킷 내 최대 길이까지)
+        inputs = tokenizer.pad(
+            {key: [values[i] for i in bucket] for key, values in encoded.items()},
+            return_tensors="pt"
+        )
+        probabilities = _forward_probabilities(model, inputs)
+        for row, i in enumerate(bucket):
+            results[i] = probabilities[row]
+
+    return torch.stack(results)
+
+
+def _make_buckets(lengths: list) -> list:
+    """
+    길이순으로 정렬한 인덱스를 (개수 x 최대 길이) <= 토큰 예산, 개수 <= 최대 버킷 크기가 되도록 나누기
+    길이가 예산보다 긴 텍스트는 혼자 한 버킷
+    """
+
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    buckets = []
+    current = []
+    for i in order:
+        # 오름차순이라 새로 넣는 텍스트의 길이가 곧 버킷의 최대 길이
+        padded_tokens = (len(current) + 1) * lengths[i]
+        if current and (padded_tokens > config.SENTIMENT_TOKEN_BUDGET
+                        or len(current) >= config.SENTIMENT_MAX_BUCKET_SIZE):
+            buckets.append(current)
+            current = []
+        current.append(i)
+    if current:
+        buckets.append(current)
+    return buckets
+
+
+def _forward_probabilities(model, inputs) -> "torch.Tensor":
+    """패딩된 입력 한 배치를 모델에 넣고 softmax 확률 반환"""
+
+    import torch
+
+    if hasattr(model, "get_inputs"):
+        # ONNX Runtime 세션: numpy 배열로 입력
+        feed = {i.name: inputs[i.name].numpy() for i in model.get_inputs()}
+        logits = torch.from_numpy(model.run(["logits"], feed)[0])
+    else:
+        # 그래디언트 계산 비활성화 (추론 시에는 필요 없음, 메모리 절약)
+        with torch.no_grad():
+            # 모델에 입력 전달하여 예측 수행
+            # outputs.logits: 각 클래스에 대한 raw 점수
+            logits = model(**inputs).logits
 
     # logits를 확률로 변환
     # softmax: 각 클래스의 점수를 0~1 사이 확률로 변환 (합이 1이 되는 거)
-    # dim=1: 마지막 차원(클래스 차원)에 대해 softmax 적용
-    probabilities = torch.nn.functional.softmax(outputs.logits, dim=1)
+    # dim=-1: 마지막 차원(클래스 차원)에 대해 softmax 적용
+    return torch.nn.functional.softmax(logits, dim=-1)
+
+
+def probabilities_to_scores(probabilities) -> list:
+    """11개 감정 확률 (n, 11)을 0~1 사이 감성 점수 리스트로 변환 (리뷰별 반복문 없이 행렬 연산 한 번)"""
 
     # -----디버깅: 클래스 레이블 확인-----
     # print(f"\n모델 클래스 레이블: {_model.config.id2label}")
@@ -94,88 +252,195 @@ def analyze_sentiment(text: str) -> float:
     neutral_indices = [5, 6]
     # 5(일상적인), 6(생각이 많은)
 
-    # 감정 그룹의 확률 합계를 계산하는 부분 한줄코딩
-    positive_score = sum(probabilities[0][i].item() for i in positive_indices)
-    negative_score = sum(probabilities[0][i].item() for i in negative_indices)
-    neutral_score = sum(probabilities[0][i].item() for i in neutral_indices)
+    probabilities = np.asarray(probabilities, dtype=np.float64).reshape(-1, len(EMOTION_LABELS))
 
     # 긍정 +중립*0.5 비율로 최종 점수 계산
-    # 중립은 절반만 긍정으로 계산
-    total = positive_score + negative_score + neutral_score
+    # 중립은 절반만 긍정으로 계산 (부정은 가중치 0)
+    weights = np.zeros(len(EMOTION_LABELS))
+    weights[positive_indices] = 1.0
+    weights[neutral_indices] = 0.5
 
-    if total == 0:
-        return 0.5
-    
-    # 긍정 비율 계산 (중립은 0.5 가중치)
-    sentiment_score = (positive_score + neutral_score*0.5) / total
+    total = probabilities[:, positive_indices + negative_indices + neutral_indices].sum(axis=1)
+    weighted = probabilities @ weights
+
+    # 확률 합이 0이면 중립(0.5)
+    scores = np.divide(weighted, total, out=np.full_like(total, 0.5), where=total > 0)
+    return scores.tolist()
+
+
+def predict_texts(texts: list) -> np.ndarray:
+    """캐시 없이 현재 프로세스의 모델로 11개 감정 확률 (len(texts), 11) float32 계산 (추론 워커 프로세스에서도 사용)"""
+    if not texts:
+        return np.empty((0, len(EMOTION_LABELS)), dtype=np.float32)
+    return np.asarray(_predict_probabilities(texts), dtype=np.float32)
+
+
+def score_texts(texts: list) -> list:
+    """캐시 없이 현재 프로세스의 모델로 바로 점수 계산"""
+    return probabilities_to_scores(predict_texts(texts))
 
-    return sentiment_score
+
+def _predict_uncached(texts: list) -> np.ndarray:
+    # 추론 워커 풀을 쓰도록 설정되어 있으면 워커 프로세스에 맡김
+    if config.INFERENCE_WORKERS > 0:
+        import inference_pool
+        return inference_pool.get_pool().predict_batch(texts)
+    return predict_texts(texts)
+
+def warm_up(lengths: list = None, batch_size: int = None):
+    """
+    모델 로드 + 여러 문장 길이로 미리 한 번씩 실행 (첫 요청이 로딩/초기화 비용을 떠안지 않도록)
+    캐시는 거치지 않음 / 추론 워커 풀을 쓰면 워커마다 한 번씩 돌아가도록 워커 수만큼 보냄
+    """
+
+    lengths = lengths or config.SENTIMENT_WARMUP_LENGTHS
+    batch_size = batch_size or config.SENTIMENT_BATCH_SIZE
+
+    if config.INFERENCE_WORKERS > 0:
+        import inference_pool
+        pool = inference_pool.get_pool()
+        for length in lengths:
+            texts = ["가" * length] * batch_size
+            futures = [pool.submit(texts) for _ in range(pool.num_workers)]
+            for future in futures:
+                future.result(timeout=config.INFERENCE_RESULT_TIMEOUT_SECONDS)
+        return
+
+    load_model()
+    for length in lengths:
+        # 글자 하나가 대략 토큰 하나 (512 토큰 넘는 부분은 잘림)
+        score_texts(["가" * length] * batch_size)
+
+# 클래스 label이 2개가 아니라 11개인 걸 깨닫고나서 수정 들어감
+def analyze_sentiment(text: str) -> float:
+    """
+    텍스트에서 감성을 분석하여 0~1 사이의 점수를 반환
+    """
+
+    return analyze_emotions_batch([text])[0][0]
 
 
 def analyze_sentiment_batch(texts: list) -> list:
     """
     여러 텍스트를 한 번에 분석 (배치 처리)
     """
-    if not texts:
-        return []
-    
-    processed_texts = []
-    empty_indices = []
-    
-    for i, text in enumerate(texts):
-        if text and text.strip():
-            processed_texts.append(text)
-        else:
-            empty_indices.append(i)
-    
+    return [score for score, _ in analyze_emotions_batch(texts)]
+
+
+def analyze_emotions_batch(texts: list) -> List[Tuple[float, Optional[np.ndarray]]]:
+    """
+    여러 텍스트를 한 번에 분석해서 (감성 점수, 11개 감정 확률 float16 벡터) 리스트 반환
+    빈 텍스트는 (0.5, None) - 감정 분포 없이 중립 점수만
+    """
+    results, miss_indices, processed_texts = _lookup_cached(texts)
+    if processed_texts:
+        _fill_computed(texts, results, miss_indices, processed_texts, _predict_uncached(processed_texts))
+    return results
+
+
+def submit_emotions_batch(texts: list) -> Future:
+    """
+    analyze_emotions_batch와 같은 결과를 Future로 반환 (마이크로 배치 스케줄러 / 비동기 워커용)
+
+    추론 워커 풀을 쓰면 캐시에 없는 텍스트를 풀에 보내기만 하고 바로 반환하므로
+    호출하는 스레드 하나가 배치 여러 개를 동시에 여러 워커에 맡길 수 있음
+    (결과는 풀의 결과 수집 스레드에서 채워짐 / 풀이 가득 차면 PoolBusyError는 여기서 바로 발생)
+    풀을 쓰지 않으면 이 스레드에서 계산한 뒤 완료된 Future를 반환
+    """
+    future: Future = Future()
+    if config.INFERENCE_WORKERS <= 0:
+        try:
+            future.set_result(analyze_emotions_batch(texts))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    import inference_pool
+    results, miss_indices, processed_texts = _lookup_cached(texts)
     if not processed_texts:
-        return [0.5] * len(texts)
-    
-    _model, _tokenizer = load_model()
+        future.set_result(results)
+        return future
+
+    def on_done(pool_future: Future):
+        try:
+            future.set_result(_fill_computed(texts, results, miss_indices, processed_texts, pool_future.result()))
+        except Exception as e:
+            future.set_exception(e)
+
+    inference_pool.get_pool().submit(processed_texts).add_done_callback(on_done)
+    return future
+
+
+def _lookup_cached(texts: list) -> tuple:
+    """(결과 목록 - 캐시/빈 텍스트만 채워짐, 캐시에 없는 위치, 모델에 넣을 정규화된 텍스트 목록)"""
+    # 빈 텍스트는 중립 점수(0.5), 캐시에 있는 텍스트는 캐시 점수
+    results: List[Tuple[float, Optional[np.ndarray]]] = [(0.5, None)] * len(texts)
+    text_indices = [i for i, text in enumerate(texts) if text and text.strip()]
+    cache = get_cache()
+    cached_entries = cache.get_many([texts[i] for i in text_indices])
     
-    inputs = _tokenizer(
-        processed_texts,
-        return_tensors="pt",
-        padding=True,
-        truncation=True,
-        max_length=512
-    )
+    miss_indices = []
+    for i, cached_entry in zip(text_indices, cached_entries):
+        if cached_entry is not None:
+            results[i] = cached_entry
+        else:
+            miss_indices.append(i)
     
-    with torch.no_grad():
-        outputs = _model(**inputs)
+    # 캐시에 없는 텍스트만 모델에 넣음 (배치 안에서 같은 텍스트는 한 번만)
+    processed_texts = list(dict.fromkeys(normalize_text(texts[i]) for i in miss_indices))
+    return results, miss_indices, processed_texts
+
+
+def _fill_computed(texts: list, results: list, miss_indices: List[int], processed_texts: List[str],
+                   probabilities: np.ndarray) -> list:
+    scores = probabilities_to_scores(probabilities)
     
-    probabilities = torch.nn.functional.softmax(outputs.logits, dim=-1)
+    # 점수는 float32 확률로 계산하고, 보관용 감정 벡터는 float16으로 줄임
+    computed = dict(zip(processed_texts, zip(scores, probabilities.astype(np.float16))))
+    get_cache().put_many(computed)
     
-    # 감정 인덱스 매핑
-    positive_indices = [0, 1, 2, 3, 4]
-    negative_indices = [7, 8, 9, 10]
-    neutral_indices = [5, 6]
+    # 원래 위치에 점수 채우기
+    for i in miss_indices:
+        results[i] = computed[normalize_text(texts[i])]
     
-    scores = []
-    for i in range(len(processed_texts)):
-        positive_score = sum(probabilities[i][idx].item() for idx in positive_indices)
-        negative_score = sum(probabilities[i][idx].item() for idx in negative_indices)
-        neutral_score = sum(probabilities[i][idx].item() for idx in neutral_indices)
-        
-        total = positive_score + negative_score + neutral_score
-        
-        if total == 0:
-            scores.append(0.5)
-        else:
-            # 괄호 추가!
-            sentiment_score = (positive_score + neutral_score * 0.5) / total
-            scores.append(sentiment_score)
-    
-    # 빈 텍스트 위치에 중립 점수 삽입
-    for idx in empty_indices:
-        scores.insert(idx, 0.5)
-    
-    return scores
+    return results
+
+
+def check_parity(texts: list, tolerance: float = None) -> dict:
+    """
+    현재 백엔드(config.SENTIMENT_BACKEND)의 점수가 fp32 PyTorch 모델과 허용 오차 안인지 확인
+    양자화/ONNX로 바꾼 뒤 점수가 크게 달라지지 않았는지 배포 전에 확인하는 용도
+
+    Returns:
+        백엔드 이름, 최대/평균 점수 차이, 허용 오차, 통과 여부
+    """
+
+    tolerance = config.PARITY_TOLERANCE if tolerance is None else tolerance
+    texts = [normalize_text(text) for text in texts if text and text.strip()]
+
+    reference_model, reference_tokenizer = _load_backend("torch")
+    reference = probabilities_to_scores(_predict_probabilities(texts, reference_model, reference_tokenizer))
+    candidate = score_texts(texts)
+
+    diffs = [abs(a - b) for a, b in zip(reference, candidate)]
+    max_diff = max(diffs, default=0.0)
+    return {
+        "backend": config.SENTIMENT_BACKEND,
+        "max_abs_diff": max_diff,
+        "mean_abs_diff": sum(diffs) / len(diffs) if diffs else 0.0,
+        "tolerance": tolerance,
+        "passed": max_diff <= tolerance,
+    }
     
 
 
 # 테스트 코드 (이 파일을 직접 실행했을 때만 작동)
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="감성 분석 모델 테스트")
+    parser.add_argument("--export-onnx", action="store_true", help="ONNX 모델 파일 생성 (config.ONNX_MODEL_PATH)")
+    parser.add_argument("--check-parity", action="store_true", help="현재 백엔드 점수를 fp32 모델과 비교")
+    args = parser.parse_args()
+
     # 테스트용 리뷰 예시
     test_reviews = [
         "정말 감동적인 영화였어요! 최고!",
@@ -185,6 +450,15 @@ if __name__ == "__main__":
         "돈 아까워요 ㅠㅠ"
     ]
     
+    if args.export_onnx:
+        export_onnx(config.ONNX_MODEL_PATH)
+        sys.exit(0)
+
+    if args.check_parity:
+        result = check_parity(test_reviews)
+        print(result)
+        sys.exit(0 if result["passed"] else 1)
+
     print("\n---감성 분석 테스트---\n")
     
     for review in test_reviews:
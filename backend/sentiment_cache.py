@@ -0,0 +1,128 @@
+# 감성 점수 캐시
+# "최고!", "별로예요" 같은 짧은 리뷰는 계속 똑같이 들어오므로 모델을 다시 돌리지 않고 재사용
+
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# 캐시 값: (감성 점수, 11개 감정 확률 float16 벡터)
+CacheEntry = Tuple[float, np.ndarray]
+
+
+def normalize_text(text: str) -> str:
+    """앞뒤 공백 제거 + 연속된 공백/줄바꿈을 공백 하나로 (공백만 다른 리뷰는 같은 리뷰로 취급)"""
+    return " ".join(text.split())
+
+
+class SentimentCache:
+    """
+    (모델 ID + 정규화된 텍스트)의 해시를 키로 감성 점수와 감정 확률 벡터를 저장하는 캐시
+
+    - 메모리: 최대 max_entries개의 LRU (가장 오래 안 쓴 것부터 제거)
+    - 디스크(선택): disk_path를 주면 SQLite 파일에도 저장해서 서버 재시작 후에도 사용
+    - 모델이 바뀌면 키가 달라지므로 예전 점수가 섞이지 않음
+    """
+
+    def __init__(self, model_id: str, max_entries: int = 10000, disk_path: Optional[str] = None):
+        self.model_id = model_id
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # 히트/미스 카운터
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._disk: Optional[sqlite3.Connection] = None
+        if disk_path:
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS sentiment_cache (key TEXT PRIMARY KEY, score REAL NOT NULL, probs BLOB)"
+            )
+            # 감정 벡터를 저장하기 전에 만들어진 캐시 파일이면 컬럼 추가
+            columns = {row[1] for row in self._disk.execute("PRAGMA table_info(sentiment_cache)")}
+            if "probs" not in columns:
+                self._disk.execute("ALTER TABLE sentiment_cache ADD COLUMN probs BLOB")
+            self._disk.commit()
+
+    def make_key(self, text: str) -> str:
+        raw = f"{self.model_id}\0{normalize_text(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> Optional[CacheEntry]:
+        return self.get_many([text])[0]
+
+    def put(self, text: str, score: float, probs: np.ndarray):
+        self.put_many({text: (score, probs)})
+
+    def get_many(self, texts: List[str]) -> List[Optional[CacheEntry]]:
+        keys = [self.make_key(text) for text in texts]
+        results: List[Optional[CacheEntry]] = [None] * len(texts)
+        disk_lookup = []
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)  # 최근 사용으로 표시
+                    results[i] = entry
+                    self.hits += 1
+                else:
+                    disk_lookup.append(i)
+
+            # 메모리에 없는 것만 디스크에서 한 번에 조회
+            # (감정 벡터 없이 점수만 저장된 예전 항목은 미스로 보고 다시 계산)
+            if disk_lookup and self._disk is not None:
+                wanted = list({keys[i] for i in disk_lookup})
+                placeholders = ",".join("?" * len(wanted))
+                found = {key: (score, np.frombuffer(probs, dtype=np.float16)) for key, score, probs in self._disk.execute(
+                    f"SELECT key, score, probs FROM sentiment_cache WHERE probs IS NOT NULL AND key IN ({placeholders})",
+                    wanted,
+                ).fetchall()}
+                for i in disk_lookup:
+                    entry = found.get(keys[i])
+                    if entry is not None:
+                        results[i] = entry
+                        self.disk_hits += 1
+                        self._remember(keys[i], entry)
+
+            self.misses += sum(1 for i in disk_lookup if results[i] is None)
+        return results
+
+    def put_many(self, entries: Dict[str, CacheEntry]):
+        rows = [(self.make_key(text), score, np.asarray(probs, dtype=np.float16))
+                for text, (score, probs) in entries.items()]
+        with self._lock:
+            for key, score, probs in rows:
+                self._remember(key, (score, probs))
+            if self._disk is not None and rows:
+                self._disk.executemany(
+                    "INSERT OR REPLACE INTO sentiment_cache (key, score, probs) VALUES (?, ?, ?)",
+                    [(key, score, probs.tobytes()) for key, score, probs in rows],
+                )
+                self._disk.commit()
+
+    def _remember(self, key: str, entry: CacheEntry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_rate": (self.hits + self.disk_hits) / total if total else 0.0,
+            }
@@ -0,0 +1,805 @@
+# SQLite 저장소 - database.py와 같은 함수들을 SQLite로 구현
+# config.DB_BACKEND = "sqlite" 로 설정하면 database.py가 이 구현을 사용함
+#
+# JSON 파일 대비 장점
+# - reviews.movie_id / reviews.created_at 인덱스로 선형 탐색 없이 조회
+# - 트랜잭션으로 여러 요청이 동시에 써도 변경 내용이 사라지지 않음
+# - AUTOINCREMENT가 last_movie_id.txt / last_review_id.txt 역할을 대신함 (삭제된 ID 재사용 안 함)
+
+import argparse
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+from datetime import datetime
+from models import Movie, MovieSummary, RecentReview, Review
+from movie_index import genre_terms, search_key
+import config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS movies (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    release_date TEXT NOT NULL,
+    director TEXT NOT NULL,
+    genre TEXT NOT NULL,
+    poster_url TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    movie_id INTEGER NOT NULL,
+    author TEXT NOT NULL,
+    content TEXT NOT NULL,
+    sentiment_score REAL,
+    created_at TEXT,
+    sentiment_status TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_reviews_movie_id ON reviews(movie_id);
+CREATE INDEX IF NOT EXISTS idx_reviews_created_at ON reviews(created_at);
+-- 목록 조회(keyset 페이지네이션) 필터용: 영화별 작성 시간순, 감성 점수 범위
+CREATE INDEX IF NOT EXISTS idx_reviews_movie_created ON reviews(movie_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_reviews_score ON reviews(sentiment_score);
+
+-- 영화별 감성 점수 누적 집계 (평균/분산을 O(1)로 계산)
+-- 아래 트리거가 reviews 변경과 같은 트랜잭션 안에서 갱신함
+CREATE TABLE IF NOT EXISTS movie_sentiment_stats (
+    movie_id INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL,
+    sum REAL NOT NULL,
+    sum_sq REAL NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_reviews_stats_insert
+AFTER INSERT ON reviews WHEN NEW.sentiment_score IS NOT NULL
+BEGIN
+    INSERT INTO movie_sentiment_stats (movie_id, count, sum, sum_sq)
+    VALUES (NEW.movie_id, 1, NEW.sentiment_score, NEW.sentiment_score * NEW.sentiment_score)
+    ON CONFLICT(movie_id) DO UPDATE SET
+        count = count + 1,
+        sum = sum + excluded.sum,
+        sum_sq = sum_sq + excluded.sum_sq;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_reviews_stats_delete
+AFTER DELETE ON reviews WHEN OLD.sentiment_score IS NOT NULL
+BEGIN
+    UPDATE movie_sentiment_stats SET
+        count = count - 1,
+        sum = sum - OLD.sentiment_score,
+        sum_sq = sum_sq - OLD.sentiment_score * OLD.sentiment_score
+    WHERE movie_id = OLD.movie_id;
+    DELETE FROM movie_sentiment_stats WHERE movie_id = OLD.movie_id AND count <= 0;
+END;
+
+-- 비동기 감성 분석으로 점수가 나중에 채워지는 경우: 이전 점수를 빼고 새 점수를 더함
+CREATE TRIGGER IF NOT EXISTS trg_reviews_stats_update
+AFTER UPDATE OF sentiment_score ON reviews
+BEGIN
+    UPDATE movie_sentiment_stats SET
+        count = count - 1,
+        sum = sum - OLD.sentiment_score,
+        sum_sq = sum_sq - OLD.sentiment_score * OLD.sentiment_score
+    WHERE movie_id = OLD.movie_id AND OLD.sentiment_score IS NOT NULL;
+    DELETE FROM movie_sentiment_stats WHERE movie_id = OLD.movie_id AND count <= 0;
+
+    INSERT INTO movie_sentiment_stats (movie_id, count, sum, sum_sq)
+    SELECT NEW.movie_id, 1, NEW.sentiment_score, NEW.sentiment_score * NEW.sentiment_score
+    WHERE NEW.sentiment_score IS NOT NULL
+    ON CONFLICT(movie_id) DO UPDATE SET
+        count = count + 1,
+        sum = sum + excluded.sum,
+        sum_sq = sum_sq + excluded.sum_sq;
+END;
+
+-- 영화별 / 채점 버전별 점수가 있는 리뷰 수 (현재 버전으로 채점된 비율 계산용, 버전이 없으면 '')
+-- 트리거는 scoring_version 컬럼이 생긴 뒤에 만들어야 하므로 INDEXES에 있음
+CREATE TABLE IF NOT EXISTS movie_scoring_versions (
+    movie_id INTEGER NOT NULL,
+    scoring_version TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (movie_id, scoring_version)
+);
+
+-- 영화 검색용 역색인: kind = 'genre' (장르 문자열을 나눈 것) / 'director' / 'title', term = 검색 키 (대소문자/공백 무시)
+-- 문자열을 나누는 건 트리거로 할 수 없으므로 영화를 쓰는 함수가 같은 트랜잭션 안에서 갱신함 (삭제만 트리거)
+CREATE TABLE IF NOT EXISTS movie_search_terms (
+    kind TEXT NOT NULL,
+    term TEXT NOT NULL,
+    movie_id INTEGER NOT NULL,
+    PRIMARY KEY (kind, term, movie_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_movie_search_terms_movie ON movie_search_terms(movie_id);
+CREATE INDEX IF NOT EXISTS idx_movies_release_date ON movies(release_date);
+
+CREATE TRIGGER IF NOT EXISTS trg_movies_search_delete AFTER DELETE ON movies
+BEGIN
+    DELETE FROM movie_search_terms WHERE movie_id = OLD.id;
+END;
+
+-- DB 정보 - 'epoch': DB를 처음 만들 때 정하는 임의의 값
+-- (DB 파일을 지우고 다시 만들면 data_versions가 처음부터 다시 세어지므로 예전 ETag와 겹치지 않게 버전 앞에 붙임)
+CREATE TABLE IF NOT EXISTS db_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+-- 캐시 검증(ETag)용 데이터 버전 - 바뀔 때마다 1씩 증가 (줄어들지 않음)
+-- scope: 'movies' (영화 목록), 'movie:<id>' (영화 하나), 'reviews' (리뷰 전체), 'reviews:<movie_id>' (영화별 리뷰)
+CREATE TABLE IF NOT EXISTS data_versions (
+    scope TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_movies_version_insert AFTER INSERT ON movies
+BEGIN
+    INSERT INTO data_versions (scope, version) VALUES ('movies', 1), ('movie:' || NEW.id, 1)
+    ON CONFLICT(scope) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_movies_version_update AFTER UPDATE ON movies
+BEGIN
+    INSERT INTO data_versions (scope, version) VALUES ('movies', 1), ('movie:' || NEW.id, 1)
+    ON CONFLICT(scope) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_movies_version_delete AFTER DELETE ON movies
+BEGIN
+    INSERT INTO data_versions (scope, version) VALUES ('movies', 1), ('movie:' || OLD.id, 1)
+    ON CONFLICT(scope) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_reviews_version_insert AFTER INSERT ON reviews
+BEGIN
+    INSERT INTO data_versions (scope, version) VALUES ('reviews', 1), ('reviews:' || NEW.movie_id, 1)
+    ON CONFLICT(scope) DO UPDATE SET version = version + 1;
+END;
+
+-- 점수가 채워지는 경우도 포함 (영화를 옮기는 경우 이전 영화 쪽도 증가)
+CREATE TRIGGER IF NOT EXISTS trg_reviews_version_update AFTER UPDATE ON reviews
+BEGIN
+    INSERT INTO data_versions (scope, version)
+    VALUES ('reviews', 1), ('reviews:' || OLD.movie_id, 1), ('reviews:' || NEW.movie_id, 1)
+    ON CONFLICT(scope) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_reviews_version_delete AFTER DELETE ON reviews
+BEGIN
+    INSERT INTO data_versions (scope, version) VALUES ('reviews', 1), ('reviews:' || OLD.movie_id, 1)
+    ON CONFLICT(scope) DO UPDATE SET version = version + 1;
+END;
+"""
+
+# 나중에 추가된 컬럼 - 예전에 만들어진 DB에는 ALTER TABLE로 추가
+ADDED_REVIEW_COLUMNS = {
+    "sentiment_status": "TEXT",
+    "scoring_version": "TEXT",
+}
+
+# 추가 컬럼을 사용하는 인덱스 / 트리거 (컬럼이 생긴 뒤에 만들어야 함)
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_reviews_pending ON reviews(id) WHERE sentiment_status = 'pending';
+
+CREATE TRIGGER IF NOT EXISTS trg_reviews_versions_insert
+AFTER INSERT ON reviews WHEN NEW.sentiment_score IS NOT NULL
+BEGIN
+    INSERT INTO movie_scoring_versions (movie_id, scoring_version, count)
+    VALUES (NEW.movie_id, COALESCE(NEW.scoring_version, ''), 1)
+    ON CONFLICT(movie_id, scoring_version) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_reviews_versions_delete
+AFTER DELETE ON reviews WHEN OLD.sentiment_score IS NOT NULL
+BEGIN
+    UPDATE movie_scoring_versions SET count = count - 1
+    WHERE movie_id = OLD.movie_id AND scoring_version = COALESCE(OLD.scoring_version, '');
+    DELETE FROM movie_scoring_versions WHERE movie_id = OLD.movie_id AND count <= 0;
+END;
+
+-- 재채점으로 점수/버전이 바뀌는 경우: 이전 버전에서 빼고 새 버전에 더함
+CREATE TRIGGER IF NOT EXISTS trg_reviews_versions_update
+AFTER UPDATE OF sentiment_score, scoring_version ON reviews
+BEGIN
+    UPDATE movie_scoring_versions SET count = count - 1
+    WHERE movie_id = OLD.movie_id AND scoring_version = COALESCE(OLD.scoring_version, '')
+      AND OLD.sentiment_score IS NOT NULL;
+    DELETE FROM movie_scoring_versions WHERE movie_id = OLD.movie_id AND count <= 0;
+
+    INSERT INTO movie_scoring_versions (movie_id, scoring_version, count)
+    SELECT NEW.movie_id, COALESCE(NEW.scoring_version, ''), 1
+    WHERE NEW.sentiment_score IS NOT NULL
+    ON CONFLICT(movie_id, scoring_version) DO UPDATE SET count = count + 1;
+END;
+"""
+
+# 집계 테이블을 reviews 기준으로 다시 계산 - 한 트랜잭션 안에서 execute로 하나씩 실행 (_rebuild_stats)
+REBUILD_STATS_SQL = [
+    "DELETE FROM movie_sentiment_stats",
+    """INSERT INTO movie_sentiment_stats (movie_id, count, sum, sum_sq)
+    SELECT movie_id, COUNT(*), SUM(sentiment_score), SUM(sentiment_score * sentiment_score)
+    FROM reviews WHERE sentiment_score IS NOT NULL GROUP BY movie_id""",
+    "DELETE FROM movie_scoring_versions",
+    """INSERT INTO movie_scoring_versions (movie_id, scoring_version, count)
+    SELECT movie_id, COALESCE(scoring_version, ''), COUNT(*)
+    FROM reviews WHERE sentiment_score IS NOT NULL GROUP BY movie_id, COALESCE(scoring_version, '')""",
+]
+
+MOVIE_COLUMNS = "id, title, release_date, director, genre, poster_url"
+# 조회 결과 dict의 키 순서 = 모델 필드 순서 (API 응답 JSON 모양을 JSON 저장소와 같게)
+REVIEW_COLUMNS = "id, movie_id, author, content, sentiment_score, sentiment_status, scoring_version, created_at"
+
+# ---연결 관리---
+
+# sqlite3 연결은 스레드 간에 공유하면 안 되므로 스레드마다 하나씩 만듦
+_local = threading.local()
+
+# 스키마 생성 / 집계 보정 같은 준비 작업은 DB 파일마다 프로세스에서 한 번만 (연결마다 하지 않음)
+_prepared_paths = set()
+_prepare_lock = threading.Lock()
+
+
+def get_connection(path: Optional[str] = None) -> sqlite3.Connection:
+    path = path or config.SQLITE_PATH
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "path", None) != path:
+        conn = sqlite3.connect(path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        # WAL: 쓰는 동안에도 다른 연결이 읽을 수 있음
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with _prepare_lock:
+            if path not in _prepared_paths:
+                _prepare_database(conn)
+                _prepared_paths.add(path)
+        _local.epoch = conn.execute("SELECT value FROM db_meta WHERE key = 'epoch'").fetchone()[0]
+        _local.conn = conn
+        _local.path = path
+    return conn
+
+
+def _prepare_database(conn: sqlite3.Connection):
+    """스키마 생성 + 예전 DB 보정 (프로세스에서 처음 여는 연결만)"""
+    conn.executescript(SCHEMA)
+    _add_missing_columns(conn)
+    conn.executescript(INDEXES)
+
+    # 다른 프로세스가 같은 DB를 동시에 열어도 하나씩 하도록 쓰기 잠금을 잡고 조건을 확인
+    with _write_transaction(conn):
+        # DB epoch는 DB를 처음 만들 때 한 번만 정함 (이미 있으면 INSERT OR IGNORE가 무시)
+        conn.execute("INSERT OR IGNORE INTO db_meta (key, value) VALUES ('epoch', ?)", (os.urandom(4).hex(),))
+        # 집계 테이블이 생기기 전에 만들어진 DB라면 한 번 채워줌
+        if (conn.execute("SELECT COUNT(*) FROM movie_sentiment_stats").fetchone()[0] == 0
+                or conn.execute("SELECT COUNT(*) FROM movie_scoring_versions").fetchone()[0] == 0):
+            _rebuild_stats(conn)
+        # 점수 버전을 기록하기 전의 점수가 남아 있으면 기준 버전으로 채움 (버전별 리뷰 수는 UPDATE 트리거가 맞춰줌)
+        if conn.execute("SELECT EXISTS(SELECT 1 FROM movie_scoring_versions WHERE scoring_version = '')").fetchone()[0]:
+            conn.execute("UPDATE reviews SET scoring_version = ? WHERE scoring_version IS NULL "
+                         "AND sentiment_score IS NOT NULL", (config.LEGACY_SCORING_VERSION,))
+        # 검색 역색인이 생기기 전에 만들어진 DB라면 한 번 채워줌 (영화마다 감독/제목 키가 있으므로 비어 있으면 안 채워진 것)
+        if conn.execute("SELECT EXISTS(SELECT 1 FROM movies) AND NOT EXISTS(SELECT 1 FROM movie_search_terms)").fetchone()[0]:
+            _rebuild_movie_search_terms(conn)
+
+
+@contextmanager
+def _write_transaction(conn: sqlite3.Connection):
+    """
+    BEGIN IMMEDIATE ~ COMMIT
+    시작할 때 쓰기 잠금을 잡고, executescript와 달리 중간에 커밋되지 않아서 읽는 쪽은 바뀌기 전이나 후만 봄
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def _add_missing_columns(conn: sqlite3.Connection):
+    existing = {row["name"] for row in conn.execute("PRAGMA table_info(reviews)")}
+    for column, column_type in ADDED_REVIEW_COLUMNS.items():
+        if column not in existing:
+            conn.execute(f"ALTER TABLE reviews ADD COLUMN {column} {column_type}")
+    conn.commit()
+
+def _records(cursor: sqlite3.Cursor) -> List[dict]:
+    # 조회 결과를 모델 없이 dict 목록으로 (컬럼 타입이 스키마로 정해져 있으므로 그대로 응답에 사용)
+    names = [column[0] for column in cursor.description]
+    return [dict(zip(names, row)) for row in cursor]
+
+# ---영화 데이터 함수---
+
+def _movie_search_terms(movie_id: int, title: str, director: str, genre: str) -> List[tuple]:
+    # movie_index.MovieIndex와 같은 검색 키 (JSON 저장소와 검색 결과가 같도록)
+    terms = [("genre", term, movie_id) for term in genre_terms(genre)]
+    terms.append(("director", search_key(director), movie_id))
+    terms.append(("title", search_key(title), movie_id))
+    return terms
+
+def _index_movie(conn: sqlite3.Connection, movie_id: int, movie: Movie):
+    conn.execute("DELETE FROM movie_search_terms WHERE movie_id = ?", (movie_id,))
+    conn.executemany(
+        "INSERT OR IGNORE INTO movie_search_terms (kind, term, movie_id) VALUES (?, ?, ?)",
+        _movie_search_terms(movie_id, movie.title, movie.director, movie.genre),
+    )
+
+def _rebuild_movie_search_terms(conn: sqlite3.Connection):
+    conn.execute("DELETE FROM movie_search_terms")
+    for row in conn.execute("SELECT id, title, director, genre FROM movies").fetchall():
+        conn.executemany(
+            "INSERT OR IGNORE INTO movie_search_terms (kind, term, movie_id) VALUES (?, ?, ?)",
+            _movie_search_terms(row["id"], row["title"], row["director"], row["genre"]),
+        )
+
+# 모든 영화 목록 조회 - *_records 함수는 모델 대신 dict 목록 (API 응답을 바로 직렬화하는 용도)
+def get_all_movie_records() -> List[dict]:
+    return _records(get_connection().execute(f"SELECT {MOVIE_COLUMNS} FROM movies ORDER BY id"))
+
+def get_all_movies() -> List[Movie]:
+    return [Movie(**item) for item in get_all_movie_records()]
+
+# 모든 영화 + 리뷰 수 / 평균 감성 점수 / 최근 리뷰 시간 (홈 화면용) - 쿼리 한 번
+# 리뷰 수와 최근 시간은 idx_reviews_movie_id / idx_reviews_movie_created 인덱스만 읽고, 평균은 누적 집계 테이블에서
+def get_movie_summary_records() -> List[dict]:
+    columns = ", ".join(f"m.{column}" for column in MOVIE_COLUMNS.split(", "))
+    return _records(get_connection().execute(
+        f"SELECT {columns}, "
+        "(SELECT COUNT(*) FROM reviews r WHERE r.movie_id = m.id) AS review_count, "
+        "s.sum / s.count AS average_sentiment, "
+        "(SELECT MAX(r.created_at) FROM reviews r WHERE r.movie_id = m.id) AS latest_review_at "
+        "FROM movies m LEFT JOIN movie_sentiment_stats s ON s.movie_id = m.id ORDER BY m.id"
+    ))
+
+def get_movie_summaries() -> List[MovieSummary]:
+    return [MovieSummary(**summary) for summary in get_movie_summary_records()]
+
+# 영화 목록 한 페이지 조회 (ID 순서, after_id 다음부터 최대 limit개) - (영화 목록, 다음 페이지의 after_id 또는 None)
+def list_movie_records(limit: int, after_id: Optional[int] = None) -> Tuple[List[dict], Optional[int]]:
+    rows = _records(get_connection().execute(
+        f"SELECT {MOVIE_COLUMNS} FROM movies WHERE id > ? ORDER BY id LIMIT ?",
+        (after_id if after_id is not None else 0, limit + 1),  # 다음 페이지 확인용 1개 더
+    ))
+    next_id = rows[limit - 1]["id"] if len(rows) > limit else None
+    return rows[:limit], next_id
+
+def list_movies(limit: int, after_id: Optional[int] = None) -> Tuple[List[Movie], Optional[int]]:
+    movies, next_id = list_movie_records(limit, after_id)
+    return [Movie(**item) for item in movies], next_id
+
+# 영화 검색 (ID 순서, after_id 다음부터 최대 limit개) - (영화 목록, 다음 페이지의 after_id 또는 None)
+# 장르/감독/제목 조건은 movie_search_terms 역색인, 개봉일 범위는 idx_movies_release_date로 찾음
+def search_movie_records(limit: Optional[int] = None, after_id: Optional[int] = None,
+                         genres: Optional[List[str]] = None, genre_mode: str = "any",
+                         director: Optional[str] = None, title_prefix: Optional[str] = None,
+                         released_from: Optional[str] = None, released_to: Optional[str] = None) -> Tuple[List[dict], Optional[int]]:
+    clauses = ["id > ?"]
+    params: list = [after_id if after_id is not None else 0]
+
+    terms = list(dict.fromkeys(term for genre in genres or () for term in genre_terms(genre)))
+    if terms:
+        placeholders = ", ".join("?" for _ in terms)
+        subquery = f"SELECT movie_id FROM movie_search_terms WHERE kind = 'genre' AND term IN ({placeholders})"
+        if genre_mode == "all":
+            subquery += " GROUP BY movie_id HAVING COUNT(*) = ?"
+            terms = terms + [len(terms)]
+        clauses.append(f"id IN ({subquery})")
+        params.extend(terms)
+    if director is not None:
+        clauses.append("id IN (SELECT movie_id FROM movie_search_terms WHERE kind = 'director' AND term = ?)")
+        params.append(search_key(director))
+    if title_prefix:
+        prefix = search_key(title_prefix)
+        clauses.append("id IN (SELECT movie_id FROM movie_search_terms WHERE kind = 'title' AND term >= ? AND term < ?)")
+        params.extend([prefix, prefix + "\U0010ffff"])
+    if released_from is not None:
+        clauses.append("release_date >= ?")
+        params.append(released_from)
+    if released_to is not None:
+        clauses.append("release_date < ?")
+        params.append(released_to)
+
+    sql = f"SELECT {MOVIE_COLUMNS} FROM movies WHERE {' AND '.join(clauses)} ORDER BY id"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit + 1)  # 다음 페이지 확인용 1개 더
+    rows = _records(get_connection().execute(sql, params))
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    return rows[:limit], rows[limit - 1]["id"]
+
+def search_movies(limit: Optional[int] = None, after_id: Optional[int] = None,
+                  genres: Optional[List[str]] = None, genre_mode: str = "any",
+                  director: Optional[str] = None, title_prefix: Optional[str] = None,
+                  released_from: Optional[str] = None, released_to: Optional[str] = None) -> Tuple[List[Movie], Optional[int]]:
+    movies, next_id = search_movie_records(
+        limit, after_id=after_id, genres=genres, genre_mode=genre_mode, director=director,
+        title_prefix=title_prefix, released_from=released_from, released_to=released_to,
+    )
+    return [Movie(**item) for item in movies], next_id
+
+# 영화 ID로 조회 (PRIMARY KEY 조회)
+def get_movie_by_id(movie_id: int) -> Optional[Movie]:
+    row = get_connection().execute(
+        f"SELECT {MOVIE_COLUMNS} FROM movies WHERE id = ?", (movie_id,)
+    ).fetchone()
+    if row is None:
+        return None
+    return Movie(**dict(row))
+
+# 등록된 영화 ID 전체 (대량 등록 시 영화 존재 여부를 한 번에 확인하는 용도)
+def get_movie_ids() -> set:
+    return {row[0] for row in get_connection().execute("SELECT id FROM movies")}
+
+# 새로운 영화 등록 - ID는 AUTOINCREMENT로 자동 생성
+def add_movie(movie: Movie) -> Movie:
+    conn = get_connection()
+    with conn:
+        cursor = conn.execute(
+            "INSERT INTO movies (title, release_date, director, genre, poster_url) VALUES (?, ?, ?, ?, ?)",
+            (movie.title, movie.release_date, movie.director, movie.genre, movie.poster_url),
+        )
+        _index_movie(conn, cursor.lastrowid, movie)
+    movie.id = cursor.lastrowid
+    return movie
+
+# 영화 정보 수정 (id는 그대로 유지)
+def update_movie(movie_id: int, movie: Movie) -> Optional[Movie]:
+    conn = get_connection()
+    with conn:
+        cursor = conn.execute(
+            "UPDATE movies SET title = ?, release_date = ?, director = ?, genre = ?, poster_url = ? WHERE id = ?",
+            (movie.title, movie.release_date, movie.director, movie.genre, movie.poster_url, movie_id),
+        )
+        if cursor.rowcount > 0:
+            _index_movie(conn, movie_id, movie)
+    if cursor.rowcount == 0:
+        return None
+    movie.id = movie_id
+    return movie
+
+# 영화와 그 영화의 리뷰를 한 트랜잭션으로 삭제 - 삭제된 리뷰 개수 반환 (영화가 없으면 None)
+def delete_movie_with_reviews(movie_id: int) -> Optional[int]:
+    conn = get_connection()
+    with conn:
+        if conn.execute("DELETE FROM movies WHERE id = ?", (movie_id,)).rowcount == 0:
+            return None
+        cursor = conn.execute("DELETE FROM reviews WHERE movie_id = ?", (movie_id,))
+    return cursor.rowcount
+
+# ---리뷰 관련 함수---
+
+# 리뷰 ID로 조회
+def get_review_by_id(review_id: int) -> Optional[Review]:
+    row = get_connection().execute(
+        f"SELECT {REVIEW_COLUMNS} FROM reviews WHERE id = ?", (review_id,)
+    ).fetchone()
+    if row is None:
+        return None
+    return Review(**dict(row))
+
+# 모든 리뷰 조회
+def get_all_review_records() -> List[dict]:
+    return _records(get_connection().execute(f"SELECT {REVIEW_COLUMNS} FROM reviews ORDER BY id"))
+
+def get_all_reviews() -> List[Review]:
+    return [Review(**review) for review in get_all_review_records()]
+
+# 리뷰 목록 조회 (keyset 페이지네이션 + 필터) - (리뷰 목록, 다음 페이지의 after 키 또는 None)
+# OFFSET 대신 (created_at, id) > (?, ?) 조건으로 이어서 조회 -> 페이지가 뒤로 가도 인덱스 범위 탐색
+def list_review_records(limit: Optional[int] = None, after: Optional[tuple] = None, order_by: str = "id",
+                        desc: bool = False, movie_id: Optional[int] = None,
+                        created_from: Optional[str] = None, created_to: Optional[str] = None,
+                        min_score: Optional[float] = None, max_score: Optional[float] = None) -> Tuple[List[dict], Optional[tuple]]:
+    key_columns = "(created_at, id)" if order_by == "created_at" else "(id)"
+    direction = "DESC" if desc else "ASC"
+
+    conditions, params = [], []
+    if movie_id is not None:
+        conditions.append("movie_id = ?")
+        params.append(movie_id)
+    if created_from is not None:
+        conditions.append("created_at >= ?")
+        params.append(created_from)
+    if created_to is not None:
+        conditions.append("created_at < ?")
+        params.append(created_to)
+    if min_score is not None:
+        conditions.append("sentiment_score >= ?")
+        params.append(min_score)
+    if max_score is not None:
+        conditions.append("sentiment_score <= ?")
+        params.append(max_score)
+    if after is not None:
+        conditions.append(f"{key_columns} {'<' if desc else '>'} ({', '.join('?' * len(after))})")
+        params.extend(after)
+
+    sql = f"SELECT {REVIEW_COLUMNS} FROM reviews"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    if order_by == "created_at":
+        sql += f" ORDER BY created_at {direction}, id {direction}"
+    else:
+        sql += f" ORDER BY id {direction}"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit + 1)  # 다음 페이지 확인용 1개 더
+
+    rows = _records(get_connection().execute(sql, params))
+    reviews = rows[:limit]
+    next_key = None
+    if limit is not None and len(rows) > limit:
+        last = reviews[-1]
+        next_key = (last["created_at"], last["id"]) if order_by == "created_at" else (last["id"],)
+    return reviews, next_key
+
+def list_reviews(limit: Optional[int] = None, after: Optional[tuple] = None, order_by: str = "id",
+                 desc: bool = False, movie_id: Optional[int] = None,
+                 created_from: Optional[str] = None, created_to: Optional[str] = None,
+                 min_score: Optional[float] = None, max_score: Optional[float] = None) -> Tuple[List[Review], Optional[tuple]]:
+    reviews, next_key = list_review_records(
+        limit, after=after, order_by=order_by, desc=desc, movie_id=movie_id,
+        created_from=created_from, created_to=created_to, min_score=min_score, max_score=max_score,
+    )
+    return [Review(**review) for review in reviews], next_key
+
+# 최근 리뷰 limit개 (작성 시간 내림차순) + 영화 제목 (idx_reviews_created_at을 뒤에서부터 limit개만 읽음)
+def get_recent_review_records(limit: int) -> List[dict]:
+    columns = ", ".join(f"r.{column}" for column in REVIEW_COLUMNS.split(", "))
+    return _records(get_connection().execute(
+        f"SELECT {columns}, m.title AS movie_title FROM reviews r LEFT JOIN movies m ON m.id = r.movie_id "
+        "ORDER BY r.created_at DESC, r.id DESC LIMIT ?",
+        (limit,),
+    ))
+
+def get_recent_reviews(limit: int) -> List[RecentReview]:
+    return [RecentReview(**review) for review in get_recent_review_records(limit)]
+
+# 특정 영화 리뷰 조회 (idx_reviews_movie_id 사용)
+def get_review_records_by_movie(movie_id: int) -> List[dict]:
+    return _records(get_connection().execute(
+        f"SELECT {REVIEW_COLUMNS} FROM reviews WHERE movie_id = ? ORDER BY id", (movie_id,)
+    ))
+
+def get_reviews_by_movie(movie_id: int) -> List[Review]:
+    return [Review(**review) for review in get_review_records_by_movie(movie_id)]
+
+# 특정 영화의 리뷰 ID 목록 (리뷰 데이터 없이 ID만 - 감정 분포 집계용)
+def get_review_ids_by_movie(movie_id: int) -> List[int]:
+    rows = get_connection().execute("SELECT id FROM reviews WHERE movie_id = ?", (movie_id,)).fetchall()
+    return [row[0] for row in rows]
+
+# 등록된 리뷰 ID 전체 (감정 분포 파일을 정리할 때 삭제된 리뷰의 레코드를 버리는 용도)
+def get_review_ids() -> List[int]:
+    return [row[0] for row in get_connection().execute("SELECT id FROM reviews")]
+
+# 새 리뷰 등록 - ID는 AUTOINCREMENT, 작성 시간은 자동 생성
+# 영화가 없으면 (그 사이에 삭제됐으면) 저장하지 않고 None
+def create_review(review: Review) -> Optional[Review]:
+    review.created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    conn = get_connection()
+    with conn:
+        cursor = _insert_review(conn, review)
+    if cursor.rowcount == 0:
+        return None
+    review.id = cursor.lastrowid
+    return review
+
+# 리뷰 여러 개를 한 트랜잭션으로 등록 - created_at이 있으면 그대로 유지 (과거 리뷰 가져오기용)
+# 입력과 같은 순서로 반환, 영화가 없어서 저장하지 않은 리뷰는 None
+def create_reviews_bulk(reviews: List[Review]) -> List[Optional[Review]]:
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    conn = get_connection()
+    created = []
+    with conn:
+        for review in reviews:
+            review.created_at = review.created_at or now
+            cursor = _insert_review(conn, review)
+            if cursor.rowcount == 0:
+                created.append(None)
+                continue
+            review.id = cursor.lastrowid
+            created.append(review)
+    return created
+
+# 영화가 있을 때만 리뷰 INSERT (존재 확인과 저장이 한 문장이라 영화 삭제와 엇갈려도 영화 없는 리뷰가 남지 않음)
+def _insert_review(conn: sqlite3.Connection, review: Review) -> sqlite3.Cursor:
+    return conn.execute(
+        "INSERT INTO reviews (movie_id, author, content, sentiment_score, created_at, sentiment_status, "
+        "scoring_version) SELECT ?, ?, ?, ?, ?, ?, ? WHERE EXISTS (SELECT 1 FROM movies WHERE id = ?)",
+        (review.movie_id, review.author, review.content, review.sentiment_score, review.created_at,
+         review.sentiment_status, review.scoring_version, review.movie_id),
+    )
+
+# 특정 리뷰 삭제
+def delete_review(review_id: int) -> bool:
+    conn = get_connection()
+    with conn:
+        cursor = conn.execute("DELETE FROM reviews WHERE id = ?", (review_id,))
+    return cursor.rowcount > 0
+
+# 감성 분석 대기 중인 리뷰 조회 (오래된 것부터 최대 limit개, idx_reviews_pending 사용)
+def get_pending_reviews(limit: int) -> List[Review]:
+    rows = get_connection().execute(
+        f"SELECT {REVIEW_COLUMNS} FROM reviews WHERE sentiment_status = 'pending' ORDER BY id LIMIT ?", (limit,)
+    ).fetchall()
+    return [Review(**dict(row)) for row in rows]
+
+# ID가 after_id보다 큰 리뷰 수 (rescore.py 진행률/ETA 계산용)
+def count_reviews_after(after_id: int) -> int:
+    return get_connection().execute("SELECT COUNT(*) FROM reviews WHERE id > ?", (after_id,)).fetchone()[0]
+
+# ID가 after_id보다 큰 리뷰를 ID 순서대로 batch_size개씩 (id > 마지막 ID 조건으로 이어서 조회)
+def iter_review_batches(after_id: int, batch_size: int) -> Iterator[List[Review]]:
+    while True:
+        rows = get_connection().execute(
+            f"SELECT {REVIEW_COLUMNS} FROM reviews WHERE id > ? ORDER BY id LIMIT ?", (after_id, batch_size)
+        ).fetchall()
+        if not rows:
+            return
+        after_id = rows[-1]["id"]
+        yield [Review(**dict(row)) for row in rows]
+
+# 현재 버전이 아닌 점수를 가진 리뷰 조회 (after_id보다 큰 ID 중 최대 limit개 - 기본키 범위 탐색)
+def get_stale_reviews(limit: int, after_id: int = 0) -> List[Review]:
+    rows = get_connection().execute(
+        f"SELECT {REVIEW_COLUMNS} FROM reviews WHERE id > ? AND sentiment_score IS NOT NULL "
+        "AND sentiment_status IS NOT 'pending' AND scoring_version IS NOT ? ORDER BY id LIMIT ?",
+        (after_id, config.SCORING_VERSION, limit),
+    ).fetchall()
+    return [Review(**dict(row)) for row in rows]
+
+# 현재 버전이 아닌 점수를 가진 리뷰 수 (버전별 집계 테이블에서)
+def count_stale_reviews() -> int:
+    row = get_connection().execute(
+        "SELECT COALESCE(SUM(count), 0) FROM movie_scoring_versions WHERE scoring_version != ?",
+        (config.SCORING_VERSION,),
+    ).fetchone()
+    return row[0]
+
+# 리뷰 감성 점수 채우기 {review_id: score} - 그사이 삭제된 리뷰는 건너뜀, 갱신된 개수 반환
+# (점수 버전은 현재 설정의 config.SCORING_VERSION으로 기록)
+def update_review_scores(scores: Dict[int, float]) -> int:
+    conn = get_connection()
+    with conn:
+        cursor = conn.executemany(
+            "UPDATE reviews SET sentiment_score = ?, sentiment_status = 'done', scoring_version = ? WHERE id = ?",
+            [(score, config.SCORING_VERSION, review_id) for review_id, score in scores.items()],
+        )
+    return cursor.rowcount
+
+# 특정 영화의 감성 점수 통계 (리뷰 수, 평균, 분산, 현재 버전으로 채점된 리뷰 수) - 누적 집계 테이블에서 O(1)
+def get_sentiment_stats(movie_id: int) -> Optional[dict]:
+    conn = get_connection()
+    row = conn.execute(
+        "SELECT count, sum, sum_sq FROM movie_sentiment_stats WHERE movie_id = ?", (movie_id,)
+    ).fetchone()
+    if row is None:
+        return None
+    current = conn.execute(
+        "SELECT count FROM movie_scoring_versions WHERE movie_id = ? AND scoring_version = ?",
+        (movie_id, config.SCORING_VERSION),
+    ).fetchone()
+
+    count, total, total_sq = row
+    average = total / count
+    variance = max(total_sq / count - average * average, 0.0)
+    return {"count": count, "average": average, "variance": variance, "current_count": current[0] if current else 0}
+
+# 특정 영화의 평균 감성 점수 계산
+def get_average_sentiment(movie_id: int) -> Optional[float]:
+    stats = get_sentiment_stats(movie_id)
+    if stats is None:
+        return None
+    return stats["average"]
+
+# 감성 점수 누적 집계를 처음부터 다시 계산 (한 트랜잭션 - 도중에 집계가 빈 상태로 보이지 않음)
+def rebuild_sentiment_stats(conn: Optional[sqlite3.Connection] = None):
+    conn = conn or get_connection()
+    with _write_transaction(conn):
+        _rebuild_stats(conn)
+
+def _rebuild_stats(conn: sqlite3.Connection):
+    for statement in REBUILD_STATS_SQL:
+        conn.execute(statement)
+
+# ---데이터 버전 (ETag)---
+
+# scope들의 현재 데이터 버전을 합친 문자열 (data_versions 테이블 - 트리거가 갱신, 기본키 조회만)
+# 맨 앞은 DB epoch - DB를 새로 만들어서 카운터가 처음부터 다시 시작해도 예전 ETag와 겹치지 않음
+def get_data_version(*scopes: str) -> str:
+    rows = get_connection().execute(
+        f"SELECT scope, version FROM data_versions WHERE scope IN ({', '.join('?' * len(scopes))})", scopes
+    ).fetchall()
+    versions = {row["scope"]: row["version"] for row in rows}
+    return ".".join([_local.epoch] + [str(versions.get(scope, 0)) for scope in scopes])
+
+# ---JSON -> SQLite 마이그레이션---
+
+def _read_counter(counter_file: str) -> int:
+    try:
+        with open(counter_file, 'r') as f:
+            return int(f.read().strip())
+    except FileNotFoundError:
+        return 0
+
+
+def migrate_from_json(movies_file: str, reviews_file: str,
+                      movie_id_file: str, review_id_file: str,
+                      db_path: Optional[str] = None, review_storage: Optional[str] = None,
+                      journal_file: Optional[str] = None) -> tuple:
+    """
+    기존 JSON 파일의 영화/리뷰를 SQLite로 한 번에 옮기기
+
+    ID는 그대로 유지하고, AUTOINCREMENT 시퀀스를 카운터 파일 값에 맞춰서
+    이미 삭제된 ID도 다시 발급되지 않게 함
+    저널 모드(review_storage="journal")면 아직 스냅샷에 합쳐지지 않은 저널 변경분까지 적용한 상태를 옮김
+    (서버와 같은 JsonRepository로 읽으므로 레코드 모양도 서버가 보는 것과 같음)
+
+    Returns:
+        (옮긴 영화 수, 옮긴 리뷰 수)
+    """
+    import database  # JSON 저장소(스냅샷 + 저널 replay) 재사용
+
+    repo = database.JsonRepository(
+        movies_file, reviews_file,
+        review_storage=review_storage or config.REVIEW_STORAGE,
+        journal_file=journal_file or config.REVIEWS_JOURNAL_FILE,
+    )
+    repo.refresh()
+    movies = list(repo.movies.values())
+    reviews = list(repo.reviews.values())
+
+    conn = get_connection(db_path)
+    with _write_transaction(conn):
+        conn.executemany(
+            f"INSERT OR REPLACE INTO movies ({MOVIE_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+            [(m["id"], m["title"], m["release_date"], m["director"], m["genre"], m["poster_url"]) for m in movies],
+        )
+        _rebuild_movie_search_terms(conn)
+        conn.executemany(
+            f"INSERT OR REPLACE INTO reviews ({REVIEW_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(r["id"], r["movie_id"], r["author"], r["content"], r.get("sentiment_score"),
+              r.get("sentiment_status"), r.get("scoring_version"), r.get("created_at"))
+             for r in reviews],
+        )
+
+        # 카운터 파일 값이 더 크면 시퀀스를 그 값으로 맞춤
+        for table, counter_file in (("movies", movie_id_file), ("reviews", review_id_file)):
+            last_id = _read_counter(counter_file)
+            row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+            if row is None:
+                conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table, last_id))
+            elif row[0] < last_id:
+                conn.execute("UPDATE sqlite_sequence SET seq = ? WHERE name = ?", (last_id, table))
+
+        # INSERT OR REPLACE는 덮어쓴 행의 삭제 트리거 없이 삽입 트리거만 실행하므로 다시 옮기면 집계가 중복됨
+        # -> 옮긴 DB(db_path)의 집계를 같은 트랜잭션 안에서 reviews 테이블 기준으로 다시 계산
+        _rebuild_stats(conn)
+
+    return len(movies), len(reviews)
+
+
+# 마이그레이션 실행 (python sqlite_db.py)
+if __name__ == "__main__":
+    import database
+
+    parser = argparse.ArgumentParser(description="JSON 파일의 영화/리뷰 데이터를 SQLite로 옮깁니다.")
+    parser.add_argument("--movies", default=database.MOVIES_FILE)
+    parser.add_argument("--reviews", default=database.REVIEWS_FILE)
+    parser.add_argument("--movie-id-file", default=database.MOVIE_ID_FILE)
+    parser.add_argument("--review-id-file", default=database.REVIEW_ID_FILE)
+    parser.add_argument("--review-storage", choices=["snapshot", "journal"], default=config.REVIEW_STORAGE)
+    parser.add_argument("--journal", default=config.REVIEWS_JOURNAL_FILE, help="저널 모드의 리뷰 저널 파일")
+    parser.add_argument("--db", default=config.SQLITE_PATH)
+    args = parser.parse_args()
+
+    movie_count, review_count = migrate_from_json(
+        args.movies, args.reviews, args.movie_id_file, args.review_id_file, args.db,
+        review_storage=args.review_storage, journal_file=args.journal,
+    )
+    print(f"마이그레이션 완료: 영화 {movie_count}개, 리뷰 {review_count}개 -> {args.db}")
@@ -0,0 +1,42 @@
+# 테스트 공통 설정
+# backend 모듈은 import할 때 환경 변수로 설정을 읽고 모듈 전역에 저장소/캐시를 만들어 두므로
+# start_server()는 backend 모듈을 sys.modules에서 지우고 다시 import해서 "서버를 다시 시작한 것"과 같은 상태를 만듦
+# (데이터 파일은 테스트마다 임시 디렉터리에 만들어짐)
+
+import importlib
+import os
+import sys
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# 모델 / 추론 워커 / 백그라운드 스레드 없이 저장소와 API만 사용
+DEFAULT_ENV = {
+    "SENTIMENT_WARMUP": "0",
+    "INFERENCE_WORKERS": "0",
+    "STALE_RESCORE_ENABLED": "0",
+    "SENTIMENT_CACHE_PATH": "",
+}
+
+
+def _purge_backend_modules():
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None)
+        if path and os.path.dirname(os.path.abspath(path)) == BACKEND_DIR:
+            del sys.modules[name]
+
+
+@pytest.fixture
+def start_server(tmp_path, monkeypatch):
+    """start_server(**env) -> 새로 import한 main 모듈 (같은 테스트 안에서 다시 부르면 재시작)"""
+    monkeypatch.chdir(tmp_path)
+
+    def start(**env):
+        for key, value in {**DEFAULT_ENV, **env}.items():
+            monkeypatch.setenv(key, value)
+        _purge_backend_modules()
+        return importlib.import_module("main")
+
+    yield start
+    _purge_backend_modules()
@@ -0,0 +1,70 @@
+# 리뷰 대량 등록 (POST /reviews/bulk)
+
+import json
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from models import Movie
+
+
+@pytest.fixture
+def bulk_server(start_server, monkeypatch):
+    """모델 대신 고정 점수를 돌려주고 채점한 리뷰 수를 세는 서버 -> (main, client, 채점한 텍스트 목록)"""
+
+    def start(**env):
+        main = start_server(**env)
+        scored = []
+
+        def analyze_emotions_batch(texts):
+            scored.extend(texts)
+            return [(0.7, np.full(11, 1 / 11, dtype=np.float32)) for _ in texts]
+
+        monkeypatch.setattr(main.bulk_import.sentiment, "analyze_emotions_batch", analyze_emotions_batch)
+        main.db.add_movie(Movie(title="영화", release_date="2024-01-01", director="감독", genre="드라마", poster_url=""))
+        return main, TestClient(main.app), scored
+
+    return start
+
+
+def reviews(count):
+    return [{"movie_id": 1, "author": "무무", "content": f"리뷰 {i}"} for i in range(count)]
+
+
+def test_json_and_ndjson_upload(bulk_server):
+    main, client, scored = bulk_server()
+    result = client.post("/reviews/bulk", json=reviews(3) + [{"movie_id": 99, "author": "무무", "content": "x"}]).json()
+    assert (result["created"], result["failed"]) == (3, 1)
+
+    body = "\n".join(json.dumps(review) for review in reviews(2)) + "\n{broken\n"
+    result = client.post("/reviews/bulk", content=body, headers={"Content-Type": "application/x-ndjson"}).json()
+    assert (result["created"], result["failed"]) == (2, 1)
+    assert len(scored) == 5
+
+
+def test_review_limit_is_checked_before_scoring(bulk_server):
+    main, client, scored = bulk_server(BULK_MAX_REVIEWS="10", BULK_SCORING_CHUNK_SIZE="4")
+    response = client.post("/reviews/bulk", json=reviews(30))
+    assert response.status_code == 413
+    assert len(scored) <= 10
+    assert main.db.get_review_ids() == []
+
+
+def test_large_json_body_is_rejected_before_parsing(bulk_server):
+    main, client, scored = bulk_server(BULK_MAX_JSON_BYTES="1000")
+    response = client.post("/reviews/bulk", json=reviews(50))
+    assert response.status_code == 413
+    assert "ndjson" in response.json()["detail"]
+    assert scored == []
+
+    # 같은 양이라도 NDJSON은 줄 단위로 읽으므로 본문 크기 제한이 없음
+    body = "\n".join(json.dumps(review) for review in reviews(50))
+    result = client.post("/reviews/bulk", content=body, headers={"Content-Type": "application/x-ndjson"}).json()
+    assert result["created"] == 50
+
+
+def test_chunked_json_body_is_counted_while_reading(bulk_server):
+    main, client, scored = bulk_server(BULK_MAX_JSON_BYTES="1000")
+    body = json.dumps(reviews(50)).encode()
+    chunks = (body[i:i + 100] for i in range(0, len(body), 100))  # Content-Length 없이 chunked로 전송
+    response = client.post("/reviews/bulk", content=chunks, headers={"Content-Type": "application/json"})
+    assert response.status_code == 413
@@ -0,0 +1,39 @@
+# JSON 저장소 - 그룹 커밋 (writer 스레드 하나가 동시에 들어온 변경을 묶어서 기록)
+
+from concurrent.futures import ThreadPoolExecutor
+from models import Movie, Review
+
+
+def test_concurrent_writes_get_unique_ids_and_are_batched(start_server, monkeypatch):
+    db = start_server(DB_BACKEND="json").db
+    movie = db.add_movie(Movie(title="영화", release_date="2024-01-01", director="감독", genre="드라마", poster_url=""))
+
+    repo = db.get_repository()
+    flushes = []
+    flush = repo.flush
+    monkeypatch.setattr(repo, "flush", lambda: (flushes.append(1), flush())[1])
+
+    def create(i):
+        return db.create_review(Review(movie_id=movie.id, author="무무", content=f"리뷰 {i}")).id
+
+    with ThreadPoolExecutor(32) as executor:
+        ids = list(executor.map(create, range(300)))
+
+    assert len(set(ids)) == 300
+    assert len(flushes) < 300
+
+    db = start_server(DB_BACKEND="json").db
+    assert sorted(review.id for review in db.get_all_reviews()) == sorted(ids)
+
+
+def test_failed_mutation_does_not_affect_others_in_batch(start_server):
+    db = start_server(DB_BACKEND="json").db
+
+    def broken(repo):
+        raise ValueError("실패")
+
+    futures = [db._commit_queue.submit(broken) for _ in range(3)]
+    movie = db.add_movie(Movie(title="영화", release_date="2024-01-01", director="감독", genre="드라마", poster_url=""))
+    for future in futures:
+        assert isinstance(future.exception(timeout=5), ValueError)
+    assert db.get_movie_by_id(movie.id) is not None
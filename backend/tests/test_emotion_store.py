@@ -0,0 +1,46 @@
+# 리뷰별 감정 확률 저장소 (추가 기록 + 정리)
+
+import numpy as np
+from models import Movie, Review
+
+
+def probs(value):
+    return np.full(11, value, dtype=np.float32)
+
+
+def test_latest_record_wins_and_survives_restart(start_server):
+    main = start_server()
+    store = main.emotion_store.get_store()
+    store.put_many({1: probs(0.1), 2: probs(0.2)})
+    store.put_many({1: probs(0.5)})
+
+    store = start_server().emotion_store.get_store()
+    matrix = store.get_matrix([1, 2, 3])
+    assert matrix.shape == (2, 11)
+    assert np.allclose(matrix[:, 0], [0.5, 0.2], atol=1e-3)
+
+
+def test_compaction_drops_deleted_reviews(start_server, monkeypatch):
+    main = start_server(DB_BACKEND="json")
+    db, emotion_store = main.db, main.emotion_store
+    monkeypatch.setattr(emotion_store, "COMPACT_MIN_RECORDS", 50)
+    store = emotion_store.get_store()
+    record_size = emotion_store.RECORD_DTYPE.itemsize
+
+    sizes = []
+    for _ in range(5):
+        movie = db.add_movie(Movie(title="영화", release_date="2024-01-01", director="감독", genre="드라마", poster_url=""))
+        created = db.create_reviews_bulk([Review(movie_id=movie.id, author="무무", content="x") for _ in range(40)])
+        store.put_many({review.id: probs(0.3) for review in created})
+        db.delete_movie_with_reviews(movie.id)
+        sizes.append(len(open(main.config.EMOTIONS_FILE, "rb").read()) // record_size)
+
+    # 삭제된 리뷰의 레코드가 계속 쌓이지 않음 (정리할 때 버려짐)
+    assert max(sizes) <= 80
+
+    movie = db.add_movie(Movie(title="남는 영화", release_date="2024-01-01", director="감독", genre="드라마", poster_url=""))
+    kept = db.create_reviews_bulk([Review(movie_id=movie.id, author="무무", content="x") for _ in range(3)])
+    store.put_many({review.id: probs(0.7) for review in kept})
+    store.compact()
+    assert len(open(main.config.EMOTIONS_FILE, "rb").read()) // record_size == 3
+    assert store.mean([review.id for review in kept])[1] == 3
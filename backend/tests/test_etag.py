@@ -0,0 +1,76 @@
+# ETag / If-None-Match (조회 응답 캐시 검증)
+
+import glob
+import os
+import pytest
+from fastapi.testclient import TestClient
+from models import Movie, Review
+
+
+def add_movie(main, title="영화"):
+    return main.db.add_movie(Movie(title=title, release_date="2024-01-01", director="감독", genre="드라마", poster_url=""))
+
+
+def add_scored_review(main, movie_id, scoring_version):
+    return main.db.create_review(Review(movie_id=movie_id, author="무무", content="좋아요", sentiment_score=0.8,
+                                        sentiment_status="done", scoring_version=scoring_version))
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_not_modified_until_data_changes(start_server, backend):
+    main = start_server(DB_BACKEND=backend)
+    client = TestClient(main.app)
+    movie = add_movie(main)
+
+    first = client.get(f"/movies/{movie.id}")
+    etag = first.headers["etag"]
+    assert client.get(f"/movies/{movie.id}", headers={"If-None-Match": etag}).status_code == 304
+
+    client.put(f"/movies/{movie.id}", json={**first.json(), "title": "바뀐 제목"})
+    changed = client.get(f"/movies/{movie.id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["title"] == "바뀐 제목"
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_review_write_invalidates_movie_sentiment(start_server, backend):
+    main = start_server(DB_BACKEND=backend)
+    client = TestClient(main.app)
+    movie = add_movie(main)
+    add_scored_review(main, movie.id, main.config.SCORING_VERSION)
+
+    etag = client.get(f"/movies/{movie.id}/sentiment").headers["etag"]
+    add_scored_review(main, movie.id, main.config.SCORING_VERSION)
+    response = client.get(f"/movies/{movie.id}/sentiment", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["review_count"] == 2
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_restart_with_new_scoring_version_changes_sentiment_etag(start_server, backend):
+    main = start_server(DB_BACKEND=backend, SCORING_VERSION="kcelectra-v1")
+    movie = add_movie(main)
+    add_scored_review(main, movie.id, "kcelectra-v1")
+    first = TestClient(main.app).get(f"/movies/{movie.id}/sentiment")
+    assert first.json()["current_fraction"] == 1.0
+
+    main = start_server(DB_BACKEND=backend, SCORING_VERSION="kcelectra-v2")
+    response = TestClient(main.app).get(f"/movies/{movie.id}/sentiment", headers={"If-None-Match": first.headers["etag"]})
+    assert response.status_code == 200
+    assert response.json()["scoring_version"] == "kcelectra-v2"
+    assert response.json()["current_fraction"] == 0.0
+
+
+def test_recreated_sqlite_db_does_not_match_old_etag(start_server):
+    main = start_server(DB_BACKEND="sqlite")
+    movie = add_movie(main)
+    etag = TestClient(main.app).get(f"/movies/{movie.id}").headers["etag"]
+
+    # DB 파일을 지우고 같은 순서로 다시 만들면 데이터 버전 카운터는 똑같이 다시 올라감
+    for path in glob.glob(main.config.SQLITE_PATH + "*"):
+        os.remove(path)
+    main = start_server(DB_BACKEND="sqlite")
+    movie = add_movie(main, title="다른 영화")
+    response = TestClient(main.app).get(f"/movies/{movie.id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["title"] == "다른 영화"
@@ -0,0 +1,46 @@
+# 추론 워커 프로세스 풀 (시작 순서 / 종료)
+
+import threading
+import time
+import pytest
+from fastapi.testclient import TestClient
+
+
+def exit_immediately(task_queue, result_queue, num_threads):
+    # 바로 죽는 워커 - 작업 큐를 아무도 비우지 않는 상황
+    pass
+
+
+def test_stop_does_not_hang_when_workers_are_dead(start_server, monkeypatch):
+    main = start_server(SENTIMENT_BACKEND="onnx", INFERENCE_SUBMIT_TIMEOUT_SECONDS="0.1")
+    inference_pool = main.inference_pool
+    monkeypatch.setattr(inference_pool, "_worker_main", exit_immediately)
+    pool = inference_pool.InferencePool(2, max_pending=2)
+    pool.start()
+
+    futures = []
+    with pytest.raises(inference_pool.PoolBusyError):
+        for _ in range(10):
+            futures.append(pool.submit(["좋아요"]))
+
+    started = time.monotonic()
+    pool.stop(timeout=2)
+    assert time.monotonic() - started < 10
+    assert not pool.started
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            future.result(timeout=1)
+
+
+def test_pool_is_started_before_other_threads(start_server, monkeypatch):
+    main = start_server(INFERENCE_WORKERS="2", SENTIMENT_MODE="async", SENTIMENT_WARMUP="1")
+    pool = main.inference_pool.get_pool()
+    threads_at_start = []
+    monkeypatch.setattr(pool, "start", lambda: threads_at_start.extend(t.name for t in threading.enumerate()))
+    monkeypatch.setattr(pool, "stop", lambda: None)
+    monkeypatch.setattr(main.sentiment_analyzer, "warm_up", lambda: None)
+
+    with TestClient(main.app):
+        pass
+    assert threads_at_start
+    assert not {"model-warmup", "scoring-worker", "stale-score-refresher"} & set(threads_at_start)
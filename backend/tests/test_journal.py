@@ -0,0 +1,94 @@
+# JSON 저장소 - 저널 모드 (변경분 추가 기록 + 재시작 시 replay + 스냅샷으로 압축)
+
+import json
+import threading
+import time
+from models import Movie, Review
+
+JOURNAL_ENV = {"DB_BACKEND": "json", "REVIEW_STORAGE": "journal",
+               "JOURNAL_COMPACT_MAX_RECORDS": "100000", "JOURNAL_COMPACT_MIN_RECORDS": "100000"}
+
+
+def add_movie(db):
+    return db.add_movie(Movie(title="영화", release_date="2024-01-01", director="감독", genre="드라마", poster_url=""))
+
+
+def add_review(db, movie_id, content="좋아요"):
+    return db.create_review(Review(movie_id=movie_id, author="무무", content=content))
+
+
+def review_snapshot(db):
+    return {review.id: review.content for review in db.get_all_reviews()}
+
+
+def test_changes_are_replayed_after_restart(start_server, tmp_path):
+    db = start_server(**JOURNAL_ENV).db
+    movie = add_movie(db)
+    reviews = [add_review(db, movie.id, f"리뷰 {i}") for i in range(10)]
+    db.delete_review(reviews[3].id)
+    db.update_review_scores({reviews[5].id: 0.25})
+    expected = review_snapshot(db)
+
+    # 스냅샷(reviews.json)은 아직 없고 변경분은 저널에만 있음
+    assert not (tmp_path / "reviews.json").exists()
+    assert len((tmp_path / "reviews.journal.jsonl").read_text().splitlines()) == 12
+
+    db = start_server(**JOURNAL_ENV).db
+    assert review_snapshot(db) == expected
+    assert db.get_review_by_id(reviews[5].id).sentiment_score == 0.25
+    assert add_review(db, movie.id).id == reviews[-1].id + 1
+
+
+def test_truncated_last_line_is_ignored(start_server, tmp_path):
+    db = start_server(**JOURNAL_ENV).db
+    movie = add_movie(db)
+    for i in range(3):
+        add_review(db, movie.id, f"리뷰 {i}")
+    # 쓰는 도중 죽어서 마지막 줄이 잘린 상황
+    with open(tmp_path / "reviews.journal.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"op": "put", "review": {"id": 99, "mov')
+
+    db = start_server(**JOURNAL_ENV).db
+    assert sorted(review_snapshot(db)) == [1, 2, 3]
+
+
+def test_compaction_keeps_every_review(start_server, tmp_path):
+    db = start_server(**JOURNAL_ENV).db
+    movie = add_movie(db)
+    reviews = [add_review(db, movie.id, f"리뷰 {i}") for i in range(20)]
+    db.delete_review(reviews[0].id)
+    expected = review_snapshot(db)
+
+    db.get_repository().compact()
+    assert len(json.loads((tmp_path / "reviews.json").read_text())) == 19
+    assert (tmp_path / "reviews.journal.jsonl").read_text() == ""
+
+    add_review(db, movie.id, "압축 뒤 리뷰")
+    db = start_server(**JOURNAL_ENV).db
+    assert review_snapshot(db) == {**expected, reviews[-1].id + 1: "압축 뒤 리뷰"}
+
+
+def test_writes_during_background_compaction_are_not_lost(start_server):
+    db = start_server(**{**JOURNAL_ENV, "JOURNAL_COMPACT_MIN_RECORDS": "20", "JOURNAL_COMPACT_RATIO": "0.5"}).db
+    movie = add_movie(db)
+
+    def write(prefix):
+        for i in range(100):
+            add_review(db, movie.id, f"{prefix}-{i}")
+
+    writers = [threading.Thread(target=write, args=(n,)) for n in range(4)]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    repo = db.get_repository()
+    for _ in range(100):
+        if not repo._compacting:
+            break
+        time.sleep(0.05)
+    expected = review_snapshot(db)
+    assert len(expected) == 400
+    assert repo._snapshot_records > 0  # 쓰는 도중 압축이 한 번 이상 실행됨
+
+    db = start_server(**JOURNAL_ENV).db
+    assert review_snapshot(db) == expected
@@ -0,0 +1,65 @@
+# 영화 삭제 (리뷰까지 한 번에 삭제, 삭제된 영화에는 리뷰가 등록되지 않음)
+
+import threading
+import pytest
+from fastapi.testclient import TestClient
+from models import Movie, Review
+
+
+def add_movie(db):
+    return db.add_movie(Movie(title="영화", release_date="2024-01-01", director="감독", genre="드라마", poster_url=""))
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_delete_endpoint_removes_reviews(start_server, backend):
+    main = start_server(DB_BACKEND=backend)
+    client = TestClient(main.app)
+    movie = add_movie(main.db)
+    for _ in range(3):
+        main.db.create_review(Review(movie_id=movie.id, author="무무", content="좋아요"))
+
+    response = client.delete(f"/movies/{movie.id}")
+    assert response.json()["deleted_reviews"] == 3
+    assert main.db.get_reviews_by_movie(movie.id) == []
+    assert client.delete(f"/movies/{movie.id}").status_code == 404
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_reviews_created_during_delete_do_not_outlive_movie(start_server, backend):
+    main = start_server(DB_BACKEND=backend)
+    db = main.db
+
+    for _ in range(10):
+        movie = add_movie(db)
+        created = threading.Event()
+        stop = threading.Event()
+
+        def write_reviews():
+            while not stop.is_set():
+                if db.create_review(Review(movie_id=movie.id, author="무무", content="좋아요")) is not None:
+                    created.set()
+
+        writers = [threading.Thread(target=write_reviews) for _ in range(4)]
+        for writer in writers:
+            writer.start()
+        created.wait(5)
+        assert db.delete_movie_with_reviews(movie.id) is not None
+        stop.set()
+        for writer in writers:
+            writer.join()
+
+        assert db.get_review_ids_by_movie(movie.id) == []
+        assert db.create_review(Review(movie_id=movie.id, author="무무", content="늦은 리뷰")) is None
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_bulk_create_skips_deleted_movie(start_server, backend):
+    main = start_server(DB_BACKEND=backend)
+    db = main.db
+    kept, deleted = add_movie(db), add_movie(db)
+    db.delete_movie_with_reviews(deleted.id)
+
+    created = db.create_reviews_bulk([Review(movie_id=kept.id, author="무무", content="a"),
+                                      Review(movie_id=deleted.id, author="무무", content="b")])
+    assert created[0] is not None and created[1] is None
+    assert db.get_review_ids_by_movie(deleted.id) == []
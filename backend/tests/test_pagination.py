@@ -0,0 +1,61 @@
+# 목록 조회 keyset 페이지네이션 (?limit= + X-Next-Cursor)
+
+import pytest
+from fastapi.testclient import TestClient
+from models import Movie, Review
+
+
+def fetch_all(client, path, **params):
+    items, cursor = [], None
+    while True:
+        response = client.get(path, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        items.extend(response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            return items
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def client_with_reviews(request, start_server):
+    main = start_server(DB_BACKEND=request.param)
+    db = main.db
+    movies = [db.add_movie(Movie(title=f"영화 {i}", release_date="2024-01-01", director="감독", genre="드라마",
+                                 poster_url="")) for i in range(3)]
+    # 작성 시간이 ID 순서와 다르고 같은 시간도 있도록
+    db.create_reviews_bulk([
+        Review(movie_id=movies[i % 3].id, author="무무", content=f"리뷰 {i}", sentiment_score=(i % 10) / 10,
+               sentiment_status="done", created_at=f"2024-01-{(i * 7) % 28 + 1:02d} 12:00:00")
+        for i in range(50)
+    ])
+    return TestClient(main.app), db
+
+
+def test_pages_cover_all_reviews_in_order(client_with_reviews):
+    client, db = client_with_reviews
+    everything = client.get("/reviews").json()
+
+    by_id = fetch_all(client, "/reviews", limit=7)
+    assert [review["id"] for review in by_id] == sorted(review["id"] for review in everything)
+
+    newest_first = fetch_all(client, "/reviews", limit=6, order_by="created_at", desc="true")
+    expected = sorted(everything, key=lambda review: (review["created_at"], review["id"]), reverse=True)
+    assert [review["id"] for review in newest_first] == [review["id"] for review in expected]
+
+
+def test_pages_with_filters(client_with_reviews):
+    client, db = client_with_reviews
+    everything = client.get("/reviews").json()
+    movie_id = everything[0]["movie_id"]
+
+    filtered = fetch_all(client, "/reviews", limit=4, movie_id=movie_id, min_score=0.3, max_score=0.7)
+    expected = [review["id"] for review in everything
+                if review["movie_id"] == movie_id and 0.3 <= review["sentiment_score"] <= 0.7]
+    assert [review["id"] for review in filtered] == expected
+
+
+def test_cursor_from_other_sort_is_rejected(client_with_reviews):
+    client, db = client_with_reviews
+    cursor = client.get("/reviews", params={"limit": 5}).headers["x-next-cursor"]
+    response = client.get("/reviews", params={"limit": 5, "cursor": cursor, "order_by": "created_at"})
+    assert response.status_code == 400
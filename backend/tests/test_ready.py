@@ -0,0 +1,40 @@
+# GET /ready (모델 워밍업 상태)
+
+import time
+from fastapi.testclient import TestClient
+
+
+def wait_for_warmup(client):
+    for _ in range(100):
+        response = client.get("/ready")
+        if response.json()["status"] != "warming_up":
+            return response
+        time.sleep(0.05)
+    return response
+
+
+def fail_warm_up():
+    raise ImportError("No module named 'torch'")
+
+
+def test_sync_mode_is_not_ready_when_warmup_fails(start_server, monkeypatch):
+    main = start_server(SENTIMENT_MODE="sync", SENTIMENT_WARMUP="1")
+    monkeypatch.setattr(main.sentiment_analyzer, "warm_up", fail_warm_up)
+    with TestClient(main.app) as client:
+        response = wait_for_warmup(client)
+    assert response.status_code == 503
+    assert response.json()["status"] == "error"
+
+
+def test_async_mode_is_ready_without_model(start_server, monkeypatch):
+    main = start_server(SENTIMENT_MODE="async", SENTIMENT_WARMUP="1")
+    monkeypatch.setattr(main.sentiment_analyzer, "warm_up", fail_warm_up)
+    with TestClient(main.app) as client:
+        response = wait_for_warmup(client)
+    assert response.status_code == 200
+
+
+def test_ready_immediately_without_warmup(start_server):
+    main = start_server(SENTIMENT_WARMUP="0")
+    with TestClient(main.app) as client:
+        assert client.get("/ready").status_code == 200
@@ -0,0 +1,71 @@
+# SQLite 감성 점수 집계 (트리거 + 다시 계산)
+
+import threading
+from models import Movie, Review
+
+
+def add_scored_movie(db, scores):
+    movie = db.add_movie(Movie(title="영화", release_date="2024-01-01", director="감독", genre="드라마", poster_url=""))
+    for score in scores:
+        db.create_review(Review(movie_id=movie.id, author="무무", content="좋아요", sentiment_score=score,
+                                sentiment_status="done", scoring_version="v1"))
+    return movie
+
+
+def test_rebuild_is_atomic_for_readers(start_server):
+    main = start_server(DB_BACKEND="sqlite", SCORING_VERSION="v1")
+    db = main.db
+    movie = add_scored_movie(db, [0.2, 0.4, 0.9])
+
+    done = threading.Event()
+    seen = []
+
+    def read_stats():
+        while not done.is_set():
+            stats = db.get_sentiment_stats(movie.id)
+            seen.append(None if stats is None else stats["count"])
+
+    reader = threading.Thread(target=read_stats)
+    reader.start()
+    for _ in range(200):
+        db.rebuild_sentiment_stats()
+    done.set()
+    reader.join()
+
+    assert seen and set(seen) == {3}
+
+
+def test_concurrent_first_connections_prepare_database_once(start_server):
+    main = start_server(DB_BACKEND="sqlite", SCORING_VERSION="v1")
+    import sqlite_db  # start_server가 새로 import한 모듈
+    errors = []
+
+    def open_connection():
+        try:
+            sqlite_db.get_connection().execute("SELECT COUNT(*) FROM movie_sentiment_stats").fetchone()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=open_connection) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+    movie = add_scored_movie(main.db, [0.5, 0.7])
+    assert main.db.get_sentiment_stats(movie.id)["count"] == 2
+
+
+def test_legacy_scores_are_backfilled_when_database_is_opened(start_server):
+    main = start_server(DB_BACKEND="sqlite", SCORING_VERSION="v1", LEGACY_SCORING_VERSION="v1")
+    movie = add_scored_movie(main.db, [0.3, 0.6])
+    import sqlite_db
+    conn = sqlite_db.get_connection()
+    with conn:
+        conn.execute("UPDATE reviews SET scoring_version = NULL")
+
+    main = start_server(DB_BACKEND="sqlite", SCORING_VERSION="v1", LEGACY_SCORING_VERSION="v1")
+    stats = main.db.get_sentiment_stats(movie.id)
+    assert (stats["count"], stats["current_count"]) == (2, 2)
+    assert main.db.count_stale_reviews() == 0
@@ -0,0 +1,47 @@
+# 오래된(다른 버전) 점수 백그라운드 재채점
+
+import json
+from models import Movie, Review
+
+
+def test_stale_reviews_are_returned_in_id_order_after_journal_replay(start_server, tmp_path):
+    # 저널에는 ID 순서와 다른 순서로 기록될 수 있음 (재채점 커서는 ID 순서로 진행)
+    reviews = [{"id": review_id, "movie_id": 1, "author": "무무", "content": "좋아요", "sentiment_score": 0.5,
+                "sentiment_status": "done", "scoring_version": "old", "created_at": "2024-01-01 00:00:00"}
+               for review_id in (5, 2, 9, 1, 7)]
+    (tmp_path / "reviews.journal.jsonl").write_text(
+        "".join(json.dumps({"op": "put", "review": review}) + "\n" for review in reviews))
+    main = start_server(DB_BACKEND="json", REVIEW_STORAGE="journal")
+    db = main.db
+
+    seen = []
+    after_id = 0
+    while True:
+        batch = db.get_stale_reviews(2, after_id=after_id)
+        if not batch:
+            break
+        seen.extend(review.id for review in batch)
+        after_id = batch[-1].id
+    assert seen == [1, 2, 5, 7, 9]
+
+
+def test_refresher_is_not_started_on_json_snapshot_backend(start_server, capsys):
+    main = start_server(DB_BACKEND="json", REVIEW_STORAGE="snapshot", STALE_RESCORE_ENABLED="1")
+    main._start_stale_rescoring()
+    assert main.scoring_worker.get_refresher().stats()["running"] is False
+    assert "REVIEW_STORAGE=snapshot" in capsys.readouterr().out
+
+
+def test_refresher_rescores_stale_reviews_on_sqlite(start_server):
+    main = start_server(DB_BACKEND="sqlite", SCORING_VERSION="new")
+    db = main.db
+    movie = db.add_movie(Movie(title="영화", release_date="2024-01-01", director="감독", genre="드라마", poster_url=""))
+    for _ in range(5):
+        db.create_review(Review(movie_id=movie.id, author="무무", content="좋아요", sentiment_score=0.5,
+                                sentiment_status="done", scoring_version="old"))
+
+    refresher = main.scoring_worker.StaleScoreRefresher(lambda texts: [(0.9, None) for _ in texts], batch_size=2)
+    while refresher.run_once():
+        pass
+    assert db.count_stale_reviews() == 0
+    assert db.get_sentiment_stats(movie.id)["current_count"] == 5
@@ -180,12 +180,40 @@ def render_sentiment_bar(score, show_label=True):
 
 # API 호출 함수들
 
+def get_json(path, params=None):
+    """
+    조건부 GET - 이전에 받은 ETag를 If-None-Match로 보내서 바뀌지 않았으면(304) 저장해 둔 응답을 재사용
+    (Streamlit은 화면이 바뀔 때마다 스크립트 전체를 다시 실행하므로 세션별로 응답을 보관)
+    """
+    cache = st.session_state.setdefault("etag_cache", {})
+    key = (path, tuple(sorted((params or {}).items())))
+    cached = cache.get(key)
+    headers = {"If-None-Match": cached[0]} if cached else {}
+
+    response = requests.get(f"{API_URL}{path}", params=params, headers=headers)
+    if response.status_code == 304 and cached:
+        return cached[1]
+    response.raise_for_status()
+
+    data = response.json()
+    if response.headers.get("ETag"):
+        cache[key] = (response.headers["ETag"], data)
+    return data
+
+
 def get_movies():
     """모든 영화 목록 조회"""
     try:
-        response = requests.get(f"{API_URL}/movies")
-        response.raise_for_status()
-        return response.json()
+        return get_json("/movies")
+    except Exception as e:
+        st.error(f"영화 목록을 불러오는데 실패했습니다: {e}")
+        return []
+
+
+def get_movie_summaries():
+    """모든 영화 목록 + 리뷰 수 / 평균 감성 점수 (홈 화면용 - 요청 한 번)"""
+    try:
+        return get_json("/movies/summary")
     except Exception as e:
         st.error(f"영화 목록을 불러오는데 실패했습니다: {e}")
         return []
@@ -242,9 +270,7 @@ def delete_movie(movie_id):
 def get_reviews_by_movie(movie_id):
     """특정 영화의 리뷰 조회"""
     try:
-        response = requests.get(f"{API_URL}/movies/{movie_id}/reviews")
-        response.raise_for_status()
-        return response.json()
+        return get_json(f"/movies/{movie_id}/reviews")
     except Exception as e:
         st.error(f"리뷰를 불러오는데 실패했습니다: {e}")
         return []
@@ -266,23 +292,32 @@ def add_review(movie_id, author, content):
         return None
 
 
-def get_average_sentiment(movie_id):
-    """영화의 평균 감성 점수 조회"""
+def get_review_sentiment(review_id):
+    """리뷰 감성 분석 결과 조회 (백엔드가 비동기 모드일 때 점수가 채워졌는지 확인)"""
     try:
-        response = requests.get(f"{API_URL}/movies/{movie_id}/sentiment")
+        response = requests.get(f"{API_URL}/reviews/{review_id}/sentiment")
         response.raise_for_status()
         return response.json()
     except Exception as e:
         return None
 
 
+def get_average_sentiment(movie_id):
+    """영화의 평균 감성 점수 조회"""
+    try:
+        return get_json(f"/movies/{movie_id}/sentiment")
+    except Exception as e:
+        return None
+
+
 # 페이지 함수들
 
 def show_home():
     """홈 페이지"""
     st.header("🎥 전체 영화 목록")
     
-    movies = get_movies()
+    # 평균 감성 점수까지 한 번에 받아옴 (영화마다 /sentiment를 따로 호출하지 않음)
+    movies = get_movie_summaries()
     
     if not movies:
         st.info("등록된 영화가 없습니다. 영화를 추가해보세요!")
@@ -303,44 +338,36 @@ def show_home():
                 if movie['poster_url']:
                     st.image(movie['poster_url'], use_container_width=True)
                 
-                sentiment_data = get_average_sentiment(movie['id'])
-                if sentiment_data and sentiment_data.get('average_sentiment') is not None:
-                    avg_score = sentiment_data['average_sentiment']
-                    render_sentiment_bar(avg_score, show_label=True)
+                if movie.get('average_sentiment') is not None:
+                    render_sentiment_bar(movie['average_sentiment'], show_label=True)
         
         # 최근 리뷰 10개 표시 - 기능 추가
         st.markdown("---")
         st.markdown("## 📝 최근 리뷰")
         
         try:
-            response = requests.get(f"{API_URL}/reviews")
-            if response.status_code == 200:
-                all_reviews = response.json()
-                
-                # 최근 10개만 (등록일 기준 내림차순)
-                recent_reviews = sorted(
-                    all_reviews, 
-                    key=lambda x: x['created_at'], 
-                    reverse=True
-                )[:10]
-                
-                if recent_reviews:
-                    for review in recent_reviews:
-                        # 영화 정보 가져오기
-                        movie_response = requests.get(f"{API_URL}/movies/{review['movie_id']}")
-                        movie_title = movie_response.json()['title'] if movie_response.status_code == 200 else "알 수 없음"
-                        
-                        with st.container():
-                            col1, col2 = st.columns([3, 1])
-                            with col1:
-                                st.markdown(f"**🎬 {movie_title}**")
-                                st.markdown(f"✍️ {review['author']} | 📅 {review['created_at'][:10]}")
-                                st.markdown(f"💬 {review['content']}")
-                            with col2:
+            # 최근 10개만 (등록일 기준 내림차순) - 서버의 작성 시간 인덱스에서 바로 10개만
+            recent_reviews = get_json("/reviews/recent", params={"limit": 10})
+
+            if recent_reviews:
+                for review in recent_reviews:
+                    # 영화 제목은 응답에 포함됨 (리뷰마다 영화를 다시 조회하지 않음)
+                    movie_title = review.get('movie_title') or "알 수 없음"
+                    
+                    with st.container():
+                        col1, col2 = st.columns([3, 1])
+                        with col1:
+                            st.markdown(f"**🎬 {movie_title}**")
+                            st.markdown(f"✍️ {review['author']} | 📅 {review['created_at'][:10]}")
+                            st.markdown(f"💬 {review['content']}")
+                        with col2:
+                            if review['sentiment_score'] is not None:
                                 render_sentiment_bar(review['sentiment_score'])
-                            st.markdown("---")
-                else:
-                    st.info("아직 작성된 리뷰가 없습니다.")
+                            else:
+                                st.caption("⏳ 감성 분석 중")
+                        st.markdown("---")
+            else:
+                st.info("아직 작성된 리뷰가 없습니다.")
         except Exception as e:
             st.error(f"리뷰를 불러올 수 없습니다: {e}")
 
@@ -518,10 +545,24 @@ def show_review_write():
                         if review:
                             st.success("✅ 리뷰가 등록되었습니다!")
                             
-                            score = review.get('sentiment_score', 0.5)
+                            score = review.get('sentiment_score')
+                            
+                            # 백엔드가 비동기 모드면 점수가 나중에 채워지므로 잠깐 기다려봄
+                            if score is None and review.get('sentiment_status') == "pending":
+                                import time
+                                with st.spinner("감성 분석 중..."):
+                                    for _ in range(10):
+                                        time.sleep(0.5)
+                                        result = get_review_sentiment(review['id'])
+                                        if result and result.get('sentiment_status') == "done":
+                                            score = result.get('sentiment_score')
+                                            break
                             
                             st.subheader("🎯 감성 분석 결과")
-                            render_sentiment_bar(score, show_label=True)
+                            if score is not None:
+                                render_sentiment_bar(score, show_label=True)
+                            else:
+                                st.info("감성 분석이 아직 끝나지 않았습니다. 리뷰 목록에서 확인해주세요.")
                             
                             # 풍선 제거
                             import time
@@ -560,7 +601,18 @@ def show_review_list():
                 st.divider()
                 
                 for review in reviews:
-                    score = review.get('sentiment_score', 0.5)
+                    score = review.get('sentiment_score')
+                    
+                    # 감성 분석 대기 중인 리뷰 (비동기 모드)
+                    if score is None:
+                        st.markdown(f"""
+                            <div class="review-card">
+                                <h4>⏳ {review['author']}</h4>
+                                <p>{review['content']}</p>
+                                <p><small>📅 {review['created_at']} | 감성 분석 중</small></p>
+                            </div>
+                        """, unsafe_allow_html=True)
+                        continue
                     
                     st.markdown(f"""
                         <div class="review-card">